@@ -0,0 +1,17 @@
+import threading
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_environment() -> None:
+    """
+    Load .env into os.environ once per process. Called explicitly at app startup and before
+    the first LLM provider is built, rather than as a side effect of importing service modules.
+    """
+    global _loaded
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _loaded = True
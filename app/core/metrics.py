@@ -0,0 +1,133 @@
+import os
+import sys
+import bisect
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Sequence, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Seconds; spans sub-millisecond parsing up to multi-second LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _render_labels(key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram for one label set"""
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Process-wide counters, gauges and histograms; cheap enough to update on the hot path"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[LabelKey, float]] = defaultdict(lambda: defaultdict(float))
+        self.gauges: Dict[str, Dict[LabelKey, float]] = defaultdict(dict)
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = defaultdict(dict)
+        self.help: Dict[str, str] = {}
+        # Called at scrape time to refresh gauges that are cheaper to read than to track
+        self.collectors: List[Callable[["MetricsRegistry"], None]] = []
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self.counters[name][key] += value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        self.gauges[name][_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = DEFAULT_BUCKETS, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            histogram = self.histograms[name].get(key)
+            if histogram is None:
+                histogram = self.histograms[name][key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def describe(self, name: str, text: str) -> None:
+        self.help[name] = text
+
+    def get(self, name: str, **labels: str) -> float:
+        key = _label_key(labels)
+        if name in self.counters:
+            return self.counters[name].get(key, 0)
+        return self.gauges.get(name, {}).get(key, 0)
+
+    def snapshot(self, prefix: str = "") -> Dict[str, Dict[str, float]]:
+        """{metric: {"label=value,...": value}} for metrics whose name starts with prefix"""
+        with self._lock:
+            series = {**{n: dict(v) for n, v in self.counters.items()}, **{n: dict(v) for n, v in self.gauges.items()}}
+        return {
+            name: {",".join(f"{k}={v}" for k, v in key): value for key, value in values.items()}
+            for name, values in sorted(series.items()) if name.startswith(prefix)
+        }
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        for collect in self.collectors:
+            collect(self)
+        lines = []
+        with self._lock:
+            for kind, series in (("counter", self.counters), ("gauge", self.gauges)):
+                for name, values in sorted(series.items()):
+                    if name in self.help:
+                        lines.append(f"# HELP {name} {self.help[name]}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    lines += [f"{name}{_render_labels(key)} {value:g}" for key, value in values.items()]
+            for name, values in sorted(self.histograms.items()):
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in values.items():
+                    cumulative = 0
+                    for bound, count in zip(list(h.buckets) + ["+Inf"], h.counts):
+                        cumulative += count
+                        le = bound if isinstance(bound, str) else f"{bound:g}"
+                        lines.append(f"{name}_bucket{_render_labels(key, [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_render_labels(key)} {h.sum:g}")
+                    lines.append(f"{name}_count{_render_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+
+def process_rss_bytes() -> float:
+    """Current resident set size; falls back to peak RSS where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import uuid
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    name: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    duration_ms: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+class _NullSpan:
+    """Returned outside a trace so instrumented code never has to check"""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Trace:
+    """All spans recorded while handling one request"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex
+        self.spans: List[Span] = []
+        self.start_ns = time.time_ns()
+        self.duration_ms = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def timings(self) -> List[Dict[str, Any]]:
+        """Per-span breakdown in start order, for the optional `timings` response field"""
+        return [
+            {"stage": s.name, "duration_ms": round(s.duration_ms, 3), **s.attributes}
+            for s in sorted(self.spans, key=lambda s: s.start_ns)
+        ]
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: total duration per stage name, in first-seen order"""
+        totals: Dict[str, float] = {}
+        for s in sorted(self.spans, key=lambda s: s.start_ns):
+            totals[s.name] = totals.get(s.name, 0.0) + s.duration_ms
+        return ", ".join(f"{name};dur={ms:.2f}" for name, ms in totals.items())
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name: str) -> Iterator[Trace]:
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    started = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        trace.duration_ms = (time.perf_counter() - started) * 1000
+        _current_trace.reset(token)
+        exporter = get_exporter()
+        if exporter:
+            exporter.export(trace)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Time a stage of the current trace; a no-op when no trace is active"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield NULL_SPAN
+        return
+    parent = _current_span.get()
+    current = Span(name, uuid.uuid4().hex[:16], parent.span_id if parent else None, time.time_ns(), attributes=attributes)
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.set(error=type(e).__name__)
+        raise
+    finally:
+        current.duration_ms = (time.perf_counter() - started) * 1000
+        _current_span.reset(token)
+        trace.add(current)
+        metrics.observe("stage_duration_seconds", current.duration_ms / 1000, stage=name)
+
+
+def traced(name: str, **attributes: Any) -> Callable:
+    """Decorator form of span(); records input_chars when the first argument is text"""
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return fn(*args, **kwargs)
+            extra = {"input_chars": len(args[0])} if args and isinstance(args[0], str) else {}
+            with span(name, function=fn.__name__, **attributes, **extra):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class OTelJSONFileExporter:
+    """
+    Appends each finished trace as one OTLP/JSON `resourceSpans` document per line, which
+    the OpenTelemetry Collector's file receiver and most trace viewers can import.
+    """
+
+    def __init__(self, path: str, service_name: str = "gsa-document-analyzer"):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _value(value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": str(value)}
+
+    def _span(self, trace: Trace, s: Span) -> Dict[str, Any]:
+        return {
+            "traceId": trace.trace_id,
+            "spanId": s.span_id,
+            "parentSpanId": s.parent_id or trace.trace_id[:16],  # top-level stages hang off the request span
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.start_ns + int(s.duration_ms * 1e6)),
+            "attributes": [{"key": k, "value": self._value(v)} for k, v in s.attributes.items()],
+        }
+
+    def export(self, trace: Trace) -> None:
+        document = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "app.core.tracing"},
+                "spans": [{"traceId": trace.trace_id, "spanId": trace.trace_id[:16], "name": trace.name, "kind": 2,
+                           "startTimeUnixNano": str(trace.start_ns),
+                           "endTimeUnixNano": str(trace.start_ns + int(trace.duration_ms * 1e6)), "attributes": []}]
+                         + [self._span(trace, s) for s in trace.spans],
+            }],
+        }]}
+        try:
+            with self._lock, open(self.path, "a") as f:
+                f.write(json.dumps(document) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not export trace to {self.path}: {e}")
+
+
+_exporter: Optional[OTelJSONFileExporter] = None
+_exporter_path: Optional[str] = None
+
+
+def get_exporter() -> Optional[OTelJSONFileExporter]:
+    """Exporter for TRACE_EXPORT_PATH, if set"""
+    global _exporter, _exporter_path
+    path = os.getenv("TRACE_EXPORT_PATH")
+    if path != _exporter_path:
+        _exporter, _exporter_path = (OTelJSONFileExporter(path) if path else None), path
+    return _exporter
@@ -1,13 +1,18 @@
 # app/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
+from app.core.config import load_environment
 from app.routers import ingest
-from fastapi.responses import RedirectResponse 
+from app.core.tracing import start_trace
+from app.core.metrics import metrics, process_rss_bytes
+from fastapi.responses import PlainTextResponse, RedirectResponse 
 import logging
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+load_environment()
 
 app = FastAPI(
     title="GetGSA Document Parser",
@@ -22,6 +27,44 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 app.include_router(ingest.router, prefix="/api")
 
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Trace every request; per-stage durations go out in the Server-Timing header"""
+    started = time.perf_counter()
+    with start_trace(f"{request.method} {request.url.path}") as trace:
+        response = await call_next(request)
+    # Label by route template, not raw path, so /api/jobs/{job_id} stays one series
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    metrics.inc("http_requests_total", method=request.method, route=route, status=str(response.status_code))
+    metrics.observe("http_request_duration_seconds", time.perf_counter() - started, method=request.method, route=route)
+    if trace.spans:
+        response.headers["Server-Timing"] = trace.server_timing()
+    return response
+
+
+def _collect_runtime(registry):
+    registry.set("process_resident_memory_bytes", process_rss_bytes())
+    registry.set("document_store_size", len(ingest.document_store))
+    if ingest._job_queue is not None:
+        registry.set("job_queue_depth", ingest._job_queue.depth())
+    hits = registry.get("embedding_cache_requests_total", result="hit")
+    total = hits + registry.get("embedding_cache_requests_total", result="miss")
+    registry.set("embedding_cache_hit_ratio", hits / total if total else 0.0)
+
+
+metrics.collectors.append(_collect_runtime)
+metrics.describe("http_request_duration_seconds", "Request latency by route")
+metrics.describe("stage_duration_seconds", "Duration of traced pipeline stages (parse, redact, validate, retrieve, generate, ...)")
+metrics.describe("document_store_size", "Ingested packages held in memory")
+metrics.describe("embedding_cache_hit_ratio", "Share of embedding lookups served from cache")
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 
 @app.get("/")
 async def root():
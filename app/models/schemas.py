@@ -1,10 +1,14 @@
 # app/models/schemas.py
-from typing import List, Optional
-from pydantic import BaseModel, EmailStr, field_validator
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 import re
 import uuid
 
+# Parsed records are built once by the parser (via model_construct, no re-validation)
+# and then shared read-only by the redactor, validators, caches and RAG.
 class CompanyProfile(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     company_name: Optional[str] = None
     uei: Optional[str] = None
     duns: Optional[str] = None
@@ -17,6 +21,8 @@ class CompanyProfile(BaseModel):
 
 
 class PastPerformance(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     customer: Optional[str] = None
     contract_description: Optional[str] = None
     contract_value: Optional[str] = None
@@ -52,11 +58,107 @@ class DocumentInput(BaseModel):
 
 class IngestRequestV2(BaseModel):
     documents: List[DocumentInput]    
+    vendor_id: Optional[str] = None  # scopes incremental re-processing of re-submitted packages
 
 class PricingSheet(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     labor_categories: List[dict] = []  
     # [{"category": "Senior Developer", "rate": 185, "unit": "Hour"}]    
 
 class IngestResponseV2(BaseModel):
     request_id: str
     doc_summaries: List[dict]
+    recomputed: List[str] = []  # names of documents that were (re)processed rather than reused
+    timings: Optional[List[dict]] = None  # per-stage spans, when requested with ?timings=true
+    deduplicated: bool = False  # the package was seen before; request_id and results are the original ones
+    analysis: Optional[dict] = None  # latest /analyze result for a deduplicated package, if any
+
+
+MAX_NAICS_BATCH_VENDORS = 10_000
+
+class NaicsMapRequest(BaseModel):
+    vendors: Dict[str, List[str]] = Field(..., max_length=MAX_NAICS_BATCH_VENDORS)  # vendor id -> NAICS codes
+
+class SinRecommendation(BaseModel):
+    sin: str
+    title: str
+    matched_naics: str  # the crosswalk row that matched: the code itself or a 2-5 digit group
+    exact: bool
+    weight: float
+    reason: str
+
+class NaicsMapResponse(BaseModel):
+    results: Dict[str, List[SinRecommendation]]
+    distinct_codes: int
+
+class ChecklistProblem(BaseModel):
+    issue: str
+    evidence: str
+    rule_id: str
+
+class RuleCitation(BaseModel):
+    rule_id: str
+    chunk: str
+
+class PolicyChecklist(BaseModel):
+    """Checklist returned by the LLM; entries cut off by truncated output are dropped, not fatal"""
+    required_ok: bool
+    problems: List[ChecklistProblem] = []
+    citations: List[RuleCitation] = []
+
+    @field_validator("problems", "citations", mode="before")
+    @classmethod
+    def drop_incomplete_entries(cls, entries: Any, info) -> Any:
+        if not isinstance(entries, list):
+            return entries
+        required = (ChecklistProblem if info.field_name == "problems" else RuleCitation).model_fields
+        return [e for e in entries if isinstance(e, dict) and all(isinstance(e.get(k), str) for k in required)]
+
+# Same shape in the OpenAPI subset Gemini accepts as response_schema
+POLICY_CHECKLIST_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "required_ok": {"type": "boolean"},
+        "problems": {"type": "array", "items": {"type": "object", "properties": {
+            "issue": {"type": "string"}, "evidence": {"type": "string"}, "rule_id": {"type": "string"},
+        }, "required": ["issue", "evidence", "rule_id"]}},
+        "citations": {"type": "array", "items": {"type": "object", "properties": {
+            "rule_id": {"type": "string"}, "chunk": {"type": "string"},
+        }, "required": ["rule_id", "chunk"]}},
+    },
+    "required": ["required_ok", "problems", "citations"],
+}
+
+
+
+class RecordView(Mapping):
+    """Zero-copy, read-only dict view over a parsed record for consumers that expect mappings"""
+    __slots__ = ("_record", "_fields")
+
+    def __init__(self, record: BaseModel):
+        self._record = record
+        self._fields = type(record).model_fields
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self._record, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    @property
+    def record(self) -> BaseModel:
+        return self._record
+
+
+def record_view(record: Any) -> Any:
+    """Wrap a parsed model in a RecordView; mappings and None pass through unchanged"""
+    return RecordView(record) if isinstance(record, BaseModel) else record
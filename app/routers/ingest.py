@@ -1,11 +1,27 @@
-from fastapi import APIRouter, Form
-from app.models.schemas import IngestResponse, IngestRequestV2, PricingSheet, DocumentInput, ValidationIssues, IngestResponseV2
+from fastapi import APIRouter, File, Form, Header, HTTPException, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from app.models.schemas import IngestResponse, IngestRequestV2, PricingSheet, DocumentInput, ValidationIssues, IngestResponseV2, record_view
+from app.models.schemas import NaicsMapRequest, NaicsMapResponse, SinRecommendation
 from app.services.parser import DocumentParser
 from app.services.mapper import NaicsSinMapper
 from app.services.checklist import build_checklist
 from app.services.redactor import PIIRedactor
+from app.services.incremental import IncrementalCache, DocumentResult, LRUCache, content_hash, package_hash
+from app.services.jobs import CallbackURLError, JobQueue, store_from_env, validate_callback_url
+from app.services.rulespack import RulesPackError, RulesPackManager, resolve_pack_path
+from app.services.extraction import EXTRACTORS, ExtractionLimitExceeded, ExtractionPool
+from app.services.preanalysis import PreAnalysis, PreAnalyzer, preanalysis_checklist_enabled, preanalysis_enabled
+from app.core.metrics import metrics
+from app.core.tracing import current_trace, span
+from dataclasses import asdict
 from typing import List, Optional
+import os
+import hmac
+import hashlib
 import uuid
+import tempfile
+import json
 import logging
 
 router = APIRouter()
@@ -14,23 +30,40 @@ logger = logging.getLogger(__name__)
 # Global storage
 document_store = {}
 current_request_id = None
+incremental_cache = IncrementalCache()
+# Deduplication: package content hash -> request_id, and Idempotency-Key -> (digest, request_id)
+package_index = {}
+upload_index = {}  # hash of raw uploaded files -> request_id
+idempotency_keys = LRUCache(int(os.getenv("IDEMPOTENCY_KEYS_MAX", "10000")))
 
 # Lazy initialization - services created only when needed
-_rag_service = None
+_rules_manager = None
 _llm_service = None
+_job_queue = None
+_extraction_pool = None
+_preanalyzer = None
 
-def get_rag_service():
-    """Lazy initialize RAG service"""
-    global _rag_service
-    if _rag_service is None:
-        try:
+def get_rules_manager() -> RulesPackManager:
+    """Holds the live RAG service; RULES_PACK_WATCH_S > 0 also reloads it when the pack file changes"""
+    global _rules_manager
+    if _rules_manager is None:
+        def build(pack):
             from app.services.rag import GSARulesRAG
-            _rag_service = GSARulesRAG()
-            logger.info("RAG service initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize RAG service: {e}")
-            _rag_service = None
-    return _rag_service
+            return GSARulesRAG(rules_pack=pack)
+        _rules_manager = RulesPackManager(build)
+        watch_s = float(os.getenv("RULES_PACK_WATCH_S", "0"))
+        if watch_s > 0:
+            _rules_manager.watch(watch_s)
+    return _rules_manager
+
+def get_rag_service():
+    """Lazy initialize RAG service (the one built for the live rules pack)"""
+    try:
+        rag_service = get_rules_manager().current()
+    except Exception as e:
+        logger.error(f"Failed to initialize RAG service: {e}")
+        return None
+    return rag_service
 
 def get_llm_service():
     """Lazy initialize LLM service"""
@@ -45,7 +78,48 @@ def get_llm_service():
             _llm_service = None
     return _llm_service
 
-@router.post("/ingest", response_model=IngestResponse)
+
+def _find_duplicate(digest: str, idempotency_key: Optional[str], index: dict) -> Optional[str]:
+    """
+    request_id of an earlier ingest of the same content, found by Idempotency-Key or content hash.
+    Reusing a key for different content is a client error (409).
+    """
+    if idempotency_key:
+        seen = idempotency_keys.get(idempotency_key)
+        if seen is not None:
+            seen_digest, request_id = seen
+            if seen_digest != digest:
+                raise HTTPException(status_code=409, detail="Idempotency-Key was already used for a different package")
+            if request_id in document_store:
+                metrics.inc("ingest_deduplicated_total", via="idempotency_key")
+                return request_id
+    request_id = index.get(digest)
+    if request_id in document_store:
+        metrics.inc("ingest_deduplicated_total", via="content_hash")
+        if idempotency_key:
+            idempotency_keys.put(idempotency_key, (digest, request_id))
+        return request_id
+    return None
+
+
+def _remember(digest: str, idempotency_key: Optional[str], index: dict, request_id: str) -> None:
+    index[digest] = request_id
+    if idempotency_key:
+        idempotency_keys.put(idempotency_key, (digest, request_id))
+
+
+def _replay(request_id: str, timings: bool) -> IngestResponseV2:
+    """The original response for a duplicate submission, with its latest analysis if one ran"""
+    global current_request_id
+    current_request_id = request_id
+    stored = document_store[request_id]
+    logger.info(f"Duplicate package; returning existing request {request_id}")
+    return IngestResponseV2(**stored["response"], deduplicated=True, analysis=stored.get("analysis"),
+                            timings=_timings() if timings else None)
+
+
+# /ingest is a legacy alias of /ingest_v2: this decorator stacks onto ingest_documents_v2 below
+@router.post("/ingest", response_model=IngestResponseV2)
 # async def ingest_documents(company_profile: str = Form(...), past_performance: str = Form(...)):
     # """Process company profile and past performance documents"""
     
@@ -77,9 +151,22 @@ def get_llm_service():
     # )
 
 @router.post("/ingest_v2", response_model=IngestResponseV2)
-async def ingest_documents_v2(request: IngestRequestV2):
-    """New ingest endpoint supporting multiple document types with PII redaction"""
+async def ingest_documents_v2(request: IngestRequestV2, timings: bool = False, preanalyze: Optional[bool] = None,
+                              idempotency_key: Optional[str] = Header(None)):
+    """New ingest endpoint supporting multiple document types with PII redaction
+
+    A package identical to an earlier one (same vendor, document names, hints and text), or a retry
+    with the same Idempotency-Key header, returns the original request_id and results without
+    reprocessing. timings=true adds the per-stage span breakdown (also summarized in the Server-Timing header).
+    preanalyze=true (default from PREANALYZE) starts validation and rule retrieval in the background
+    right away, so a following /analyze only waits for what is left.
+    """
     global current_request_id
+
+    digest = package_hash(request.vendor_id, request.documents)
+    duplicate = _find_duplicate(digest, idempotency_key, package_index)
+    if duplicate:
+        return _replay(duplicate, timings)
     
     request_id = str(uuid.uuid4())
     current_request_id = request_id
@@ -91,21 +178,36 @@ async def ingest_documents_v2(request: IngestRequestV2):
     redacted_docs = { "company": None, "past_performance": [], "pricing": None}
     parsed_data = {"company": None, "past_performance": [], "pricing": None}
     temp=[]
-    for doc in request.documents:
-        # Classify document
-        doc_type = parser.classify_document(doc.text, doc.type_hint)
-        temp.append({"name": doc.name,"type": doc_type,"redacted":True})
+    recomputed = []
+    company_result = None
+    pp_results = []
+    for i, doc in enumerate(request.documents):
+        doc_name = doc.name or f"document_{i+1}"
+        with span("document", document=doc_name, input_chars=len(doc.text)) as doc_span:
+            # Reuse classification, parse and redaction of documents whose text is unchanged
+            cache_key = incremental_cache.document_key(request.vendor_id, doc.text, doc.type_hint)
+            result = incremental_cache.get_document(cache_key)
+            reused = result is not None
+            if not reused:
+                result = _process_document(parser, doc)
+                incremental_cache.put_document(cache_key, result)
+                recomputed.append(doc_name)
+            doc_span.set(cache_hit=reused, doc_type=result.doc_type)
+        temp.append({"name": doc.name,"type": result.doc_type,"redacted":True,"reused": reused})
         
-        # Parse based on type
-        if doc_type == "profile":
-            parsed_data["company"] = parser.parse_company_profile(doc.text)
-        elif doc_type == "past_performance":
-            parsed_data["past_performance"].extend(parser.parse_past_performance(doc.text))
-        elif doc_type == "pricing":
-            parsed_data["pricing"] = parser.parse_pricing_sheet(doc.text)
-    
+        if result.doc_type == "profile":
+            parsed_data["company"] = result.parsed
+            company_result = result
+        elif result.doc_type == "past_performance":
+            parsed_data["past_performance"].extend(result.parsed)
+            pp_results.append(result)
+        elif result.doc_type == "pricing":
+            parsed_data["pricing"] = result.parsed
 
-    redacted_text, pii_hashes = PIIRedactor.redact_and_hash_companyprofile(parsed_data["company"])
+    if company_result is not None:
+        redacted_text, pii_hashes = company_result.redacted[0]
+    else:
+        redacted_text, pii_hashes = None, {"emails": [], "phones": []}
 
         # Store both redacted text AND hashes for verification
     redacted_docs["company"] = ({
@@ -114,12 +216,12 @@ async def ingest_documents_v2(request: IngestRequestV2):
     })    
 
 
-    for pp in parsed_data["past_performance"]:
-        redacted_text2, pii_hashes2 = PIIRedactor.redact_and_hash_pastperformance(pp)
-        redacted_docs["past_performance"].append({
-            "redacted_text": redacted_text2,
-            "pii_hashes": pii_hashes2
-        })
+    for result in pp_results:
+        for redacted_text2, pii_hashes2 in result.redacted:
+            redacted_docs["past_performance"].append({
+                "redacted_text": redacted_text2,
+                "pii_hashes": pii_hashes2
+            })
 
     redacted_docs["pricing"]={"pricing": parsed_data["pricing"]}
 
@@ -127,26 +229,220 @@ async def ingest_documents_v2(request: IngestRequestV2):
     # Store redacted documents for analysis step
     document_store[request_id] = {
         "redacted_docs": redacted_docs,
-        "parsed_data": parsed_data
+        "parsed_data": parsed_data,
+        "response": {"request_id": request_id, "doc_summaries": temp, "recomputed": recomputed},
+        "package_hash": digest,
     }
+    _remember(digest, idempotency_key, package_index, request_id)
+    if preanalyze if preanalyze is not None else preanalysis_enabled():
+        get_preanalyzer().schedule(request_id, convert_to_dict(parsed_data), checklist=preanalysis_checklist_enabled())
 
     logger.info(f"Request {request_id}: Stored {len(redacted_docs)} redacted documents")
     logger.info(f"Request {request_id}: Parsed data types: {list(parsed_data.keys())}")
+    logger.info(f"Request {request_id}: Recomputed {len(recomputed)} of {len(request.documents)} documents")
 
     return IngestResponseV2(
         request_id=request_id,
-        doc_summaries=temp
+        doc_summaries=temp,
+        recomputed=recomputed,
+        timings=_timings() if timings else None
     )
 
+
+UPLOAD_CHUNK_BYTES = 2**20
+
+
+def get_preanalyzer() -> PreAnalyzer:
+    """Lazy initialize the pre-analysis threads (PREANALYZE_WORKERS)"""
+    global _preanalyzer
+    if _preanalyzer is None:
+        _preanalyzer = PreAnalyzer(lambda: get_rag_service(), lambda: incremental_cache,
+                                   workers=int(os.getenv("PREANALYZE_WORKERS", "2")))
+    return _preanalyzer
+
+
+def _preanalysis(target_id: str, rag_service) -> Optional[PreAnalysis]:
+    return _preanalyzer.result(target_id, rag_service.rules_version) if _preanalyzer else None
+
+
+def _checklist(rag_service, parsed_data, issues, pre: Optional[PreAnalysis]):
+    """The policy checklist, reusing whatever pre-analysis already produced"""
+    if pre is None:
+        return rag_service.build_policy_checklist(parsed_data, issues=issues)
+    return pre.checklist or rag_service.build_policy_checklist(parsed_data, issues=issues, matched=pre.matched)
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """Lazy initialize the extraction process pool (EXTRACT_WORKERS processes)"""
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = ExtractionPool(workers=int(os.getenv("EXTRACT_WORKERS", "2")))
+    return _extraction_pool
+
+
+async def _spool_upload(upload: UploadFile, suffix: str, max_bytes: int, digest) -> str:
+    """
+    Copy an upload to a temp file in chunks, refusing it as soon as it passes max_bytes;
+    the bytes also feed `digest` so duplicate uploads are spotted before any extraction.
+    """
+    size = 0
+    digest.update(f"{upload.filename}\x00".encode())
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as out:
+        try:
+            while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"{upload.filename} is larger than {max_bytes} bytes")
+                out.write(chunk)
+                digest.update(chunk)
+        except BaseException:
+            os.unlink(out.name)
+            raise
+    digest.update(b"\x00")
+    return out.name
+
+
+@router.post("/ingest_upload", response_model=IngestResponseV2)
+async def ingest_upload(files: List[UploadFile] = File(...), vendor_id: Optional[str] = Form(None),
+                        type_hints: Optional[str] = Form(None), timings: bool = False, preanalyze: Optional[bool] = None,
+                        idempotency_key: Optional[str] = Header(None)):
+    """
+    Ingest PDF, DOCX, XLSX (or plain text/CSV) files directly. Text is extracted in a process pool
+    under per-file size, length and time limits (EXTRACT_MAX_BYTES, EXTRACT_MAX_CHARS,
+    EXTRACT_MAX_SEGMENTS, EXTRACT_TIMEOUT_S), then processed exactly like /ingest_v2.
+    type_hints is an optional comma-separated list aligned with files; leave an entry blank to auto-classify.
+    Re-uploading the same files (or retrying with the same Idempotency-Key) skips extraction entirely.
+    """
+    pool = get_extraction_pool()
+    hints = [h.strip() or None for h in type_hints.split(",")] if type_hints else []
+    for upload in files:
+        if os.path.splitext(upload.filename or "")[1].lower() not in EXTRACTORS:
+            raise HTTPException(status_code=415, detail=f"Unsupported file type for {upload.filename}")
+
+    upload_digest = hashlib.sha256(f"{vendor_id or ''}\x00{type_hints or ''}\x00".encode())
+    paths = []
+    try:
+        for upload in files:
+            suffix = os.path.splitext(upload.filename)[1].lower()
+            paths.append(await _spool_upload(upload, suffix, pool.limits.max_bytes, upload_digest))
+        digest = upload_digest.hexdigest()
+        duplicate = _find_duplicate(digest, idempotency_key, upload_index)
+        if duplicate:
+            return _replay(duplicate, timings)
+
+        documents, extracted = [], []
+        for i, (upload, path) in enumerate(zip(files, paths)):
+            suffix = os.path.splitext(upload.filename)[1].lower()
+            try:
+                with span("extract", document=upload.filename, kind=suffix.lstrip(".")) as extract_span:
+                    result = await pool.extract(path, suffix)
+                    extract_span.set(segments=result.segments, input_chars=len(result.text), truncated=result.truncated)
+            except ExtractionLimitExceeded as e:
+                raise HTTPException(status_code=413, detail=f"{upload.filename}: {e}")
+            except Exception as e:
+                logger.warning(f"Could not extract {upload.filename}: {e}")
+                raise HTTPException(status_code=422, detail=f"Could not extract text from {upload.filename}: {e}")
+            documents.append(DocumentInput(name=upload.filename, type_hint=hints[i] if i < len(hints) else None, text=result.text))
+            extracted.append(result)
+    finally:
+        for path in paths:
+            os.unlink(path)
+
+    response = await ingest_documents_v2(IngestRequestV2(documents=documents, vendor_id=vendor_id),
+                                         timings=timings, preanalyze=preanalyze, idempotency_key=None)
+    for summary, result in zip(response.doc_summaries, extracted):
+        summary.update(source_format=result.kind, segments=result.segments, truncated=result.truncated)
+    if not response.deduplicated:
+        document_store[response.request_id]["response"]["doc_summaries"] = response.doc_summaries
+    # The key is bound to the upload bytes; the extracted package was indexed by ingest_documents_v2
+    _remember(digest, idempotency_key, upload_index, response.request_id)
+    return response
+
+
+def _process_document(parser: DocumentParser, doc: DocumentInput) -> DocumentResult:
+    """Classify, parse and redact a single document"""
+    doc_type = parser.classify_document(doc.text, doc.type_hint)
+    if doc_type == "profile":
+        company = parser.parse_company_profile(doc.text)
+        return DocumentResult(doc_type, company, [PIIRedactor.redact_and_hash_companyprofile(company)])
+    if doc_type == "past_performance":
+        records = parser.parse_past_performance(doc.text)
+        return DocumentResult(doc_type, records, [PIIRedactor.redact_and_hash_pastperformance(pp) for pp in records])
+    if doc_type == "pricing":
+        return DocumentResult(doc_type, parser.parse_pricing_sheet(doc.text))
+    return DocumentResult(doc_type)
+
 @router.get("/healthz")
 async def health_check():
     """Health check endpoint"""
     return {"ok": True}
 
 
+def _require_admin(token: Optional[str]) -> None:
+    """Admin routes are disabled unless ADMIN_TOKEN is set, and then X-Admin-Token must match it"""
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin routes are disabled; set ADMIN_TOKEN to enable them")
+    if not hmac.compare_digest(token or "", expected):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/admin/rules")
+async def rules_status(x_admin_token: Optional[str] = Header(None)):
+    """Live rules pack version and the state of the last reload"""
+    _require_admin(x_admin_token)
+    return get_rules_manager().status()
+
+
+@router.post("/admin/rules/reload", status_code=202)
+async def reload_rules(path: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    """
+    Build the index for the rules pack (RULES_PACK_PATH, or `path` relative to RULES_PACK_DIR) in the
+    background and swap it in when ready; requests keep being served by the current pack meanwhile.
+    Poll /admin/rules.
+    """
+    _require_admin(x_admin_token)
+    try:
+        pack_path = resolve_pack_path(path) if path else None
+    except RulesPackError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return get_rules_manager().reload(pack_path)
+
+
+@router.post("/naics/map", response_model=NaicsMapResponse)
+async def map_naics(request: NaicsMapRequest):
+    """Ranked SIN recommendations, with reasons, for up to 10,000 vendors' NAICS codes in one call"""
+    results = NaicsSinMapper.map_batch(request.vendors)
+    return NaicsMapResponse(
+        results={vendor_id: [SinRecommendation(exact=m.exact, **asdict(m)) for m in matches]
+                 for vendor_id, matches in results.items()},
+        distinct_codes=len({code for codes in request.vendors.values() for code in codes}),
+    )
+
+
+@router.get("/llm/metrics")
+async def llm_metrics():
+    """LLM call counters (requests, retries, rate limiting, circuit state) and live limiter state"""
+    from app.services import providers
+    shared = providers._shared_provider
+    return {
+        "provider": shared.stats() if hasattr(shared, "stats") else (shared.describe() if shared else None),
+        "metrics": metrics.snapshot("llm_"),
+    }
+
+
 @router.post("/analyze")
-async def analyze_documents(request_id: Optional[str]):
-    """Analyze stored documents using RAG and LLM"""
+async def analyze_documents(request_id: Optional[str], combined: Optional[bool] = None, async_job: bool = False,
+                            priority: int = 5, callback_url: Optional[str] = None, timings: bool = False):
+    """Analyze stored documents using RAG and LLM
+
+    combined=true generates checklist, brief and email in one structured LLM call
+    (default from LLM_COMBINED_GENERATION).
+    async_job=true queues the analysis and returns a job id immediately; poll /jobs/{job_id}
+    or pass callback_url to have the finished job POSTed to it (public http(s) hosts only, or those
+    in CALLBACK_ALLOWED_HOSTS). Lower priority runs first.
+    timings=true adds the per-stage span breakdown to the response.
+    """
     global current_request_id
     
     # Use provided request_id or fall back to last ingested
@@ -155,7 +451,35 @@ async def analyze_documents(request_id: Optional[str]):
     if not target_id or target_id not in document_store:
         logger.warning(f"Request ID {target_id} not found")
         return {"error": "Request ID not found"}
-    
+
+    if async_job:
+        if callback_url:
+            try:
+                validate_callback_url(callback_url)
+            except CallbackURLError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        # Jobs only reference the package: persisted jobs must not write unredacted data to disk
+        payload = {"request_id": target_id, "combined": combined,
+                   "package_hash": document_store[target_id].get("package_hash")}
+        queue = get_job_queue()
+        job = queue.submit(payload, priority=priority, callback_url=callback_url)
+        logger.info(f"Request {target_id}: queued analysis job {job.job_id}")
+        return {"job_id": job.job_id, "status": job.status, "request_id": target_id,
+                "status_url": f"/api/jobs/{job.job_id}"}
+
+    result = _run_analysis(target_id, combined)
+    if timings:
+        result["timings"] = _timings()
+    return result
+
+
+def _timings():
+    trace = current_trace()
+    return trace.timings() if trace else []
+
+
+def _run_analysis(target_id: str, combined: Optional[bool] = None):
+    """Full analysis of a stored package; shared by /analyze and the job queue"""
     stored_data = document_store[target_id]
     redacted=stored_data["redacted_docs"]
     parsed_data = stored_data["parsed_data"]
@@ -169,22 +493,46 @@ async def analyze_documents(request_id: Optional[str]):
         parsed_datav2=convert_to_dict(parsed_data)
         
         if rag_service and llm_service:
-            # Full AI analysis
-            checklist = rag_service.build_policy_checklist(parsed_datav2)
-            brief = llm_service.generate_negotiation_brief(parsed_datav2, checklist)
-            client_email = llm_service.generate_client_email(parsed_datav2, checklist)
-            
-            logger.info(f"Request {target_id}: AI analysis complete")
+            pre = _preanalysis(target_id, rag_service)
+            # Only sections whose content changed are re-validated
+            issues, recomputed_sections = (pre.issues, pre.recomputed_sections) if pre else incremental_cache.validate(parsed_datav2)
+            package_hash = content_hash(parsed_datav2)
+            analysis = incremental_cache.get_analysis(package_hash, rules_version=rag_service.rules_version)
+            analysis_recomputed = analysis is None
+            with span("analysis", cache_hit=not analysis_recomputed):
+                if analysis_recomputed:
+                    # Full AI analysis
+                    from app.services.combined import CombinedGenerator, combined_generation_enabled
+                    if combined if combined is not None else combined_generation_enabled():
+                        analysis = CombinedGenerator(rag_service, llm_service).generate(
+                            parsed_datav2, issues, matched=pre.matched if pre else None)
+                    else:
+                        checklist = _checklist(rag_service, parsed_datav2, issues, pre)
+                        brief = llm_service.generate_negotiation_brief(parsed_datav2, checklist)
+                        client_email = llm_service.generate_client_email(parsed_datav2, checklist)
+                        analysis = {"checklist": checklist, "brief": brief, "client_email": client_email}
+                    incremental_cache.put_analysis(package_hash, analysis)
+                    logger.info(f"Request {target_id}: AI analysis complete")
+                else:
+                    logger.info(f"Request {target_id}: Package unchanged, reusing AI analysis")
+            checklist = analysis["checklist"]
             
-            return {
+            stored_data["analysis"] = {
                 "request_id": target_id,
                 "parsed": redacted,
                 "checklist": checklist,
-                "brief": brief,
-                "client_email": client_email,
+                "brief": analysis["brief"],
+                "client_email": analysis["client_email"],
                 "citations": checklist.get("citations", []),
-                "powered_by": "Google Gemini 2.0 Flash + RAG"
+                "recomputed": {
+                    "validation_sections": recomputed_sections,
+                    "analysis": analysis_recomputed,
+                    "combined_fallback_sections": analysis.get("fallback_sections"),
+                    "preanalyzed": pre is not None
+                },
+                "powered_by": f"{llm_service.provider.describe()} + RAG"
             }
+            return stored_data["analysis"]
         else:
             # Fallback to basic analysis
             logger.warning("AI services not available, using fallback analysis")
@@ -205,41 +553,137 @@ async def analyze_documents(request_id: Optional[str]):
             "request_id": target_id
         }
     
-def convert_to_dict(parsed_data):
-    """Convert Pydantic objects to dictionaries for AI processing"""
-    result = {}
-    
-    # Convert company profile
-    if parsed_data.get("company"):
-        if hasattr(parsed_data["company"], 'dict'):
-            result["company"] = parsed_data["company"].dict()
-        else:
-            result["company"] = parsed_data["company"]
-    else:
-        result["company"] = None
-    
-    # Convert past performance list
-    if parsed_data.get("past_performance"):
-        pp_list = []
-        for pp in parsed_data["past_performance"]:
-            if hasattr(pp, 'dict'):
-                pp_list.append(pp.dict())
-            else:
-                pp_list.append(pp)
-        result["past_performance"] = pp_list
-    else:
-        result["past_performance"] = []
-    
-    # Convert pricing
-    if parsed_data.get("pricing"):
-        if hasattr(parsed_data["pricing"], 'dict'):
-            result["pricing"] = parsed_data["pricing"].dict()
+def _run_analysis_job(payload):
+    target_id = payload["request_id"]
+    if target_id not in document_store:
+        # After a restart the package is gone unless it has been ingested again
+        target_id = package_index.get(payload.get("package_hash"), target_id)
+    if target_id not in document_store:
+        raise KeyError(f"Request ID {payload['request_id']} is no longer in memory; ingest the package again")
+    result = _run_analysis(target_id, payload.get("combined"))
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return jsonable_encoder(result)
+
+
+def get_job_queue():
+    """Lazy initialize the analysis job queue (JOB_WORKERS threads, JOB_DB_PATH for SQLite persistence)"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(_run_analysis_job, workers=int(os.getenv("JOB_WORKERS", "2")), store=store_from_env())
+    return _job_queue
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status of a queued analysis job, with its result once it has succeeded"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return {"error": "Job not found"}
+    return job.public()
+
+
+@router.get("/analyze_stream")
+async def analyze_documents_stream(request_id: Optional[str] = None):
+    """Analyze stored documents, streaming results as Server-Sent Events.
+
+    Emits `checklist` as soon as it is ready, then `brief` and `email` text deltas, then `done`.
+    """
+    target_id = request_id or current_request_id
+    return StreamingResponse(
+        _analysis_events(target_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+def _analysis_events(target_id: Optional[str]):
+    """Generator behind /analyze_stream; runs in the threadpool so blocking LLM calls don't stall the event loop"""
+    if not target_id or target_id not in document_store:
+        logger.warning(f"Request ID {target_id} not found")
+        yield _sse("error", {"error": "Request ID not found"})
+        return
+
+    stored_data = document_store[target_id]
+    redacted = stored_data["redacted_docs"]
+    logger.info(f"Streaming analysis for request {target_id}")
+
+    try:
+        rag_service = get_rag_service()
+        llm_service = get_llm_service()
+        if not (rag_service and llm_service):
+            logger.warning("AI services not available, using fallback analysis")
+            yield _sse("checklist", {
+                "request_id": target_id,
+                "parsed": redacted,
+                "checklist": {"required_ok": True, "problems": [], "citations": []},
+                "citations": [],
+                "powered_by": "Fallback Analysis"
+            })
+            yield _sse("brief", {"delta": "AI analysis not available. Please review manually."})
+            yield _sse("email", {"delta": "AI email generation not available."})
+            yield _sse("done", {"request_id": target_id})
+            return
+
+        parsed_datav2 = convert_to_dict(stored_data["parsed_data"])
+        pre = _preanalysis(target_id, rag_service)
+        issues, recomputed_sections = (pre.issues, pre.recomputed_sections) if pre else incremental_cache.validate(parsed_datav2)
+        package_hash = content_hash(parsed_datav2)
+        cached = incremental_cache.get_analysis(package_hash, rules_version=rag_service.rules_version)
+        checklist = cached["checklist"] if cached else _checklist(rag_service, parsed_datav2, issues, pre)
+
+        yield _sse("checklist", {
+            "request_id": target_id,
+            "parsed": redacted,
+            "checklist": checklist,
+            "citations": checklist.get("citations", []),
+            "recomputed": {"validation_sections": recomputed_sections, "analysis": cached is None,
+                           "preanalyzed": pre is not None},
+            "powered_by": f"{llm_service.provider.describe()} + RAG"
+        })
+
+        if cached:
+            yield _sse("brief", {"delta": cached["brief"]})
+            yield _sse("email", {"delta": cached["client_email"]})
         else:
-            result["pricing"] = parsed_data["pricing"]
-    else:
-        result["pricing"] = None
-    
-    return result
+            # A stream that fails midway raises (ending in an error event); one that failed before
+            # any text yields fallback text instead. Neither result may be cached.
+            fell_back = False
+            brief_chunks = []
+            for chunk in llm_service.stream_negotiation_brief(parsed_datav2, checklist):
+                fell_back |= getattr(chunk, "fallback", False)
+                brief_chunks.append(chunk)
+                yield _sse("brief", {"delta": chunk})
+            email_chunks = []
+            for chunk in llm_service.stream_client_email(parsed_datav2, checklist):
+                fell_back |= getattr(chunk, "fallback", False)
+                email_chunks.append(chunk)
+                yield _sse("email", {"delta": chunk})
+            if not fell_back:
+                incremental_cache.put_analysis(package_hash, {
+                    "checklist": checklist,
+                    "brief": "".join(brief_chunks).strip(),
+                    "client_email": "".join(email_chunks).strip()
+                })
+        logger.info(f"Request {target_id}: Streamed AI analysis complete")
+        yield _sse("done", {"request_id": target_id})
+
+    except Exception as e:
+        logger.error(f"Error streaming analysis for request {target_id}: {e}")
+        yield _sse("error", {"error": f"Analysis failed: {str(e)}", "request_id": target_id})
+
+
+def convert_to_dict(parsed_data):
+    """Expose parsed records to AI processing as read-only mapping views (no copies, no re-validation)"""
+    return {
+        "company": record_view(parsed_data.get("company")) if parsed_data.get("company") else None,
+        "past_performance": [record_view(pp) for pp in parsed_data.get("past_performance") or []],
+        "pricing": record_view(parsed_data.get("pricing")) if parsed_data.get("pricing") else None,
+    }
 
 
 @router.get("/debug/{request_id}")
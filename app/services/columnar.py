@@ -0,0 +1,176 @@
+# Vectorized batch validation, imported on first use so single-package requests never load numpy
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from app.services.money import MoneyParser
+from app.services.validator import (
+    MIN_CONTRACT_VALUE, RECENCY_WINDOW_MONTHS, ComplianceIssue, make_issue, period_parser,
+)
+
+
+def _truthy(values: List[Any]) -> np.ndarray:
+    return np.fromiter((bool(v) for v in values), dtype=bool, count=len(values))
+
+
+def _stripped(values: List[Any]) -> np.ndarray:
+    return np.array([str(v).strip() if v else "" for v in values], dtype=str)
+
+
+def _digits_of_length(values: np.ndarray, length: int) -> np.ndarray:
+    """Vectorized equivalent of re.match(r'^\\d{length}$', value) over a string array"""
+    if values.size == 0:
+        return np.zeros(0, dtype=bool)
+    return (np.char.str_len(values) == length) & np.char.isdecimal(values)
+
+
+class ColumnarBatch:
+    """Columnar view of a batch of submissions used by HybridValidator.validate_batch"""
+
+    def __init__(self, submissions: List[Dict[str, Any]]):
+        self.submissions = submissions
+        self.size = len(submissions)
+        self.companies = [s.get("company") for s in submissions]
+        self.past_performance = [s.get("past_performance", []) or [] for s in submissions]
+        self.pricing = [s.get("pricing") for s in submissions]
+
+    def _company_column(self, field: str, default: Any = None) -> List[Any]:
+        return [c.get(field, default) if c else None for c in self.companies]
+
+    @staticmethod
+    def _flatten(groups: List[List[Any]]) -> Tuple[List[Any], np.ndarray]:
+        """Flatten nested lists into one row list plus offsets delimiting each submission's rows"""
+        counts = np.fromiter((len(g) for g in groups), dtype=np.int64, count=len(groups))
+        offsets = np.zeros(len(groups) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        rows = [row for group in groups for row in group]
+        return rows, offsets
+
+    def validate(self) -> List[List[ComplianceIssue]]:
+        results: List[List[ComplianceIssue]] = [[] for _ in range(self.size)]
+        self._company_issues(results)
+        self._past_performance_issues(results)
+        self._pricing_issues(results)
+        return results
+
+    def _company_issues(self, results: List[List[ComplianceIssue]]) -> None:
+        has_company = _truthy(self.companies)
+
+        uei = self._company_column("uei")
+        uei_str = _stripped(uei)
+        missing_uei = has_company & ~_truthy(uei)
+        invalid_uei = has_company & ~missing_uei & (np.char.str_len(uei_str) != 12)
+
+        duns = self._company_column("duns")
+        missing_duns = has_company & ~_truthy(duns)
+        invalid_duns = has_company & ~missing_duns & ~_digits_of_length(_stripped(duns), 9)
+
+        sam = self._company_column("sam_registered")
+        sam_none = np.fromiter((s is None for s in sam), dtype=bool, count=self.size)
+        sam_registered = np.fromiter((s == True for s in sam), dtype=bool, count=self.size)
+        sam_text = np.char.lower(np.array([str(s) for s in sam], dtype=str))
+        sam_unknown = has_company & sam_none
+        sam_inactive = has_company & ~sam_none & ~sam_registered & (sam_text != "registered")
+
+        missing_email = has_company & ~_truthy(self._company_column("poc_email"))
+        missing_phone = has_company & ~_truthy(self._company_column("poc_phone"))
+        missing_name = has_company & ~_truthy(self._company_column("company_name"))
+
+        naics = [list(n) if n else [] for n in self._company_column("naics", [])]
+        missing_naics = has_company & ~_truthy(naics)
+        naics_rows, naics_offsets = self._flatten(naics)
+        invalid_naics = ~_digits_of_length(_stripped(naics_rows), 6)
+
+        for i in range(self.size):
+            issues = results[i]
+            if not has_company[i]:
+                issues.append(make_issue("missing_company_profile"))
+                continue
+            if missing_uei[i]:
+                issues.append(make_issue("missing_uei"))
+            elif invalid_uei[i]:
+                issues.append(make_issue("invalid_uei_format", uei=uei[i], length=len(uei_str[i])))
+            if missing_duns[i]:
+                issues.append(make_issue("missing_duns"))
+            elif invalid_duns[i]:
+                issues.append(make_issue("invalid_duns_format", duns=duns[i]))
+            if sam_unknown[i]:
+                issues.append(make_issue("sam_status_unknown"))
+            elif sam_inactive[i]:
+                issues.append(make_issue("sam_not_registered", sam_status=sam[i]))
+            if missing_email[i]:
+                issues.append(make_issue("missing_poc_email"))
+            if missing_phone[i]:
+                issues.append(make_issue("missing_poc_phone"))
+            if missing_name[i]:
+                issues.append(make_issue("missing_company_name"))
+            if missing_naics[i]:
+                issues.append(make_issue("missing_naics"))
+            else:
+                for row in range(naics_offsets[i], naics_offsets[i + 1]):
+                    if invalid_naics[row]:
+                        issues.append(make_issue("invalid_naics_format", naics_code=naics_rows[row]))
+
+    def _past_performance_issues(self, results: List[List[ComplianceIssue]]) -> None:
+        rows, offsets = self._flatten(self.past_performance)
+        owners = np.repeat(np.arange(self.size), np.diff(offsets))
+
+        # Parse each distinct value/period string once, then compare whole columns
+        numeric = MoneyParser.parse_many(row.get("contract_value", "0") for row in rows)
+
+        periods = [row.get("period", "") for row in rows]
+        end_dates = np.array([end if end else np.datetime64("NaT") for end in period_parser.end_dates(periods)],
+                             dtype="datetime64[D]")
+        threshold = np.datetime64(period_parser.months_ago(RECENCY_WINDOW_MONTHS), "D")
+
+        qualifying = (numeric >= MIN_CONTRACT_VALUE) & (end_dates >= threshold)
+        qualifying_counts = np.bincount(owners, weights=qualifying, minlength=self.size)
+
+        missing_customer = ~_truthy([row.get("customer") for row in rows])
+        missing_period = ~_truthy(periods)
+        missing_contact = ~(_truthy([row.get("contact_email") for row in rows]) &
+                            _truthy([row.get("contact_name") for row in rows]))
+
+        for i in range(self.size):
+            issues = results[i]
+            start, end = offsets[i], offsets[i + 1]
+            if start == end:
+                issues.append(make_issue("no_past_performance"))
+                continue
+            for row in range(start, end):
+                index = row - start + 1
+                if missing_customer[row]:
+                    issues.append(make_issue("missing_customer_info", index=index))
+                if missing_period[row]:
+                    issues.append(make_issue("missing_contract_period", index=index))
+                if missing_contact[row]:
+                    issues.append(make_issue("missing_contact_verification", index=index))
+            if qualifying_counts[i] == 0:
+                issues.append(make_issue("no_qualifying_contracts", count=end - start))
+
+    def _pricing_issues(self, results: List[List[ComplianceIssue]]) -> None:
+        has_pricing = _truthy(self.pricing)
+        categories = [(p.get("labor_categories", []) or []) if p else [] for p in self.pricing]
+        rows, offsets = self._flatten(categories)
+
+        missing_name = ~_truthy([row.get("category") for row in rows])
+        missing_rate = ~_truthy([row.get("rate") for row in rows])
+        missing_unit = ~_truthy([row.get("unit") for row in rows])
+
+        for i in range(self.size):
+            issues = results[i]
+            if not has_pricing[i]:
+                issues.append(make_issue("missing_pricing_sheet"))
+                continue
+            start, end = offsets[i], offsets[i + 1]
+            if start == end:
+                issues.append(make_issue("missing_labor_categories"))
+                continue
+            for row in range(start, end):
+                name = rows[row].get('category', 'unnamed')
+                if missing_name[row]:
+                    issues.append(make_issue("missing_category_name", index=row - start + 1))
+                if missing_rate[row]:
+                    issues.append(make_issue("missing_hourly_rate", category=name))
+                if missing_unit[row]:
+                    issues.append(make_issue("missing_rate_unit", category=name))
@@ -0,0 +1,130 @@
+import os
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.core.metrics import metrics
+from app.core.tracing import span
+from app.models.schemas import POLICY_CHECKLIST_RESPONSE_SCHEMA, PolicyChecklist
+from app.services.jsonrepair import JSONRepairError, parse_json_lenient
+from app.services.llm import LLMService
+from app.services.prompts import (
+    ISSUES_BUDGET_TOKENS, RULES_CONTEXT_BUDGET_TOKENS, bulleted, estimate_tokens, truncate_to_tokens, vendor_data_block,
+)
+from app.services.validator import ComplianceIssue
+
+if TYPE_CHECKING:
+    from app.services.rag import GSARulesRAG
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ("checklist", "negotiation_brief", "client_email")
+
+COMBINED_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "checklist": POLICY_CHECKLIST_RESPONSE_SCHEMA,
+        "negotiation_brief": {"type": "string"},
+        "client_email": {"type": "string"},
+    },
+    "required": list(SECTIONS),
+}
+
+
+def combined_generation_enabled() -> bool:
+    """Default for /analyze when the request does not say; set LLM_COMBINED_GENERATION=1 to enable"""
+    return os.getenv("LLM_COMBINED_GENERATION", "0").lower() in ("1", "true", "yes")
+
+
+class CombinedGenerator:
+    """
+    Generates the checklist, negotiation brief and client email in one structured JSON call,
+    sending the vendor context once instead of three times. Sections missing or invalid in the
+    response are regenerated with the per-section calls, which keep their own fallbacks.
+    """
+
+    def __init__(self, rag: "GSARulesRAG", llm: LLMService):
+        self.rag = rag
+        self.llm = llm
+        self.generation_config = dict(
+            llm.generation_config,
+            max_output_tokens=2048,
+            response_mime_type="application/json",
+            response_schema=COMBINED_RESPONSE_SCHEMA,
+        )
+
+    @staticmethod
+    def _prompt(parsed_data: Dict[str, Any], problems: List[Dict[str, Any]], citations: List[Dict[str, Any]]) -> str:
+        context = "\n\n".join(f"{c['rule_id']}: {c['chunk']}" for c in citations)
+        issues = bulleted([f"- Rule: {p['rule_id']}, Issue: {p['issue']}, Evidence: {p['evidence']}" for p in problems],
+                          ISSUES_BUDGET_TOKENS)
+        return f"""You are a GSA compliance expert and contracting officer. Issues below were detected by the system's rule checker and are attributed to rule IDs with evidence.
+
+SYSTEM-DETECTED COMPLIANCE ISSUES:
+{issues or "None"}
+
+GSA RULES CONTEXT:
+{truncate_to_tokens(context, RULES_CONTEXT_BUDGET_TOKENS) or "None"}
+
+VENDOR DATA:
+{vendor_data_block(parsed_data)}
+
+Return one JSON object with:
+- "checklist": {{"required_ok", "problems", "citations"}} containing ONLY the issues, evidence and rule_ids listed above, and citations for those rule_ids. Do not invent issues.
+- "negotiation_brief": a concise 2-paragraph internal brief (under 200 words) covering the vendor's strengths, then risks and leverage points, naming which GSA rules are satisfied or violated.
+- "client_email": a professional email to the vendor with a subject line that thanks them, lists each missing or incomplete item with its requirement (or congratulates them if there are none) and gives actionable next steps."""
+
+    @staticmethod
+    def _parse(response_text: str) -> Dict[str, Any]:
+        """Validate each section independently so one bad section doesn't discard the others"""
+        try:
+            payload, repaired = parse_json_lenient(response_text)
+        except JSONRepairError as e:
+            logger.error(f"Combined generation returned unusable JSON: {e}")
+            metrics.inc("llm_wasted_calls_total", call="combined")
+            return {}
+        if not isinstance(payload, dict):
+            metrics.inc("llm_wasted_calls_total", call="combined")
+            return {}
+        metrics.inc("llm_structured_output_total", call="combined", outcome="repaired" if repaired else "valid")
+
+        sections = {}
+        try:
+            sections["checklist"] = PolicyChecklist.model_validate(payload.get("checklist")).model_dump()
+        except ValidationError as e:
+            logger.warning(f"Combined checklist failed validation: {e.error_count()} errors")
+        for name in ("negotiation_brief", "client_email"):
+            text = payload.get(name)
+            if isinstance(text, str) and text.strip():
+                sections[name] = text.strip()
+        return sections
+
+    def generate(self, parsed_data: Dict[str, Any], issues: List[ComplianceIssue],
+                 matched: Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+        """
+        Returns the same {"checklist", "brief", "client_email"} analysis as the per-section path;
+        `matched` is match_rules() output computed earlier, e.g. by pre-analysis
+        """
+        problems, citations = matched or self.rag.match_rules(issues)
+        sections: Dict[str, Any] = {}
+        try:
+            prompt = self._prompt(parsed_data, problems, citations)
+            with span("generate", call="combined", prompt_tokens=estimate_tokens(prompt)):
+                response_text = self.llm.provider.generate(prompt, generation_config=self.generation_config)
+            sections = self._parse(response_text)
+            logger.info(f"Combined generation returned sections {sorted(sections)} using {self.llm.provider.name}")
+        except Exception as e:
+            logger.error(f"Combined generation failed: {e}")
+
+        fallback_sections = [name for name in SECTIONS if name not in sections]
+        for name in fallback_sections:
+            metrics.inc("llm_combined_section_fallback_total", section=name)
+
+        if "checklist" in sections:
+            sections["checklist"]["rules_version"] = self.rag.rules_version
+        checklist = sections.get("checklist") or self.rag.build_policy_checklist(parsed_data, issues=issues, matched=(problems, citations))
+        brief = sections.get("negotiation_brief") or self.llm.generate_negotiation_brief(parsed_data, checklist)
+        client_email = sections.get("client_email") or self.llm.generate_client_email(parsed_data, checklist)
+        return {"checklist": checklist, "brief": brief, "client_email": client_email,
+                "fallback_sections": fallback_sections}
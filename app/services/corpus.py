@@ -0,0 +1,212 @@
+import os
+import re
+import json
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CORPUS_EXTENSIONS = (".md", ".txt")
+CHUNK_CHARS = 1200
+CHUNK_OVERLAP_CHARS = 200
+MANIFEST_FILE = "manifest.json"
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$", re.MULTILINE)
+# "R3 Past Performance", "552.238-81 Price Reductions", "I-FSS-599 Electronic Commerce"
+_RULE_HEADING = re.compile(r"^(?P<rule_id>(?:R\d+|\d{3}\.\d{3}-\d+|[A-Z]{1,3}-[A-Z0-9-]+))\b[\s:.\-–]*(?P<title>.*)$")
+_SENTENCE_END = re.compile(r"(?<=[.;:!?])\s+")
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """One retrievable piece of a rules file; chunk_id depends only on source and content"""
+    chunk_id: str
+    text: str
+    rule_id: str
+    title: str
+    category: str
+    source: str
+
+    def metadata(self) -> Dict[str, Any]:
+        return {"chunk_id": self.chunk_id, "rule_id": self.rule_id, "title": self.title,
+                "category": self.category, "source": self.source}
+
+
+def _front_matter(text: str) -> Tuple[Dict[str, str], str]:
+    """`---` delimited `key: value` header (rule_id, title, category) and the remaining body"""
+    if not text.startswith("---\n"):
+        return {}, text
+    end = text.find("\n---", 4)
+    if end == -1:
+        return {}, text
+    fields = {}
+    for line in text[4:end].splitlines():
+        key, sep, value = line.partition(":")
+        if sep:
+            fields[key.strip().lower()] = value.strip().strip("\"'")
+    return fields, text[end + 4:].lstrip("\n")
+
+
+def _sections(body: str) -> Iterator[Tuple[Optional[str], str]]:
+    """(heading, text) for each markdown section; text before the first heading has no heading"""
+    headings = list(_HEADING.finditer(body))
+    if not headings or headings[0].start() > 0:
+        yield None, body[:headings[0].start() if headings else len(body)]
+    for i, match in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(body)
+        yield match.group(2), body[match.end():end]
+
+
+def _pieces(text: str, size: int) -> Iterator[str]:
+    """Paragraphs, falling back to sentences and then hard cuts for anything longer than size"""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = " ".join(paragraph.split())
+        if len(paragraph) <= size:
+            if paragraph:
+                yield paragraph
+            continue
+        for sentence in _SENTENCE_END.split(paragraph):
+            for start in range(0, len(sentence), size):
+                yield sentence[start:start + size]
+
+
+def chunk_text(text: str, size: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP_CHARS) -> List[str]:
+    """
+    Pack paragraphs into chunks of at most about `size` characters. Each chunk after the first
+    starts with the last `overlap` characters of the previous one (cut at a word boundary),
+    so a requirement split across a boundary is still retrievable from either side.
+    """
+    chunks: List[str] = []
+    current = ""
+    for piece in _pieces(text, size):
+        if current and len(current) + 1 + len(piece) > size:
+            chunks.append(current)
+            tail = current[-overlap:] if overlap else ""
+            tail = tail[tail.find(" ") + 1:] if " " in tail and len(current) > overlap else tail
+            current = f"{tail} {piece}" if tail else piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_file(path: Path, root: Path, size: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP_CHARS) -> List[Chunk]:
+    """
+    Chunks of one rules file. Rule metadata comes from front matter, overridden per section by
+    headings that start with a rule or clause number ("R3 ...", "552.238-81 ..."); other
+    headings become the title and keep the file's rule_id.
+    """
+    source = path.relative_to(root).as_posix()
+    fields, body = _front_matter(path.read_text(encoding="utf-8"))
+    default_id = fields.get("rule_id", path.stem)
+    default_title = fields.get("title", path.stem.replace("_", " ").replace("-", " ").title())
+    category = fields.get("category", "general")
+
+    chunks = []
+    for heading, text in _sections(body):
+        rule_id, title = default_id, default_title
+        if heading:
+            match = _RULE_HEADING.match(heading)
+            rule_id, title = (match.group("rule_id"), match.group("title") or heading) if match else (default_id, heading)
+        for piece in chunk_text(text, size, overlap):
+            if heading:
+                piece = f"{heading}: {piece}"
+            digest = hashlib.sha1(f"{source}\x00{piece}".encode()).hexdigest()[:16]
+            chunks.append(Chunk(f"{source}#{digest}", piece, rule_id, title, category, source))
+    # identical text repeated within a file would collide; keep the first
+    return list({c.chunk_id: c for c in chunks}.values())
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@dataclass
+class SyncReport:
+    added: int = 0
+    removed: int = 0
+    unchanged_files: int = 0
+    changed_files: List[str] = field(default_factory=list)
+    deleted_files: List[str] = field(default_factory=list)
+
+
+class CorpusIndexer:
+    """
+    Keeps a vector store in step with a directory of .md/.txt rules files.
+
+    A manifest (file -> content hash and chunk ids) is kept next to the index. sync() skips
+    files whose hash is unchanged and, for changed files, deletes only the chunks that
+    disappeared and adds only new ones, so unchanged text is never re-embedded. The store
+    needs the langchain VectorStore methods add_texts(texts, metadatas, ids) and delete(ids).
+    """
+
+    def __init__(self, corpus_dir: str, store, index_dir: Optional[str] = None,
+                 chunk_chars: int = CHUNK_CHARS, overlap_chars: int = CHUNK_OVERLAP_CHARS):
+        self.root = Path(corpus_dir)
+        self.store = store
+        self.manifest_path = Path(index_dir) / MANIFEST_FILE if index_dir else None
+        self.chunk_chars = chunk_chars
+        self.overlap_chars = overlap_chars
+        self.manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if self.manifest_path and self.manifest_path.exists():
+            try:
+                return json.loads(self.manifest_path.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable corpus manifest {self.manifest_path}: {e}")
+        return {}
+
+    def _save_manifest(self) -> None:
+        if not self.manifest_path:
+            return
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.manifest, indent=1, sort_keys=True))
+        os.replace(tmp, self.manifest_path)
+
+    def files(self) -> List[Path]:
+        return sorted(p for p in self.root.rglob("*") if p.is_file() and p.suffix.lower() in CORPUS_EXTENSIONS)
+
+    def chunks(self) -> Iterator[Chunk]:
+        """Every chunk of the current corpus; chunking is cheap next to embedding"""
+        for path in self.files():
+            yield from chunk_file(path, self.root, self.chunk_chars, self.overlap_chars)
+
+    def sync(self) -> SyncReport:
+        report = SyncReport()
+        seen = set()
+        for path in self.files():
+            source = path.relative_to(self.root).as_posix()
+            seen.add(source)
+            digest = file_hash(path)
+            entry = self.manifest.get(source)
+            if entry and entry["sha256"] == digest:
+                report.unchanged_files += 1
+                continue
+            chunks = chunk_file(path, self.root, self.chunk_chars, self.overlap_chars)
+            old_ids = set(entry["chunk_ids"]) if entry else set()
+            new = [c for c in chunks if c.chunk_id not in old_ids]
+            stale = old_ids - {c.chunk_id for c in chunks}
+            if stale:
+                self.store.delete(ids=sorted(stale))
+            if new:
+                self.store.add_texts([c.text for c in new], metadatas=[c.metadata() for c in new],
+                                     ids=[c.chunk_id for c in new])
+            self.manifest[source] = {"sha256": digest, "chunk_ids": [c.chunk_id for c in chunks]}
+            report.added, report.removed = report.added + len(new), report.removed + len(stale)
+            report.changed_files.append(source)
+        for source in sorted(set(self.manifest) - seen):
+            stale = self.manifest.pop(source)["chunk_ids"]
+            if stale:
+                self.store.delete(ids=stale)
+            report.removed += len(stale)
+            report.deleted_files.append(source)
+        self._save_manifest()
+        logger.info(f"Rules corpus sync: {len(report.changed_files)} changed, {len(report.deleted_files)} deleted, "
+                    f"{report.unchanged_files} unchanged files; +{report.added}/-{report.removed} chunks")
+        return report
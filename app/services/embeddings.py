@@ -0,0 +1,160 @@
+import os
+import gc
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from app.services.incremental import LRUCache
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+MAX_SEQ_LENGTH = 256  # all-MiniLM-L6-v2's own limit
+ONNX_MODEL_FILE = "model_int8.onnx"
+
+
+class OnnxEncoder:
+    """
+    all-MiniLM-L6-v2 on ONNX Runtime, exported and int8 dynamically quantized by
+    export_onnx(). Produces the same mean-pooled, L2-normalized vectors as the
+    sentence-transformers pipeline and exposes the same encode() method.
+    """
+
+    def __init__(self, model_dir: str, threads: int = 1, batch_size: int = 32):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.batch_size = batch_size
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(os.path.join(model_dir, ONNX_MODEL_FILE), options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts: List[str]):
+        import numpy as np
+
+        batches = []
+        for start in range(0, len(texts), self.batch_size):
+            encodings = self.tokenizer.encode_batch(list(texts[start:start + self.batch_size]))
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+            mask = feeds["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None))
+        return np.concatenate(batches) if batches else np.zeros((0, 384), dtype=np.float32)
+
+
+def load_embedding_model(backend: Optional[str] = None):
+    """
+    EMBEDDING_BACKEND selects the encoder: torch (default, sentence-transformers) or onnx
+    (int8 model from EMBEDDING_ONNX_DIR, EMBEDDING_THREADS intra-op threads, batches of
+    EMBEDDING_BATCH_SIZE).
+    """
+    backend = (backend or os.getenv("EMBEDDING_BACKEND", "torch")).lower()
+    if backend == "onnx":
+        return OnnxEncoder(os.getenv("EMBEDDING_ONNX_DIR", "models/minilm-onnx"),
+                           threads=int(os.getenv("EMBEDDING_THREADS", "1")),
+                           batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "32")))
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(EMBEDDING_MODEL_NAME)
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+def export_onnx(output_dir: str, model_name: str = EMBEDDING_MODEL_NAME) -> str:
+    """Export the transformer to ONNX and quantize its weights to int8; returns the model path"""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(output_dir, exist_ok=True)
+    transformer = SentenceTransformer(model_name, device="cpu")[0]
+    transformer.tokenizer.save_pretrained(output_dir)  # writes tokenizer.json
+    sample = transformer.tokenizer(["export sample"], return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    torch.onnx.export(
+        transformer.auto_model, tuple(sample[n] for n in names), fp32_path,
+        input_names=names, output_names=["last_hidden_state"], opset_version=14,
+        dynamic_axes={n: {0: "batch", 1: "sequence"} for n in names + ["last_hidden_state"]},
+    )
+    int8_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+    return int8_path
+
+_model = None
+_model_lock = threading.Lock()
+# Vectors for rule/corpus texts; filled before fork in preload mode so workers inherit them.
+# Bounded: corpus chunks are embedded once into the vector store and rarely needed again.
+_document_vectors = LRUCache(int(os.getenv("EMBEDDING_DOCUMENT_CACHE_SIZE", "2048")))
+
+
+def get_embedding_model():
+    """Process-wide encoder (see load_embedding_model); every CustomEmbeddings instance shares it"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = load_embedding_model()
+            logger.info(f"Loaded embedding model {EMBEDDING_MODEL_NAME} ({type(_model).__name__})")
+        return _model
+
+
+def embed_documents(texts: List[str]) -> List[List[float]]:
+    """Embed corpus texts, encoding only the ones not already cached (in one batch)"""
+    vectors: Dict[str, List[float]] = {}
+    for text in texts:
+        if text not in vectors:
+            cached = _document_vectors.get(text)
+            if cached is not None:
+                vectors[text] = cached
+    missing = [t for t in dict.fromkeys(texts) if t not in vectors]
+    if missing:
+        for text, vector in zip(missing, get_embedding_model().encode(missing).tolist()):
+            vectors[text] = vector
+            _document_vectors.put(text, vector)
+    return [vectors[t] for t in texts]
+
+
+def preload(texts: Optional[Iterable[str]] = None) -> None:
+    """
+    Load the embedding model and embed `texts` (the built-in rules by default) in the current
+    process, then move everything allocated so far into the permanent GC generation.
+
+    Meant for a pre-fork server master (see gunicorn.conf.py): workers forked afterwards share
+    the weights and vectors copy-on-write, and gc.freeze() keeps the collector from touching
+    those objects' headers and un-sharing the pages.
+    """
+    # Tokenizer thread pools started before fork deadlock or warn in the children
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    if texts is None:
+        from app.services.rag import GSA_RULES
+        texts = [rule["text"] for rule in GSA_RULES]
+    embed_documents(list(texts))
+    # Vector store and LLM client modules are imported once here rather than in every worker
+    for module in ("langchain.schema", "langchain_community.vectorstores"):
+        try:
+            __import__(module)
+        except ImportError:
+            logger.warning(f"Preload skipped {module}: not installed")
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Preloaded embedding model and {len(_document_vectors)} document vectors; "
+                f"{gc.get_freeze_count()} objects frozen")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Export the embedding model as an int8 ONNX model for EMBEDDING_BACKEND=onnx")
+    parser.add_argument("--output", default="models/minilm-onnx")
+    print(export_onnx(parser.parse_args().output))
@@ -0,0 +1,171 @@
+import os
+import time
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionError(ValueError):
+    """The upload could not be turned into text"""
+
+
+class UnsupportedFileType(ExtractionError):
+    pass
+
+
+class ExtractionLimitExceeded(ExtractionError):
+    pass
+
+
+@dataclass(frozen=True)
+class ExtractionLimits:
+    max_bytes: int = 20 * 2**20
+    max_chars: int = 2_000_000
+    max_segments: int = 5_000  # pages, paragraphs or rows
+    timeout_s: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "ExtractionLimits":
+        return cls(
+            max_bytes=int(os.getenv("EXTRACT_MAX_BYTES", cls.max_bytes)),
+            max_chars=int(os.getenv("EXTRACT_MAX_CHARS", cls.max_chars)),
+            max_segments=int(os.getenv("EXTRACT_MAX_SEGMENTS", cls.max_segments)),
+            timeout_s=float(os.getenv("EXTRACT_TIMEOUT_S", cls.timeout_s)),
+        )
+
+
+@dataclass(frozen=True)
+class ExtractedText:
+    text: str
+    kind: str
+    segments: int
+    truncated: bool  # stopped at max_chars / max_segments; the text is a prefix of the document
+
+
+def _pdf_segments(path: str) -> Iterator[str]:
+    from pypdf import PdfReader
+    for page in PdfReader(path).pages:  # pages are parsed lazily, one at a time
+        yield page.extract_text() or ""
+
+
+def _docx_segments(path: str) -> Iterator[str]:
+    from docx import Document
+    document = Document(path)
+    for paragraph in document.paragraphs:
+        yield paragraph.text
+    for table in document.tables:
+        for row in table.rows:
+            yield _row_text(cell.text for cell in row.cells)
+
+
+def _xlsx_segments(path: str) -> Iterator[str]:
+    from openpyxl import load_workbook
+    # read_only streams rows from the XML instead of building the whole workbook in memory
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            for row in sheet.iter_rows(values_only=True):
+                yield _row_text(row)
+    finally:
+        workbook.close()
+
+
+def _text_segments(path: str) -> Iterator[str]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+def _row_text(cells) -> str:
+    """One table row as 'a, b, c', the shape parse_pricing_sheet reads; commas inside cells are dropped"""
+    return ", ".join(str(c).replace(",", "").strip() for c in cells if c is not None and str(c).strip())
+
+
+EXTRACTORS: Dict[str, Callable[[str], Iterator[str]]] = {
+    ".pdf": _pdf_segments,
+    ".docx": _docx_segments,
+    ".xlsx": _xlsx_segments,
+    ".xlsm": _xlsx_segments,
+    ".txt": _text_segments,
+    ".csv": _text_segments,
+    ".md": _text_segments,
+}
+
+
+def extract_file(path: str, suffix: str, limits: ExtractionLimits) -> ExtractedText:
+    """
+    Pull text out of one file segment by segment (page, paragraph or row), stopping at the
+    character and segment caps, and give up once the time budget is spent. Runs in a pool worker.
+    """
+    extractor = EXTRACTORS.get(suffix.lower())
+    if extractor is None:
+        raise UnsupportedFileType(f"Unsupported file type {suffix or '(none)'}; expected one of {', '.join(EXTRACTORS)}")
+    deadline = time.monotonic() + limits.timeout_s
+    parts, chars, count, truncated = [], 0, 0, False
+    for segment in extractor(path):
+        if time.monotonic() > deadline:
+            raise ExtractionLimitExceeded(f"Extraction took longer than {limits.timeout_s:g}s")
+        if count >= limits.max_segments or chars + len(segment) > limits.max_chars:
+            truncated = True
+            break
+        parts.append(segment)
+        chars += len(segment) + 1
+        count += 1
+    return ExtractedText("\n".join(parts), suffix.lower().lstrip("."), count, truncated)
+
+
+class ExtractionPool:
+    """
+    Process pool for extraction, so PDF/Office parsing neither blocks the event loop nor holds
+    the GIL. Workers stop cooperatively at the time budget; a worker stuck inside a single page
+    past timeout + grace gets the pool recycled so it cannot keep a slot forever.
+    """
+
+    GRACE_S = 5.0
+
+    def __init__(self, workers: int = 2, limits: Optional[ExtractionLimits] = None):
+        self.workers = workers
+        self.limits = limits or ExtractionLimits.from_env()
+        self._executor = self._new_executor()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn: forking a threaded server process is unsafe, and children only need this module
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def extract(self, path: str, suffix: str) -> ExtractedText:
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        future = loop.run_in_executor(executor, extract_file, path, suffix, self.limits)
+        try:
+            return await asyncio.wait_for(future, self.limits.timeout_s + self.GRACE_S)
+        except asyncio.TimeoutError:
+            logger.warning(f"Extraction of {path} hung past its deadline; recycling the pool")
+            self._recycle(executor)
+            raise ExtractionLimitExceeded(f"Extraction took longer than {self.limits.timeout_s:g}s")
+        except BrokenProcessPool:
+            self._recycle(executor)
+            raise ExtractionError("Extraction worker crashed or was stopped")
+        except asyncio.CancelledError:
+            # Queued work is cancelled when its pool is recycled; only a cancelled request propagates
+            if asyncio.current_task().cancelling():
+                raise
+            raise ExtractionError("Extraction was cancelled because its worker pool was recycled")
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """Replace `executor` if it is still the live pool; callers of an already replaced pool do nothing"""
+        if self._executor is not executor:
+            return
+        self._executor = self._new_executor()
+        # ProcessPoolExecutor cannot cancel a running task; terminate its processes instead
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,156 @@
+import json
+import hashlib
+import datetime
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.services.validator import ComplianceIssue, HybridValidator
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ("company", "past_performance", "pricing")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    return str(value)
+
+
+def content_hash(*parts: Any) -> str:
+    """Stable SHA-256 over strings, parsed records or JSON-serializable values"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, default=_json_default, separators=(",", ":"))
+        digest.update(part.encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def package_hash(vendor_id: Optional[str], documents) -> str:
+    """Canonical hash of a submitted package: vendor plus each document's name, type hint and text, in order"""
+    parts = [vendor_id or ""]
+    for doc in documents:
+        parts.extend((doc.name or "", doc.type_hint or "", doc.text))
+    return content_hash(*parts)
+
+
+class LRUCache:
+    """Small thread-safe LRU map with hit/miss counters"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+@dataclass
+class DocumentResult:
+    """Classification, parse and redaction output for one document, reusable while its text is unchanged"""
+    doc_type: str
+    parsed: Any = None
+    # One (redacted_model, pii_hashes) pair per parsed record
+    redacted: List[Tuple[Any, Dict[str, Any]]] = field(default_factory=list)
+
+
+class IncrementalCache:
+    """
+    Content-hash keyed caches so a re-submitted package only reprocesses what changed.
+
+    Documents are keyed by vendor and text hash; validator issues by section content hash;
+    full analysis results (checklist, brief, email) by the hash of the whole parsed package,
+    and only reused while the rules version they were computed against is still live.
+    """
+
+    def __init__(self, max_documents: int = 4096, max_sections: int = 4096, max_analyses: int = 512):
+        self.documents = LRUCache(max_documents)
+        self.sections = LRUCache(max_sections)
+        self.analyses = LRUCache(max_analyses)
+
+    @staticmethod
+    def document_key(vendor_id: Optional[str], text: str, type_hint: Optional[str]) -> Tuple[str, str]:
+        return vendor_id or "", content_hash(type_hint or "", text)
+
+    def get_document(self, key: Tuple[str, str]) -> Optional[DocumentResult]:
+        return self.documents.get(key)
+
+    def put_document(self, key: Tuple[str, str], result: DocumentResult) -> None:
+        self.documents.put(key, result)
+
+    def validate(self, parsed_data: Dict[str, Any]) -> Tuple[List[ComplianceIssue], List[str]]:
+        """
+        Validate section by section, reusing cached issues for unchanged sections.
+        Returns (issues in validate_all_data order, names of recomputed sections).
+        """
+        issues: List[ComplianceIssue] = []
+        recomputed = []
+        for section in SECTIONS:
+            data = parsed_data.get(section)
+            # Recency rules depend on today's date, so issues are only reused within the same day
+            key = (section, datetime.date.today().isoformat(), content_hash(data))
+            section_issues = self.sections.get(key)
+            if section_issues is None:
+                section_issues = HybridValidator.validate_section(section, data)
+                self.sections.put(key, section_issues)
+                recomputed.append(section)
+            issues.extend(section_issues)
+        logger.info(f"Incremental validation: recomputed sections {recomputed or 'none'}")
+        return issues, recomputed
+
+    def get_analysis(self, package_hash: str, rules_version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Cached analysis, unless its checklist was computed against another rules version"""
+        analysis = self.analyses.get(package_hash)
+        if analysis is not None and rules_version is not None and analysis["checklist"].get("rules_version") != rules_version:
+            return None
+        return analysis
+
+    def put_analysis(self, package_hash: str, analysis: Dict[str, Any]) -> bool:
+        """
+        Cache an analysis unless any part of it is a fallback (services mark those with a
+        `fallback` flag), so a provider outage is not replayed after the provider recovers.
+        """
+        checklist = analysis.get("checklist") or {}
+        if checklist.get("fallback") or any(getattr(analysis.get(name), "fallback", False) for name in ("brief", "client_email")):
+            logger.info("Analysis contains fallback output; not caching it")
+            return False
+        self.analyses.put(package_hash, analysis)
+        return True
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "documents": self.documents.stats(),
+            "sections": self.sections.stats(),
+            "analyses": self.analyses.stats(),
+        }
@@ -0,0 +1,235 @@
+import os
+import json
+import time
+import uuid
+import heapq
+import socket
+import sqlite3
+import logging
+import ipaddress
+import threading
+import urllib.parse
+import urllib.request
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+CALLBACK_TIMEOUT_S = 10
+
+
+@dataclass
+class Job:
+    """One queued unit of work; lower priority numbers run first"""
+    job_id: str
+    payload: Dict[str, Any]
+    priority: int = 5
+    status: str = QUEUED
+    callback_url: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    callback_status: Optional[str] = None
+
+    def public(self) -> Dict[str, Any]:
+        """Status view for API responses, without the internal payload"""
+        data = asdict(self)
+        data.pop("payload")
+        return data
+
+
+class MemoryJobStore:
+    """Default store: jobs live as long as the process"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def pending(self) -> List[Job]:
+        return []
+
+
+class SQLiteJobStore:
+    """
+    Persists jobs to a local SQLite file so queued work survives a restart: jobs that were
+    queued or running when the process stopped are handed back to the queue on startup.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, status TEXT NOT NULL, data TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, status, data) VALUES (?, ?, ?)",
+                (job.job_id, job.status, json.dumps(asdict(job), default=str)),
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return Job(**json.loads(row[0])) if row else None
+
+    def pending(self) -> List[Job]:
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)).fetchall()
+        jobs = [Job(**json.loads(row[0])) for row in rows]
+        for job in jobs:
+            job.status, job.started_at = QUEUED, None
+        return jobs
+
+
+class CallbackURLError(ValueError):
+    """The callback URL points somewhere the server must not send requests"""
+
+
+def validate_callback_url(url: str) -> None:
+    """
+    Callbacks go to http(s) only. With CALLBACK_ALLOWED_HOSTS (comma-separated) set, the host
+    must be listed; otherwise every address it resolves to must be public, so a client cannot
+    make the server call loopback, private, link-local or cloud metadata addresses.
+    """
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise CallbackURLError("Callback URL must be an absolute http or https URL")
+    host = parts.hostname.lower()
+    allowed = {h.strip().lower() for h in os.getenv("CALLBACK_ALLOWED_HOSTS", "").split(",") if h.strip()}
+    if allowed:
+        if host not in allowed:
+            raise CallbackURLError(f"Callback host {host} is not in CALLBACK_ALLOWED_HOSTS")
+        return
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parts.port or 443, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError, ValueError) as e:
+        raise CallbackURLError(f"Cannot resolve callback host {host}: {e}")
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%")[0])
+        if getattr(ip, "ipv4_mapped", None):
+            ip = ip.ipv4_mapped
+        if not ip.is_global:
+            raise CallbackURLError(f"Callback host {host} resolves to non-public address {address}")
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """A redirect would bypass validate_callback_url, so it is treated as a failure"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_callback_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def post_callback(url: str, body: Dict[str, Any]) -> str:
+    """POST the finished job as JSON; returns a short status string instead of raising"""
+    try:
+        # Checked again at delivery: DNS may have changed since the job was queued
+        validate_callback_url(url)
+    except CallbackURLError as e:
+        logger.warning(f"Job callback to {url} refused: {e}")
+        return f"refused ({e})"
+    request = urllib.request.Request(url, data=json.dumps(body, default=str).encode(),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with _callback_opener.open(request, timeout=CALLBACK_TIMEOUT_S) as response:
+            return f"delivered ({response.status})"
+    except Exception as e:
+        logger.warning(f"Job callback to {url} failed: {e}")
+        return f"failed ({e})"
+
+
+class JobQueue:
+    """
+    In-process priority queue served by a fixed pool of worker threads, so at most
+    `workers` jobs run concurrently. runner(payload) returns the job result.
+    """
+
+    def __init__(self, runner: Callable[[Dict[str, Any]], Dict[str, Any]], workers: int = 2, store=None):
+        self.runner = runner
+        self.store = store or MemoryJobStore()
+        self._heap: List[tuple] = []
+        self._sequence = 0
+        self._cond = threading.Condition()
+        self._stopping = False
+        for job in self.store.pending():
+            logger.info(f"Requeueing job {job.job_id} from {type(self.store).__name__}")
+            self._push(job)
+        self._threads = [threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True) for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def _push(self, job: Job) -> None:
+        with self._cond:
+            # sequence keeps FIFO order within a priority
+            heapq.heappush(self._heap, (job.priority, self._sequence, job))
+            self._sequence += 1
+            self._cond.notify()
+
+    def submit(self, payload: Dict[str, Any], priority: int = 5, callback_url: Optional[str] = None) -> Job:
+        job = Job(job_id=str(uuid.uuid4()), payload=payload, priority=priority, callback_url=callback_url)
+        self.store.save(job)
+        self._push(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def depth(self) -> int:
+        return len(self._heap)
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                _, _, job = heapq.heappop(self._heap)
+            self._run(job)
+
+    def _run(self, job: Job) -> None:
+        job.status, job.started_at = RUNNING, time.time()
+        self.store.save(job)
+        try:
+            job.result = self.runner(job.payload)
+            job.status = SUCCEEDED
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}")
+            job.status, job.error = FAILED, str(e)
+        job.finished_at = time.time()
+        self.store.save(job)
+        logger.info(f"Job {job.job_id} {job.status} in {job.finished_at - job.started_at:.2f}s")
+        if job.callback_url:
+            job.callback_status = post_callback(job.callback_url, job.public())
+            self.store.save(job)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+
+def store_from_env():
+    """JOB_DB_PATH selects SQLite persistence; otherwise jobs are kept in memory"""
+    path = os.getenv("JOB_DB_PATH")
+    return SQLiteJobStore(path) if path else MemoryJobStore()
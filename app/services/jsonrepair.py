@@ -0,0 +1,84 @@
+import json
+import re
+from typing import Any, Optional, Tuple
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class JSONRepairError(ValueError):
+    pass
+
+
+def _strip_fences(text: str) -> str:
+    match = _FENCE.search(text)
+    return match.group(1) if match else text
+
+
+def _scan(text: str) -> Tuple[str, Optional[str]]:
+    """
+    Single pass from the first bracket. Returns (complete top-level value, None) when it closes,
+    otherwise (truncated text, repaired text) where the repair cuts back to the last point at
+    which every value was complete and closes the brackets still open there.
+    """
+    start = min((i for i in (text.find("{"), text.find("[")) if i != -1), default=-1)
+    if start == -1:
+        raise JSONRepairError("No JSON object or array found")
+    stack = []              # open brackets
+    after_colon = []        # per open bracket: inside an object member's value
+    safe_end, safe_stack = start, ()
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+                # A closed string is a complete value unless it is an object key
+                if stack[-1] == "[" or after_colon[-1]:
+                    safe_end, safe_stack = i + 1, tuple(stack)
+        elif ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(ch)
+            after_colon.append(False)
+            safe_end, safe_stack = i + 1, tuple(stack)
+        elif ch in "}]":
+            if not stack:
+                break
+            stack.pop()
+            after_colon.pop()
+            if not stack:
+                return text[start:i + 1], None
+            safe_end, safe_stack = i + 1, tuple(stack)
+        elif ch == ":":
+            after_colon[-1] = True
+        elif ch == ",":
+            # Everything before a separator is complete (this also covers numbers and literals)
+            safe_end, safe_stack = i, tuple(stack)
+            after_colon[-1] = False
+    return text[start:], text[start:safe_end] + "".join(_CLOSERS[b] for b in reversed(safe_stack))
+
+
+def parse_json_lenient(text: str) -> Tuple[Any, bool]:
+    """
+    Parse an LLM's JSON answer, tolerating markdown fences, surrounding prose, trailing
+    commas and truncated output. Returns (value, repaired) where repaired says the text
+    was not valid JSON as-is. Raises JSONRepairError if nothing usable can be recovered.
+    """
+    text = text.strip()
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError:
+        pass
+
+    complete, repaired = _scan(_strip_fences(text))
+    candidate = _TRAILING_COMMA.sub(r"\1", repaired if repaired is not None else complete)
+    try:
+        return json.loads(candidate), True
+    except json.JSONDecodeError as e:
+        raise JSONRepairError(f"Could not repair JSON: {e}") from e
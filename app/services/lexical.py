@@ -0,0 +1,109 @@
+import re
+import math
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Identifiers stay whole ("552.238-115", "invalid_duns_format", "54151s") and are also indexed
+# by their parts, so "duns" still finds a chunk that only mentions "invalid_duns_format".
+_TOKEN = re.compile(r"[a-z0-9]+(?:[._\-/][a-z0-9]+)*")
+_PART = re.compile(r"[a-z0-9]+")
+# Queries made only of these need no embedding: clause numbers, NAICS/SIN codes, rule and issue ids
+_IDENTIFIER = re.compile(r"^(?:\d{3}\.\d{3}-\d+|\d{5,6}[a-z]?|r\d+|[a-z][a-z0-9]*(?:_[a-z0-9]+)+|[a-z]{1,4}-[a-z0-9-]+)$")
+
+STOPWORDS = frozenset("a an and are as at be by for from has have in is it must of on or shall that the this to with".split())
+
+
+def tokenize(text: str) -> List[str]:
+    terms = []
+    for token in _TOKEN.findall(text.lower()):
+        parts = _PART.findall(token)
+        if len(parts) > 1:
+            terms.append(token)
+        terms.extend(p for p in parts if p not in STOPWORDS)
+    return terms
+
+
+def is_identifier_query(query: str) -> bool:
+    """True when every word of the query is an exact identifier (clause number, code, snake_case id)"""
+    words = query.lower().split()
+    return bool(words) and all(_IDENTIFIER.match(w.strip(",;()")) for w in words)
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an in-memory inverted index. Documents can be added and removed one at a
+    time so the index follows incremental corpus syncs; scoring only touches the postings of
+    the query's terms.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.lengths: Dict[str, int] = {}
+        self.documents: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            if doc_id in self.documents:
+                self._remove(doc_id)
+            counts = Counter(tokenize(text))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, {})[doc_id] = tf
+            length = sum(counts.values())
+            self.lengths[doc_id] = length
+            self._total_length += length
+            self.documents[doc_id] = (text, metadata or {})
+
+    def add_many(self, items: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+        for doc_id, text, metadata in items:
+            self.add(doc_id, text, metadata)
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        if doc_id not in self.documents:
+            return
+        text, _ = self.documents.pop(doc_id)
+        for term in set(tokenize(text)):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+        self._total_length -= self.lengths.pop(doc_id)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, score) pairs; documents sharing no term with the query are never returned"""
+        with self._lock:
+            n = len(self.documents)
+            if not n:
+                return []
+            avg_length = self._total_length / n
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, tf in docs.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Merge ranked id lists by sum of 1 / (k + rank); ids missing from a list just get no share of it"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
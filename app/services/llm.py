@@ -1,31 +1,33 @@
-import os
-import google.generativeai as genai
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 import logging
-from dotenv import load_dotenv
+from app.core.tracing import span
+from app.services.providers import LLMProvider, get_shared_provider
+from app.services.prompts import ISSUES_BUDGET_TOKENS, bulleted, estimate_tokens, summarize_past_performance, summarize_pricing
 
-load_dotenv()
 logger = logging.getLogger(__name__)
 
-# Configure Gemini
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+
+class FallbackText(str):
+    """Placeholder text returned when the LLM call failed; analyses containing it are not cached"""
+    fallback = True
+
 
 class LLMService:
-    """Production LLM service using direct Google GenAI"""
+    """Production LLM service on a pluggable provider (Gemini by default)"""
     
-    def __init__(self):
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+    def __init__(self, provider: Optional[LLMProvider] = None):
+        self.provider = provider or get_shared_provider()
         
         # Configure generation parameters
-        self.generation_config = genai.types.GenerationConfig(
+        self.generation_config = dict(
             temperature=0.3,
             top_p=0.8,
             top_k=40,
             max_output_tokens=1024
         )
     
-    def generate_negotiation_brief(self, parsed_data: Dict[str, Any], checklist: Dict[str, Any]) -> str:
-        """Generate negotiation prep brief using Gemini"""
+    def _brief_prompt(self, parsed_data: Dict[str, Any], checklist: Dict[str, Any]) -> Tuple[str, str]:
+        """Build the negotiation brief prompt; returns (prompt, company_name)"""
         
         company = parsed_data.get("company", {})
         company_name = company.get("company_name", "Unknown Vendor")
@@ -33,18 +35,18 @@ class LLMService:
         past_performance = parsed_data.get("past_performance", [])
         pricing = parsed_data.get("pricing", {})
         
-        problems_text = "\n".join([
+        problems_text = bulleted([
             f"- {p['issue'].replace('_', ' ').title()}: {p['evidence']} (Rule {p['rule_id']})"
             for p in checklist.get("problems", [])
-        ]) or "No major compliance issues identified."
+        ], ISSUES_BUDGET_TOKENS) or "No major compliance issues identified."
         
         prompt = f"""You are a GSA procurement specialist preparing a negotiation brief. Analyze the vendor's submission and compliance status.
 
 VENDOR DATA:
 Company: {company_name}
 NAICS Codes: {naics_codes or 'Not provided'}
-Past Performance: {len(past_performance)} contracts submitted
-Pricing Provided: {'Yes - Labor categories included' if pricing and pricing.get("labor_categories") else 'No - Missing or incomplete'}
+Past Performance: {summarize_past_performance(past_performance)}
+Pricing: {summarize_pricing(pricing)}
 
 COMPLIANCE ISSUES:
 {problems_text}
@@ -56,23 +58,38 @@ Generate a concise 2-paragraph negotiation brief covering:
 Write in professional tone suitable for internal GSA team review. Focus on actionable insights for negotiations.
 
 Be specific about which GSA rules are satisfied or violated. Keep it under 200 words total."""
+        return prompt, company_name
+
+    @staticmethod
+    def _brief_fallback(company_name: str, checklist: Dict[str, Any]) -> str:
+        return FallbackText(f"""**Negotiation Brief Error**: Unable to generate brief using AI. 
+            
+**Manual Review Required**: Company {company_name} has {len(checklist.get('problems', []))} compliance issues that need review. Please analyze vendor data manually and prepare negotiation strategy based on GSA requirements R1-R5.""")
+
+    def generate_negotiation_brief(self, parsed_data: Dict[str, Any], checklist: Dict[str, Any]) -> str:
+        """Generate negotiation prep brief using the LLM provider"""
+        prompt, company_name = self._brief_prompt(parsed_data, checklist)
         
         try:
-            response = self.model.generate_content(
-                prompt, 
-                generation_config=self.generation_config
-            )
-            logger.info("Generated negotiation brief using Gemini")
-            return response.text.strip()
+            with span("generate", call="brief", prompt_tokens=estimate_tokens(prompt)):
+                response_text = self.provider.generate(
+                    prompt, 
+                    generation_config=self.generation_config
+                )
+            logger.info(f"Generated negotiation brief using {self.provider.name}")
+            return response_text.strip()
             
         except Exception as e:
             logger.error(f"Error generating negotiation brief: {e}")
-            return f"""**Negotiation Brief Error**: Unable to generate brief using AI. 
-            
-**Manual Review Required**: Company {company_name} has {len(checklist.get('problems', []))} compliance issues that need review. Please analyze vendor data manually and prepare negotiation strategy based on GSA requirements R1-R5."""
+            return self._brief_fallback(company_name, checklist)
+
+    def stream_negotiation_brief(self, parsed_data: Dict[str, Any], checklist: Dict[str, Any]) -> Iterator[str]:
+        """Stream the negotiation brief as text chunks"""
+        prompt, company_name = self._brief_prompt(parsed_data, checklist)
+        yield from self._stream(prompt, "negotiation brief", lambda e: self._brief_fallback(company_name, checklist))
     
-    def generate_client_email(self, parsed_data: Dict[str, Any], checklist: Dict[str, Any]) -> str:
-        """Generate polite client email using Gemini"""
+    def _email_prompt(self, parsed_data: Dict[str, Any], checklist: Dict[str, Any]) -> Tuple[str, str]:
+        """Build the client email prompt; returns (prompt, company_name)"""
         
         company = parsed_data.get("company", {})
         company_name = company.get("company_name", "Vendor")
@@ -85,7 +102,7 @@ Be specific about which GSA rules are satisfied or violated. Keep it under 200 w
             for p in problems:
                 issue_friendly = p['issue'].replace('_', ' ').title()
                 issues_list.append(f"-  {issue_friendly}: {p['evidence']}")
-            issues_summary = "\n".join(issues_list)
+            issues_summary = bulleted(issues_list, ISSUES_BUDGET_TOKENS)
         
         prompt = f"""You are a GSA contracting officer. Write a professional email to a vendor about their submission status.
 
@@ -104,18 +121,11 @@ Generate a professional email that:
 6. Includes appropriate subject line
 
 Keep it concise but thorough. Use GSA's professional communication style."""
-        
-        try:
-            response = self.model.generate_content(
-                prompt, 
-                generation_config=self.generation_config
-            )
-            logger.info("Generated client email using Gemini")
-            return response.text.strip()
-            
-        except Exception as e:
-            logger.error(f"Error generating client email: {e}")
-            return f"""Subject: Submission Status - {company_name}
+        return prompt, company_name
+
+    @staticmethod
+    def _email_fallback(company_name: str, error: Exception) -> str:
+        return FallbackText(f"""Subject: Submission Status - {company_name}
 
 Dear {company_name} Team,
 
@@ -126,19 +136,62 @@ Please contact our procurement office directly for manual review of your submiss
 Best regards,
 GSA Evaluation Team
             
-[Error: {str(e)}]"""
+[Error: {str(error)}]""")
+
+    def generate_client_email(self, parsed_data: Dict[str, Any], checklist: Dict[str, Any]) -> str:
+        """Generate polite client email using the LLM provider"""
+        prompt, company_name = self._email_prompt(parsed_data, checklist)
+        
+        try:
+            with span("generate", call="email", prompt_tokens=estimate_tokens(prompt)):
+                response_text = self.provider.generate(
+                    prompt, 
+                    generation_config=self.generation_config
+                )
+            logger.info(f"Generated client email using {self.provider.name}")
+            return response_text.strip()
+            
+        except Exception as e:
+            logger.error(f"Error generating client email: {e}")
+            return self._email_fallback(company_name, e)
+
+    def stream_client_email(self, parsed_data: Dict[str, Any], checklist: Dict[str, Any]) -> Iterator[str]:
+        """Stream the client email as text chunks"""
+        prompt, company_name = self._email_prompt(parsed_data, checklist)
+        yield from self._stream(prompt, "client email", lambda e: self._email_fallback(company_name, e))
+
+    def _stream(self, prompt: str, label: str, fallback: Callable[[Exception], str]) -> Iterator[str]:
+        """
+        Stream provider output. If it fails before any text was sent, emit the fallback (a FallbackText)
+        instead; a failure after that is re-raised, since the text so far is incomplete.
+        """
+        started = False
+        try:
+            for chunk in self.provider.stream(prompt, generation_config=self.generation_config):
+                if not started:
+                    chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                started = True
+                yield chunk
+            logger.info(f"Streamed {label} using {self.provider.name}")
+        except Exception as e:
+            logger.error(f"Error streaming {label}: {e}")
+            if started:
+                raise
+            yield fallback(e)
     
     def test_connection(self) -> Dict[str, Any]:
-        """Test Gemini API connection"""
+        """Test LLM provider connection"""
         try:
-            response = self.model.generate_content("Hello, this is a test. Please respond with 'API connection successful'.")
+            response_text = self.provider.generate("Hello, this is a test. Please respond with 'API connection successful'.")
             return {
                 "status": "success",
-                "message": "Gemini API connected successfully",
-                "response": response.text.strip()
+                "message": f"{self.provider.describe()} connected successfully",
+                "response": response_text.strip()
             }
         except Exception as e:
             return {
                 "status": "error", 
-                "message": f"Gemini API connection failed: {str(e)}"
+                "message": f"{self.provider.describe()} connection failed: {str(e)}"
             }
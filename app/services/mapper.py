@@ -1,3 +1,17 @@
+import os
+import csv
+import math
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CROSSWALK_PATH = Path(__file__).resolve().parent.parent / "data" / "naics_sin_crosswalk.csv"
+
+# Exact 6-digit mappings from the rules pack (R2); always present even with a custom crosswalk
 NAICS_TO_SIN = {
     "541511": "54151S",
     "541512": "54151S",
@@ -5,12 +19,153 @@ NAICS_TO_SIN = {
     "518210": "518210C",
 }
 
+
+@dataclass(frozen=True)
+class SinMatch:
+    sin: str
+    title: str
+    matched_naics: str
+    weight: float
+    reason: str
+
+    @property
+    def exact(self) -> bool:
+        return len(self.matched_naics) == 6
+
+
+class _Node:
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.entries: Tuple[Tuple[str, str, float], ...] = ()
+
+
+def _parse_weight(value: Optional[str]) -> Optional[float]:
+    """Crosswalk weight; blank means 1, anything non-numeric is None"""
+    if value is None or not value.strip():
+        return 1.0
+    try:
+        weight = float(value)
+    except ValueError:
+        return None
+    return weight if math.isfinite(weight) else None
+
+
+class NaicsSinIndex:
+    """
+    Digit trie over the NAICS -> SIN crosswalk. Rows may name a full 6-digit code or a
+    2-5 digit prefix that rolls up every code beneath it, and a code can map to several
+    SINs. A lookup walks at most six nodes and ranks the SINs found on the path: more
+    specific matches first, then by crosswalk weight.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str, str, float]]):
+        self._root = _Node()
+        self.size = 0
+        for naics, sin, title, weight in rows:
+            node = self._root
+            for digit in naics:
+                node = node.children.setdefault(digit, _Node())
+            node.entries = tuple(sorted(node.entries + ((sin, title, weight),), key=lambda e: -e[2]))
+            self.size += 1
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "NaicsSinIndex":
+        """Columns naics, sin, sin_title, weight (optional, default 1); malformed rows are skipped"""
+        rows = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                naics = (row.get("naics") or "").strip()
+                sin = (row.get("sin") or "").strip()
+                weight = _parse_weight(row.get("weight"))
+                if not (naics.isdigit() and 2 <= len(naics) <= 6 and sin and weight is not None):
+                    logger.warning(f"Skipping crosswalk row {line} in {path}: {row}")
+                    continue
+                rows.append((naics, sin, (row.get("sin_title") or "").strip(), weight))
+        for naics, sin in NAICS_TO_SIN.items():
+            if not any(r[0] == naics and r[1] == sin for r in rows):
+                rows.append((naics, sin, "", 1.0))
+        return cls(rows)
+
+    def lookup(self, code: str) -> List[SinMatch]:
+        """Ranked SINs for one NAICS code, each with why it matched; [] for unknown or malformed codes"""
+        code = str(code).strip()
+        if not (code.isdigit() and 2 <= len(code) <= 6):
+            return []
+        path: List[Tuple[str, _Node]] = []
+        node = self._root
+        for depth, digit in enumerate(code, start=1):
+            node = node.children.get(digit)
+            if node is None:
+                break
+            if node.entries:
+                path.append((code[:depth], node))
+        matches: List[SinMatch] = []
+        seen = set()
+        for prefix, node in reversed(path):  # most specific first
+            for sin, title, weight in node.entries:
+                if sin in seen:
+                    continue
+                seen.add(sin)
+                reason = (f"NAICS {code} is listed under SIN {sin}" if prefix == code
+                          else f"NAICS {code} falls under {len(prefix)}-digit group {prefix}, which rolls up to SIN {sin}")
+                matches.append(SinMatch(sin, title, prefix, weight, reason))
+        return matches
+
+
+def _rank(match: SinMatch) -> Tuple[int, float, str]:
+    return -len(match.matched_naics), -match.weight, match.sin
+
+
+_index: Optional[NaicsSinIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> NaicsSinIndex:
+    """Crosswalk from NAICS_SIN_CROSSWALK_PATH (default app/data/naics_sin_crosswalk.csv), loaded once"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            path = Path(os.getenv("NAICS_SIN_CROSSWALK_PATH") or DEFAULT_CROSSWALK_PATH)
+            _index = NaicsSinIndex.from_csv(path)
+            logger.info(f"Loaded {_index.size} NAICS->SIN crosswalk rows from {path}")
+        return _index
+
+
 class NaicsSinMapper:
     @staticmethod
     def get_recommended_sins(naics_codes):
-        sins = set()
+        """Primary SIN of each code's most specific crosswalk match, de-duplicated in input order"""
+        index = get_index()
+        sins: List[str] = []
         for code in naics_codes:
-            mapped = NAICS_TO_SIN.get(code.strip())
-            if mapped:
-                sins.add(mapped)
-        return list(sins)
+            matches = index.lookup(code)
+            if matches and matches[0].sin not in sins:
+                sins.append(matches[0].sin)
+        return sins
+
+    @staticmethod
+    def recommend(naics_codes: Iterable[str]) -> List[SinMatch]:
+        """All candidate SINs for a vendor's codes, best first; each SIN keeps its strongest match"""
+        return NaicsSinMapper.map_batch({"": naics_codes})[""]
+
+    @staticmethod
+    def map_batch(vendors: Mapping[str, Iterable[str]]) -> Dict[str, List[SinMatch]]:
+        """
+        recommend() for many vendors at once. Vendors share a small set of NAICS codes, so each
+        distinct code is looked up once per batch.
+        """
+        index = get_index()
+        memo: Dict[str, List[SinMatch]] = {}
+        results = {}
+        for vendor_id, codes in vendors.items():
+            best: Dict[str, SinMatch] = {}
+            for code in codes:
+                if code not in memo:
+                    memo[code] = index.lookup(code)
+                for match in memo[code]:
+                    if match.sin not in best or _rank(match) < _rank(best[match.sin]):
+                        best[match.sin] = match
+            results[vendor_id] = sorted(best.values(), key=_rank)
+        return results
@@ -0,0 +1,87 @@
+import re
+from decimal import Decimal
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+SUFFIX_MULTIPLIERS = {
+    "k": Decimal(1_000), "thousand": Decimal(1_000),
+    "m": Decimal(1_000_000), "mm": Decimal(1_000_000), "mil": Decimal(1_000_000), "million": Decimal(1_000_000),
+    "b": Decimal(1_000_000_000), "bn": Decimal(1_000_000_000), "billion": Decimal(1_000_000_000),
+}
+
+# Amounts like "25,000.50", "1.2", ".5" with an optional scale suffix ("30K", "$2.5 million")
+_AMOUNT_PATTERN = re.compile(
+    r"(?P<num>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?|\.\d+)"
+    r"(?:\s*(?P<suffix>thousand|million|billion|mil|mm|bn|k|m|b)\b)?"
+)
+# What may sit between the two amounts of a range such as "$20K - $30K" or "1 to 2 million"
+_RANGE_SEPARATOR = re.compile(r"^\s*(?:usd|us\$|\$|€|£)?\s*(?:-|–|—|to)\s*(?:usd|us\$|\$|€|£)?\s*$")
+
+
+def _to_decimal(number: str, suffix: Optional[str]) -> Decimal:
+    value = Decimal(number.replace(",", ""))
+    if suffix:
+        value *= SUFFIX_MULTIPLIERS[suffix]
+    return value
+
+
+@lru_cache(maxsize=8192)
+def _parse_normalized(normalized: str) -> Optional[Tuple[Decimal, Decimal]]:
+    """Parse a normalized money string into (low, high); cached since contract values repeat heavily"""
+    matches = list(_AMOUNT_PATTERN.finditer(normalized))
+    if not matches:
+        return None
+    first = matches[0]
+    if len(matches) >= 2 and _RANGE_SEPARATOR.match(normalized[first.end():matches[1].start()]):
+        second = matches[1]
+        # "$1-2M": a suffix written only on the upper bound applies to both
+        low_suffix = first.group("suffix") or second.group("suffix")
+        low = _to_decimal(first.group("num"), low_suffix)
+        high = _to_decimal(second.group("num"), second.group("suffix"))
+        return (low, high) if low <= high else (high, low)
+    value = _to_decimal(first.group("num"), first.group("suffix"))
+    return value, value
+
+
+class MoneyParser:
+    """Parses contract values ("$1.2M", "25,000.50", "USD 30K", "$20K - $30K") into Decimals"""
+
+    @staticmethod
+    def parse_range(value) -> Optional[Tuple[Decimal, Decimal]]:
+        """(low, high) for a value or range; None if no amount is found"""
+        if value is None:
+            return None
+        if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            amount = Decimal(str(value))
+            return amount, amount
+        return _parse_normalized(" ".join(str(value).lower().split()))
+
+    @staticmethod
+    def parse(value) -> Optional[Decimal]:
+        """
+        Amount of a contract value, or None if unparseable.
+        Ranges resolve to their lower bound so threshold checks stay conservative.
+        """
+        parsed = MoneyParser.parse_range(value)
+        return parsed[0] if parsed else None
+
+    @staticmethod
+    def parse_many(values: Iterable) -> "np.ndarray":
+        """Float array of amounts for vectorized threshold checks; NaN where unparseable"""
+        import numpy as np
+        amounts = {}
+        result = []
+        for value in values:
+            key = value if isinstance(value, (str, int, float, Decimal, type(None))) else str(value)
+            if key not in amounts:
+                parsed = MoneyParser.parse(value)
+                amounts[key] = float(parsed) if parsed is not None else np.nan
+            result.append(amounts[key])
+        return np.array(result, dtype=np.float64)
+
+    @staticmethod
+    def cache_info():
+        return _parse_normalized.cache_info()
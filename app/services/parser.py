@@ -126,12 +126,14 @@ import re
 import logging
 from typing import List, Optional, Dict, Any
 from app.models.schemas import CompanyProfile, PastPerformance, PricingSheet
+from app.core.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 class DocumentParser:
     
     @staticmethod
+    @traced("parse")
     def parse_company_profile(text: str) -> CompanyProfile:
         """Enhanced parser with better error handling and logging"""
         logger.info(f"Parsing company profile from: {text[:100]}...")
@@ -162,7 +164,7 @@ class DocumentParser:
         logger.info(f"Extracted: name={name}, uei={uei}, duns={duns}, naics={naics}")
         logger.info(f"POC: {poc_info.get('name')}, {poc_info.get('email')}, {poc_info.get('phone')}")
 
-        return CompanyProfile(
+        return CompanyProfile.model_construct(
             company_name=name,
             uei=uei,
             duns=duns,
@@ -252,6 +254,7 @@ class DocumentParser:
         return poc_info
     
     @staticmethod
+    @traced("parse")
     def parse_past_performance(text: str) -> List[PastPerformance]:
         """Enhanced past performance parser"""
         logger.info(f"Parsing past performance from: {text[:100]}...")
@@ -271,7 +274,7 @@ class DocumentParser:
         logger.info(f"PP Extracted: customer={customer}, value={value}, contact={contact_info.get('name')}")
 
         return [
-            PastPerformance(
+            PastPerformance.model_construct(
                 customer=customer,
                 contract_description=contract,
                 contract_value=value,
@@ -335,6 +338,7 @@ class DocumentParser:
         return None
     
     @staticmethod
+    @traced("parse")
     def parse_pricing_sheet(text: str) -> PricingSheet:
         """
         Enhanced pricing sheet parser - works for any unit (e.g., 'Hour', 'Day', 'Month', etc.)
@@ -364,7 +368,7 @@ class DocumentParser:
                 "unit": unit if unit and len(unit) < 32 else None   # Some basic sanity on length
             })
 
-        return PricingSheet(labor_categories=labor_categories)
+        return PricingSheet.model_construct(labor_categories=labor_categories)
 
     
     @staticmethod
@@ -411,6 +415,7 @@ class DocumentParser:
         return None
 
     @staticmethod
+    @traced("classify")
     def classify_document(text: str, type_hint: Optional[str] = None) -> str:
         """Enhanced document classification with logging"""
         if type_hint in ["profile", "past_performance", "pricing"]:
@@ -0,0 +1,170 @@
+import re
+import calendar
+import datetime
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Tuple
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+# One pass over the string finds every date token. Alternatives are ordered so the
+# most specific format wins at a given position (e.g. ISO day before ISO month).
+_TOKEN_PATTERN = re.compile(
+    r"(?P<iso_y>\d{4})-(?P<iso_m>\d{1,2})(?:-(?P<iso_d>\d{1,2}))?\b"
+    r"|(?P<us_m>\d{1,2})/(?:(?P<us_d>\d{1,2})/)?(?P<us_y>\d{4})\b"
+    r"|q(?P<q_a>[1-4])\s*(?:fy\s*)?(?P<qy_a>\d{4})\b"
+    r"|(?P<qy_b>\d{4})\s*-?\s*q(?P<q_b>[1-4])\b"
+    r"|\bfy\s*(?P<fy>\d{4}|\d{2})\b"
+    r"|\b(?P<mon>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sept?(?:ember)?"
+    r"|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?(?:\s+(?P<mon_d>\d{1,2}))?,?\s*(?P<mon_y>\d{4})\b"
+    r"|\b(?P<present>present|current|ongoing|to date|today|now)\b"
+    r"|\b(?P<year>(?:19|20)\d{2})\b"
+)
+
+# (start, end, open_ended) with dates as ordinals so cached values stay small and immutable
+_Parsed = Tuple[int, int, bool]
+
+
+@dataclass(frozen=True)
+class DateRange:
+    start: datetime.date
+    end: datetime.date
+    open_ended: bool = False  # end came from "Present"/"Current" and tracks the clock
+
+
+def _month_span(year: int, month: int) -> Optional[Tuple[datetime.date, datetime.date]]:
+    if not 1 <= month <= 12 or year < 1:
+        return None
+    return datetime.date(year, month, 1), datetime.date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _day_span(year: int, month: int, day: int) -> Optional[Tuple[datetime.date, datetime.date]]:
+    if not 1 <= month <= 12 or year < 1 or not 1 <= day <= calendar.monthrange(year, month)[1]:
+        return None
+    date = datetime.date(year, month, day)
+    return date, date
+
+
+def _quarter_span(year: int, quarter: int) -> Optional[Tuple[datetime.date, datetime.date]]:
+    first_month = 3 * (quarter - 1) + 1
+    first, last = _month_span(year, first_month), _month_span(year, first_month + 2)
+    if first is None or last is None:
+        return None
+    return first[0], last[1]
+
+
+def _token_span(match: "re.Match") -> Optional[Tuple[datetime.date, datetime.date]]:
+    """Convert one date token into the (first day, last day) it covers; None if invalid"""
+    g = match.groupdict()
+    if g["iso_y"]:
+        if g["iso_d"]:
+            return _day_span(int(g["iso_y"]), int(g["iso_m"]), int(g["iso_d"]))
+        return _month_span(int(g["iso_y"]), int(g["iso_m"]))
+    if g["us_y"]:
+        if g["us_d"]:
+            return _day_span(int(g["us_y"]), int(g["us_m"]), int(g["us_d"]))
+        return _month_span(int(g["us_y"]), int(g["us_m"]))
+    if g["qy_a"]:
+        return _quarter_span(int(g["qy_a"]), int(g["q_a"]))
+    if g["qy_b"]:
+        return _quarter_span(int(g["qy_b"]), int(g["q_b"]))
+    if g["fy"]:
+        # Federal fiscal year N runs October 1 of N-1 through September 30 of N
+        year = int(g["fy"])
+        year = year + 2000 if year < 100 else year
+        return datetime.date(year - 1, 10, 1), datetime.date(year, 9, 30)
+    if g["mon"]:
+        month = MONTHS[g["mon"][:3]]
+        if g["mon_d"]:
+            return _day_span(int(g["mon_y"]), month, int(g["mon_d"]))
+        return _month_span(int(g["mon_y"]), month)
+    if g["year"]:
+        year = int(g["year"])
+        return datetime.date(year, 1, 1), datetime.date(year, 12, 31)
+    return None
+
+
+@lru_cache(maxsize=8192)
+def _parse_normalized(normalized: str) -> Optional[_Parsed]:
+    """Parse a normalized period string; cached because vendor periods repeat heavily"""
+    start = end = None
+    open_ended = False
+    for match in _TOKEN_PATTERN.finditer(normalized):
+        if match.group("present"):
+            open_ended = True
+            continue
+        span = _token_span(match)
+        if span is None:
+            continue
+        if start is None:
+            start = span[0]
+        # The last date found is the end of the period
+        end = span[1]
+        open_ended = False
+    if start is None:
+        return None
+    return start.toordinal(), end.toordinal(), open_ended
+
+
+def normalize_period(period: str) -> str:
+    return " ".join(period.lower().split())
+
+
+class PeriodParser:
+    """Parses contract periods ("07/2023 - 03/2024", "Q2 2022 - Present", "2021-10-01 to FY24") into date ranges"""
+
+    def __init__(self, clock: Optional[Callable[[], datetime.date]] = None):
+        self.clock = clock or datetime.date.today
+
+    def today(self) -> datetime.date:
+        today = self.clock()
+        return today.date() if isinstance(today, datetime.datetime) else today
+
+    def parse(self, period: Optional[str]) -> Optional[DateRange]:
+        """Return the (start, end) range of a period string, or None if no date is recognized"""
+        if not period:
+            return None
+        parsed = _parse_normalized(normalize_period(str(period)))
+        if parsed is None:
+            return None
+        start, end, open_ended = parsed
+        if open_ended:
+            return DateRange(datetime.date.fromordinal(start), self.today(), open_ended=True)
+        return DateRange(datetime.date.fromordinal(start), datetime.date.fromordinal(end))
+
+    def end_dates(self, periods: Iterable[Optional[str]]) -> List[Optional[datetime.date]]:
+        """End date for each period (None when unparseable), parsing each distinct string once"""
+        ends = {}
+        result = []
+        for period in periods:
+            if period not in ends:
+                parsed = self.parse(period)
+                ends[period] = parsed.end if parsed else None
+            result.append(ends[period])
+        return result
+
+    def months_ago(self, months: int) -> datetime.date:
+        """Same calendar day `months` months before today, clamped to the end of shorter months"""
+        today = self.today()
+        index = today.year * 12 + (today.month - 1) - months
+        year, month = divmod(index, 12)
+        month += 1
+        return datetime.date(year, month, min(today.day, calendar.monthrange(year, month)[1]))
+
+    def within_last_months(self, period: Optional[str], months: int = 36) -> bool:
+        """True if the period ends within the last `months` calendar months; unparseable periods fail safe"""
+        parsed = self.parse(period)
+        if parsed is None:
+            return False
+        return parsed.end >= self.months_ago(months)
+
+    @staticmethod
+    def cache_info():
+        return _parse_normalized.cache_info()
+
+    @staticmethod
+    def clear_cache() -> None:
+        _parse_normalized.cache_clear()
@@ -0,0 +1,96 @@
+import os
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.metrics import metrics
+from app.core.tracing import span
+from app.services.incremental import IncrementalCache, LRUCache, content_hash
+from app.services.validator import ComplianceIssue
+
+logger = logging.getLogger(__name__)
+
+
+def preanalysis_enabled() -> bool:
+    """Default for /ingest_v2 when the request does not say; set PREANALYZE=1 to enable"""
+    return os.getenv("PREANALYZE", "0").lower() in ("1", "true", "yes")
+
+
+def preanalysis_checklist_enabled() -> bool:
+    """PREANALYZE_CHECKLIST=1 also spends the checklist LLM call at ingest, before /analyze is known to follow"""
+    return os.getenv("PREANALYZE_CHECKLIST", "0").lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class PreAnalysis:
+    """Analysis stages finished ahead of /analyze for one package, valid for one rules version"""
+    rules_version: Optional[str]
+    package_hash: str
+    issues: List[ComplianceIssue]
+    recomputed_sections: List[str]
+    problems: List[Dict[str, Any]]
+    citations: List[Dict[str, Any]]
+    checklist: Optional[Dict[str, Any]] = None
+
+    @property
+    def matched(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        return self.problems, self.citations
+
+
+class PreAnalyzer:
+    """
+    Starts validation and rule retrieval (and optionally the checklist) on a background thread
+    as soon as a package is parsed, so /analyze only has the LLM work left. /analyze takes the
+    finished result or waits on the one in flight; either way the work is never done twice.
+    A result computed against a rules pack that has since been reloaded is ignored.
+    """
+
+    def __init__(self, get_rag: Callable[[], Any], get_cache: Callable[[], IncrementalCache],
+                 workers: int = 2, max_entries: int = 1024):
+        self.get_rag = get_rag
+        self.get_cache = get_cache
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="preanalysis")
+        self._futures = LRUCache(max_entries)
+
+    def schedule(self, request_id: str, parsed_data: Dict[str, Any], checklist: bool = False) -> Future:
+        future = self._executor.submit(self._run, parsed_data, checklist)
+        self._futures.put(request_id, future)
+        metrics.inc("preanalysis_total", outcome="scheduled")
+        return future
+
+    def _run(self, parsed_data: Dict[str, Any], checklist: bool) -> Optional[PreAnalysis]:
+        rag = self.get_rag()
+        if rag is None:
+            return None
+        issues, recomputed_sections = self.get_cache().validate(parsed_data)
+        problems, citations = rag.match_rules(issues)
+        built = (rag.build_policy_checklist(parsed_data, issues=issues, matched=(problems, citations))
+                 if checklist else None)
+        if built and built.get("fallback"):
+            # The provider failed at ingest; /analyze retries the call rather than serving the fallback
+            built = None
+        return PreAnalysis(rag.rules_version, content_hash(parsed_data), issues, recomputed_sections,
+                           problems, citations, built)
+
+    def result(self, request_id: str, rules_version: Optional[str]) -> Optional[PreAnalysis]:
+        """The package's pre-analysis, waiting for it if still running; None if there is no usable one"""
+        future = self._futures.get(request_id)
+        if future is None:
+            return None
+        state = "ready" if future.done() else "in_flight"
+        try:
+            with span("preanalysis", state=state):
+                pre = future.result()
+        except Exception as e:
+            logger.warning(f"Pre-analysis of request {request_id} failed; analyzing from scratch: {e}")
+            metrics.inc("preanalysis_total", outcome="failed")
+            return None
+        if pre is None or pre.rules_version != rules_version:
+            metrics.inc("preanalysis_total", outcome="stale")
+            return None
+        metrics.inc("preanalysis_total", outcome=state)
+        return pre
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
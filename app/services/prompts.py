@@ -0,0 +1,133 @@
+import statistics
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from app.services.money import MoneyParser
+
+# Fields the prompts actually reference; everything else (addresses, contact names, ...) stays out
+COMPANY_FIELDS = ("company_name", "uei", "duns", "naics", "sam_registered")
+PAST_PERFORMANCE_FIELDS = ("customer", "contract_value", "period")
+PRICING_FIELDS = ("category", "rate", "unit")
+
+DEFAULT_EXAMPLES = 3
+# Per-section prompt budgets, in estimated tokens
+VENDOR_DATA_BUDGET_TOKENS = 600
+ISSUES_BUDGET_TOKENS = 800
+RULES_CONTEXT_BUDGET_TOKENS = 1200
+TRUNCATION_MARKER = " …[truncated]"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English prompts)"""
+    return max(1, len(text) // 4)
+
+
+def project(record: Any, fields: Sequence[str]) -> Dict[str, Any]:
+    """Keep only the given fields of a model or mapping, dropping empty values"""
+    if record is None:
+        return {}
+    if isinstance(record, BaseModel):
+        values = {name: getattr(record, name, None) for name in fields}
+    elif isinstance(record, Mapping):
+        values = {name: record.get(name) for name in fields}
+    else:
+        return {}
+    return {k: v for k, v in values.items() if v not in (None, "", [], {})}
+
+
+def _format(values: Mapping[str, Any]) -> str:
+    return ", ".join(f"{k}={', '.join(map(str, v)) if isinstance(v, list) else v}" for k, v in values.items())
+
+
+def _number_stats(numbers: Iterable[float]) -> Optional[Dict[str, float]]:
+    numbers = sorted(numbers)
+    if not numbers:
+        return None
+    return {"min": numbers[0], "median": statistics.median(numbers), "max": numbers[-1]}
+
+
+def _format_stats(label: str, stats: Optional[Dict[str, float]]) -> str:
+    if not stats:
+        return f"{label}: none parseable"
+    return f"{label}: min {stats['min']:,.2f}, median {stats['median']:,.2f}, max {stats['max']:,.2f}"
+
+
+def summarize_company(company: Any) -> str:
+    values = project(company, COMPANY_FIELDS)
+    return _format(values) if values else "Not provided"
+
+
+def summarize_past_performance(records: Optional[Sequence[Any]], examples: int = DEFAULT_EXAMPLES) -> str:
+    """Record count, contract value spread and the first few records"""
+    records = list(records or [])
+    if not records:
+        return "None submitted"
+    values = [float(v) for v in (MoneyParser.parse(project(r, ("contract_value",)).get("contract_value")) for r in records)
+              if v is not None]
+    lines = [f"{len(records)} contracts; " + _format_stats("contract values ($)", _number_stats(values))]
+    lines += [f"- {_format(project(r, PAST_PERFORMANCE_FIELDS))}" for r in records[:examples]]
+    if len(records) > examples:
+        lines.append(f"- ... {len(records) - examples} more")
+    return "\n".join(lines)
+
+
+def summarize_pricing(pricing: Any, examples: int = DEFAULT_EXAMPLES) -> str:
+    """Row count, rate spread, units used and the first few labor categories"""
+    rows = project(pricing, ("labor_categories",)).get("labor_categories") or []
+    if not rows:
+        return "No labor categories provided"
+    rates = [float(r) for r in (MoneyParser.parse(row.get("rate")) for row in rows) if r is not None]
+    units = sorted({str(row.get("unit")) for row in rows if row.get("unit")})
+    missing_unit = sum(1 for row in rows if not row.get("unit"))
+    lines = [
+        f"{len(rows)} labor categories; " + _format_stats("rates ($)", _number_stats(rates)),
+        f"units: {', '.join(units) or 'none'}" + (f" ({missing_unit} rows missing a unit)" if missing_unit else ""),
+    ]
+    lines += [f"- {_format(project(row, PRICING_FIELDS))}" for row in rows[:examples]]
+    if len(rows) > examples:
+        lines.append(f"- ... {len(rows) - examples} more")
+    return "\n".join(lines)
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    if estimate_tokens(text) <= budget:
+        return text
+    return text[:max(0, budget * 4 - len(TRUNCATION_MARKER))] + TRUNCATION_MARKER
+
+
+def fit_sections(sections: List[Tuple[str, str]], budget: int) -> str:
+    """
+    Join "label: text" sections within a token budget. Sections get an equal share, and
+    any share a short section leaves unused is passed on to the ones after it.
+    """
+    parts = []
+    remaining = budget
+    for index, (label, text) in enumerate(sections):
+        share = remaining // (len(sections) - index)
+        part = truncate_to_tokens(f"{label}: {text}", share)
+        remaining -= estimate_tokens(part)
+        parts.append(part)
+    return "\n".join(parts)
+
+
+def vendor_data_block(parsed_data: Mapping[str, Any], budget: int = VENDOR_DATA_BUDGET_TOKENS) -> str:
+    """Compact vendor summary for prompts, bounded by budget regardless of submission size"""
+    return fit_sections([
+        ("Company", summarize_company(parsed_data.get("company"))),
+        ("Past Performance", summarize_past_performance(parsed_data.get("past_performance"))),
+        ("Pricing", summarize_pricing(parsed_data.get("pricing"))),
+    ], budget)
+
+
+def bulleted(lines: Sequence[str], budget: int) -> str:
+    """Keep whole lines while they fit in budget, then note how many were left out"""
+    kept, used = [], 0
+    for index, line in enumerate(lines):
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            kept.append(f"- ... {len(lines) - index} more")
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
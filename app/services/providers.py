@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GEMINI_MODEL = "gemini-2.0-flash"
+
+
+class LLMProvider:
+    """Interface every LLM backend implements; services only talk to this"""
+    name = "base"
+
+    def generate(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> str:
+        raise NotImplementedError
+
+    async def generate_async(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                             timeout: Optional[float] = None) -> str:
+        return await asyncio.to_thread(self.generate, prompt, generation_config, timeout)
+
+    def stream(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+               timeout: Optional[float] = None) -> Iterator[str]:
+        """Yield the response in text chunks; backends without streaming yield it whole"""
+        yield self.generate(prompt, generation_config, timeout)
+
+    def describe(self) -> str:
+        return self.name
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini via google-generativeai"""
+    name = "gemini"
+
+    def __init__(self, model_name: str = DEFAULT_GEMINI_MODEL, api_key: Optional[str] = None):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key or os.getenv("GOOGLE_API_KEY"))
+        self._genai = genai
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    def _config(self, generation_config: Optional[Dict[str, Any]]):
+        return self._genai.types.GenerationConfig(**generation_config) if generation_config else None
+
+    @staticmethod
+    def _request_options(timeout: Optional[float]) -> Dict[str, Any]:
+        return {"timeout": timeout} if timeout else {}
+
+    def generate(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> str:
+        response = self.model.generate_content(prompt, generation_config=self._config(generation_config),
+                                               request_options=self._request_options(timeout))
+        return response.text
+
+    async def generate_async(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                             timeout: Optional[float] = None) -> str:
+        response = await self.model.generate_content_async(prompt, generation_config=self._config(generation_config),
+                                                           request_options=self._request_options(timeout))
+        return response.text
+
+    def stream(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+               timeout: Optional[float] = None) -> Iterator[str]:
+        response = self.model.generate_content(prompt, generation_config=self._config(generation_config), stream=True,
+                                               request_options=self._request_options(timeout))
+        for chunk in response:
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+    def describe(self) -> str:
+        return f"Google Gemini ({self.model_name})"
+
+
+def prompt_key(prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
+    """Stable key for a prompt + config, used to name recorded responses"""
+    payload = json.dumps({"prompt": prompt, "config": generation_config or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _default_stub_response(prompt: str) -> str:
+    return f"[stub response {prompt_key(prompt)[:12]}] {' '.join(prompt.split())[:80]}"
+
+
+class StubProvider(LLMProvider):
+    """
+    Local deterministic backend for tests and offline load testing.
+
+    Returns recorded responses from replay_dir when a recording exists for the prompt,
+    otherwise the responder's output. latency_s simulates model latency.
+    """
+    name = "stub"
+
+    def __init__(self, latency_s: float = 0.0, replay_dir: Optional[str] = None,
+                 responder: Optional[Callable[[str], str]] = None, chunk_size: int = 32):
+        self.latency_s = latency_s
+        self.replay_dir = Path(replay_dir) if replay_dir else None
+        self.responder = responder or _default_stub_response
+        self.chunk_size = chunk_size
+        self.calls = 0
+
+    def _respond(self, prompt: str, generation_config: Optional[Dict[str, Any]]) -> str:
+        self.calls += 1
+        if self.replay_dir:
+            path = self.replay_dir / f"{prompt_key(prompt, generation_config)}.json"
+            if path.exists():
+                return json.loads(path.read_text())["response"]
+            logger.warning(f"No recorded response for prompt {path.stem[:12]}, using stub responder")
+        return self.responder(prompt)
+
+    def _check_deadline(self, timeout: Optional[float]) -> None:
+        if timeout is not None and self.latency_s > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Stub latency {self.latency_s}s exceeds timeout {timeout}s")
+
+    def generate(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> str:
+        self._check_deadline(timeout)
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return self._respond(prompt, generation_config)
+
+    async def generate_async(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                             timeout: Optional[float] = None) -> str:
+        if timeout is not None and self.latency_s > timeout:
+            await asyncio.sleep(timeout)
+            raise TimeoutError(f"Stub latency {self.latency_s}s exceeds timeout {timeout}s")
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        return self._respond(prompt, generation_config)
+
+    def stream(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+               timeout: Optional[float] = None) -> Iterator[str]:
+        self._check_deadline(timeout)
+        text = self._respond(prompt, generation_config)
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or [""]
+        for chunk in chunks:
+            if self.latency_s:
+                time.sleep(self.latency_s / len(chunks))
+            yield chunk
+
+    def describe(self) -> str:
+        return "Local stub" + (f" (replaying {self.replay_dir})" if self.replay_dir else "")
+
+
+class RecordingProvider(LLMProvider):
+    """Wraps another provider and saves every response to disk for later replay with StubProvider"""
+    name = "record"
+
+    def __init__(self, inner: LLMProvider, record_dir: str):
+        self.inner = inner
+        self.record_dir = Path(record_dir)
+        self.record_dir.mkdir(parents=True, exist_ok=True)
+
+    def _save(self, prompt: str, generation_config: Optional[Dict[str, Any]], response: str) -> None:
+        path = self.record_dir / f"{prompt_key(prompt, generation_config)}.json"
+        path.write_text(json.dumps({"prompt": prompt, "generation_config": generation_config, "response": response}, default=str))
+
+    def generate(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> str:
+        response = self.inner.generate(prompt, generation_config, timeout)
+        self._save(prompt, generation_config, response)
+        return response
+
+    async def generate_async(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                             timeout: Optional[float] = None) -> str:
+        response = await self.inner.generate_async(prompt, generation_config, timeout)
+        self._save(prompt, generation_config, response)
+        return response
+
+    def stream(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+               timeout: Optional[float] = None) -> Iterator[str]:
+        chunks = []
+        for chunk in self.inner.stream(prompt, generation_config, timeout):
+            chunks.append(chunk)
+            yield chunk
+        self._save(prompt, generation_config, "".join(chunks))
+
+    def describe(self) -> str:
+        return f"{self.inner.describe()} (recording to {self.record_dir})"
+
+
+def create_provider(name: Optional[str] = None) -> LLMProvider:
+    """
+    Build the provider selected by LLM_PROVIDER:
+      gemini (default) | stub | replay (stub reading LLM_RECORD_DIR) | record (gemini, saving to LLM_RECORD_DIR)
+    LLM_STUB_LATENCY_MS sets the simulated latency of stub/replay.
+    """
+    name = (name or os.getenv("LLM_PROVIDER", "gemini")).lower()
+    record_dir = os.getenv("LLM_RECORD_DIR", "llm_recordings")
+    latency_s = float(os.getenv("LLM_STUB_LATENCY_MS", "0")) / 1000
+
+    if name == "gemini":
+        return GeminiProvider(os.getenv("GEMINI_MODEL", DEFAULT_GEMINI_MODEL))
+    if name == "stub":
+        return StubProvider(latency_s=latency_s)
+    if name == "replay":
+        return StubProvider(latency_s=latency_s, replay_dir=record_dir)
+    if name == "record":
+        return RecordingProvider(GeminiProvider(os.getenv("GEMINI_MODEL", DEFAULT_GEMINI_MODEL)), record_dir)
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+
+_shared_provider: Optional[LLMProvider] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_provider() -> LLMProvider:
+    """
+    Process-wide provider used by both the RAG and LLM services, so they share one rate
+    limit, concurrency cap and circuit breaker. Remote backends are wrapped with
+    ResilientProvider (see LLM_RPM, LLM_TPM, LLM_TIMEOUT_S, ...); stub and replay are not.
+    """
+    global _shared_provider
+    with _shared_lock:
+        if _shared_provider is None:
+            from app.core.config import load_environment
+            load_environment()
+            provider = create_provider()
+            if isinstance(provider, (GeminiProvider, RecordingProvider)):
+                from app.services.resilience import ResilientProvider
+                provider = ResilientProvider.from_env(provider)
+            _shared_provider = provider
+        return _shared_provider
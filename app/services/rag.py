@@ -1,92 +1,103 @@
 import os
-import json
-import re
+import uuid
 import logging
-from typing import List, Dict, Any, Optional
-from langchain_community.vectorstores import Chroma
-from langchain.schema import Document
-from langchain.embeddings.base import Embeddings
-import google.generativeai as genai
-import numpy as np
-from sentence_transformers import SentenceTransformer
-from dotenv import load_dotenv
-from app.services.validator import HybridValidator
-
-load_dotenv()
+import threading
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
+from pydantic import ValidationError
+from app.core.metrics import metrics
+from app.core.tracing import span
+from app.models.schemas import POLICY_CHECKLIST_RESPONSE_SCHEMA, PolicyChecklist
+from app.services.jsonrepair import JSONRepairError, parse_json_lenient
+from app.services.validator import HybridValidator, ComplianceIssue, MIN_CONTRACT_VALUE
+from app.services.money import MoneyParser
+from app.services.incremental import LRUCache
+from app.services.embeddings import embed_documents, get_embedding_model
+from app.services.lexical import BM25Index, is_identifier_query, reciprocal_rank_fusion
+from app.services.rulespack import DEFAULT_RULES_PACK_PATH, RulesPack, load_rules_pack
+from app.services.providers import LLMProvider, get_shared_provider
+from app.services.prompts import (
+    ISSUES_BUDGET_TOKENS, RULES_CONTEXT_BUDGET_TOKENS, bulleted, estimate_tokens, truncate_to_tokens, vendor_data_block,
+)
+
+if TYPE_CHECKING:
+    from langchain.schema import Document
+
 logger = logging.getLogger(__name__)
 
-# Configure Gemini
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+FUSION_DEPTH = 10  # candidates taken from each ranking before fusion
+# Corpus indexers per (corpus dir, index dir), shared by the services of successive rules packs
+_corpus_indexers: Dict[Tuple[str, Optional[str]], Any] = {}
+_corpus_lock = threading.Lock()
+
+# Built-in GSA Rules Pack (app/data/rules_pack.json); RULES_PACK_PATH points at another pack
+GSA_RULES = load_rules_pack(DEFAULT_RULES_PACK_PATH).rules
 
-class CustomEmbeddings(Embeddings):
-    """Custom embeddings using sentence-transformers"""
-    def __init__(self):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+class CustomEmbeddings:
+    """
+    Custom embeddings using sentence-transformers; query vectors are cached since rule queries repeat.
+    Implements the langchain Embeddings interface by duck typing so importing this module stays cheap.
+    """
+    def __init__(self, query_cache_size: int = 2048):
+        self.model = get_embedding_model()
+        self.query_cache = LRUCache(query_cache_size)
     
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        embeddings = self.model.encode(texts)
-        return embeddings.tolist()
+        return embed_documents(texts)
     
     def embed_query(self, text: str) -> List[float]:
-        embedding = self.model.encode([text])
-        return embedding[0].tolist()
+        cached = self.query_cache.get(text)
+        metrics.inc("embedding_cache_requests_total", result="miss" if cached is None else "hit")
+        if cached is not None:
+            return cached
+        embedding = self.model.encode([text])[0].tolist()
+        self.query_cache.put(text, embedding)
+        return embedding
 
 class GSARulesRAG:
-    """Production RAG system using direct Google GenAI"""
+    """Production RAG system on a pluggable LLM provider (Gemini by default)"""
     
-    def __init__(self, rules_documents=None):
+    def __init__(self, rules_documents=None, provider: Optional[LLMProvider] = None,
+                 corpus_dir: Optional[str] = None, rules_pack: Optional[RulesPack] = None):
+        # langchain and the embedding model load here, on first use, not at import time
+        from langchain.schema import Document
+
         # Initialize custom embeddings
         self.embeddings = CustomEmbeddings()
         
-        # Initialize Gemini model
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+        # Initialize LLM provider; the checklist is requested as schema-constrained JSON
+        self.provider = provider or get_shared_provider()
+        self.checklist_generation_config = dict(
+            response_mime_type="application/json",
+            response_schema=POLICY_CHECKLIST_RESPONSE_SCHEMA,
+        )
         
-        # GSA Rules Pack from assignment
+        # Rules pack (RULES_PACK_PATH or the built-in one); passing rules_documents (any value) leaves R1 out
+        self.rules_pack = rules_pack or load_rules_pack()
+        self.rules_version = self.rules_pack.version
+        # Unique per instance: a pack reloaded A -> B -> A must not share a collection with the
+        # retiring A instance, whose close() drops its collection after the grace period
+        self.index_name = f"{self.rules_pack.index_name}_{uuid.uuid4().hex[:8]}"
+        rules = self.rules_pack.rules
         if rules_documents is not None:
-            self.rules_documents = [
-                Document(
-                    page_content="NAICS & SIN Mapping: 541511 maps to 54151S, 541512 maps to 54151S, 541611 maps to 541611, 518210 maps to 518210C",
-                    metadata={"rule_id": "R2", "title": "NAICS & SIN Mapping", "category": "mapping"}
-                ),
-                Document(
-                    page_content="Past Performance: At least 1 past performance contract ≥ $25,000 within last 36 months. Must include customer name, contract value, period, and contact email.",
-                    metadata={"rule_id": "R3", "title": "Past Performance", "category": "performance"}
-                ),
-                Document(
-                    page_content="Pricing & Catalog: Provide labor categories and rates in structured sheet. If missing rate basis or units, flag pricing_incomplete.",
-                    metadata={"rule_id": "R4", "title": "Pricing & Catalog", "category": "pricing"}
-                ),
-                Document(
-                    page_content="Submission Hygiene: All personally identifiable information must be stored in redacted form. Only derived fields and hashes are stored by default.",
-                    metadata={"rule_id": "R5", "title": "Submission Hygiene", "category": "security"}
-                )]
-        else:
-            self.rules_documents = [
-                Document(
-                    page_content="Identity & Registry: Required UEI (12 chars), DUNS (9 digits), and active SAM.gov registration. Primary contact must have valid email and phone.",
-                    metadata={"rule_id": "R1", "title": "Identity & Registry", "category": "identity"}
-                ),
-                Document(
-                    page_content="NAICS & SIN Mapping: 541511 maps to 54151S, 541512 maps to 54151S, 541611 maps to 541611, 518210 maps to 518210C",
-                    metadata={"rule_id": "R2", "title": "NAICS & SIN Mapping", "category": "mapping"}
-                ),
-                Document(
-                    page_content="Past Performance: At least 1 past performance contract ≥ $25,000 within last 36 months. Must include customer name, contract value, period, and contact email.",
-                    metadata={"rule_id": "R3", "title": "Past Performance", "category": "performance"}
-                ),
-                Document(
-                    page_content="Pricing & Catalog: Provide labor categories and rates in structured sheet. If missing rate basis or units, flag pricing_incomplete.",
-                    metadata={"rule_id": "R4", "title": "Pricing & Catalog", "category": "pricing"}
-                ),
-                Document(
-                    page_content="Submission Hygiene: All personally identifiable information must be stored in redacted form. Only derived fields and hashes are stored by default.",
-                    metadata={"rule_id": "R5", "title": "Submission Hygiene", "category": "security"}
-                )
-            ]
+            rules = [r for r in rules if r["rule_id"] != "R1"]
+        self.rules_documents = [
+            Document(page_content=rule["text"],
+                     metadata={"chunk_id": f"builtin#{rule['rule_id']}", "rule_id": rule["rule_id"],
+                               "title": rule["title"], "category": rule["category"], "source": "rules_pack"})
+            for rule in rules
+        ]
         
-        # Initialize vector store
+        # Initialize vector store; RULES_CORPUS_DIR adds a chunked rules corpus (see app.services.corpus)
+        self.corpus_dir = corpus_dir or os.getenv("RULES_CORPUS_DIR")
+        self.retrieval_mode = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+        self.lexical = BM25Index()
+        self.lexical.add_many((d.metadata["chunk_id"], d.page_content, d.metadata) for d in self.rules_documents)
         self.vectorstore = None
-        self._initialize_vectorstore()
+        self.corpus_store = None
+        if self.corpus_dir:
+            self._initialize_corpus_vectorstore()
+        else:
+            self._initialize_vectorstore()
 
     # @classmethod
     # def with_rules_override(cls, rules_documents):
@@ -98,72 +109,110 @@ class GSARulesRAG:
 
     def _initialize_vectorstore(self):
         """Initialize ChromaDB vector store with GSA rules"""
+        from langchain_community.vectorstores import Chroma
         try:
             self.vectorstore = Chroma.from_documents(
                 documents=self.rules_documents,
                 embedding=self.embeddings,
-                collection_name="gsa_rules_direct"
+                ids=[d.metadata["chunk_id"] for d in self.rules_documents],
+                collection_name=self.index_name
             )
             logger.info("Vector store initialized successfully with sentence-transformers")
         except Exception as e:
             logger.error(f"Failed to initialize vector store: {e}")
             raise
     
-    def retrieve_relevant_rules(self, query: str, k: int = 3) -> List[Document]:
-        """Retrieve most relevant rules for a query using semantic search"""
+    def _initialize_corpus_vectorstore(self):
+        """
+        Index the rules corpus incrementally alongside the pack. The pack's rules get their own
+        collection, like without a corpus, so a rules reload never touches the live index; the
+        corpus chunks sit in one collection shared by every pack's service in the process. With
+        RULES_INDEX_DIR that collection and its manifest persist, so restarts only embed files
+        that changed.
+        """
+        from langchain_community.vectorstores import Chroma
+        from app.services.corpus import CorpusIndexer
+
+        self._initialize_vectorstore()
+        index_dir = os.getenv("RULES_INDEX_DIR")
+        key = (os.path.abspath(self.corpus_dir), index_dir)
+        with _corpus_lock:
+            indexer = _corpus_indexers.get(key)
+            if indexer is None:
+                store = Chroma(collection_name="gsa_rules_corpus", embedding_function=self.embeddings,
+                               persist_directory=index_dir)
+                # Indexes built before the pack moved to its own collection also hold its rules
+                legacy = store.get(where={"source": "rules_pack"})["ids"]
+                if legacy:
+                    store.delete(ids=legacy)
+                indexer = _corpus_indexers[key] = CorpusIndexer(self.corpus_dir, store, index_dir)
+            # A reload reuses the indexer's manifest, so only files changed since are embedded
+            self.corpus_sync = indexer.sync()
+        self.corpus_store = indexer.store
+        # The lexical index is rebuilt from the files on every start; it needs no embeddings
+        self.lexical.add_many((c.chunk_id, c.text, c.metadata()) for c in indexer.chunks())
+
+    def retrieve_relevant_rules(self, query: str, k: int = 3) -> List["Document"]:
+        """
+        Retrieve the most relevant rules for a query. RETRIEVAL_MODE=hybrid (default) fuses BM25
+        and embedding rankings with reciprocal-rank fusion, and answers queries made only of
+        identifiers (clause numbers, NAICS codes, issue ids) from BM25 alone without an embedding;
+        vector is pure semantic search.
+        """
         if not self.vectorstore:
             logger.warning("Vector store not initialized")
             return []
         
         try:
-            docs = self.vectorstore.similarity_search(query, k=k)
-            logger.info(f"Retrieved {len(docs)} relevant rules for query: {query}")
+            with span("retrieve", k=k, input_chars=len(query)) as current:
+                docs, mode = self._retrieve(query, k)
+                current.set(mode=mode)
+            metrics.inc("rule_retrieval_total", mode=mode)
+            logger.info(f"Retrieved {len(docs)} relevant rules ({mode}) for query: {query}")
             return docs
         except Exception as e:
             logger.error(f"Error retrieving documents: {e}")
             return []
+
+    def _retrieve(self, query: str, k: int) -> Tuple[List["Document"], str]:
+        if self.retrieval_mode == "vector":
+            return self._similarity_search(query, k), "vector"
+        depth = max(k, FUSION_DEPTH)
+        lexical_hits = self.lexical.search(query, k=depth)
+        if lexical_hits and is_identifier_query(query):
+            return [self._lexical_document(doc_id) for doc_id, _ in lexical_hits[:k]], "lexical"
+
+        vector_docs = self._similarity_search(query, depth)
+        if not lexical_hits:
+            return vector_docs[:k], "vector"
+        by_id = {d.metadata.get("chunk_id", d.page_content): d for d in vector_docs}
+        fused = reciprocal_rank_fusion([list(by_id), [doc_id for doc_id, _ in lexical_hits]])
+        return [by_id.get(doc_id) or self._lexical_document(doc_id) for doc_id, _ in fused[:k]], "hybrid"
+
+    def _similarity_search(self, query: str, k: int) -> List["Document"]:
+        """Nearest chunks across this pack's rules and the shared corpus, by embedding distance"""
+        if self.corpus_store is None:
+            return self.vectorstore.similarity_search(query, k=k)
+        scored = (self.vectorstore.similarity_search_with_score(query, k=k)
+                  + self.corpus_store.similarity_search_with_score(query, k=k))
+        return [doc for doc, _ in sorted(scored, key=lambda pair: pair[1])[:k]]
+
+    def _lexical_document(self, doc_id: str) -> "Document":
+        from langchain.schema import Document
+        text, metadata = self.lexical.documents[doc_id]
+        return Document(page_content=text, metadata=metadata)
     
-    def _extract_json_from_response(self, response_text: str) -> str:
-        """Extract JSON from Gemini response, handling various formatting"""
-        response_text = response_text.strip()
-        
-        # Handle markdown code blocks with ```
-        if "```json" in response_text:
-            # Extract content between ``````
-            start = response_text.find("```json") + 7
-            end = response_text.find("```", start)
-            if end != -1:
-                response_text = response_text[start:end].strip()
-        elif response_text.startswith("```"):
-            # Remove generic code blocks (``````)
-            response_text = response_text[3:-3].strip()
-        
-        # Find the actual JSON content by locating the outermost braces
-        start_idx = response_text.find("{")
-        end_idx = response_text.rfind("}") + 1
-        
-        if start_idx != -1 and end_idx > start_idx:
-            response_text = response_text[start_idx:end_idx]
-        
-        return response_text
-    
-    def build_policy_checklist(self, parsed_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Build policy-aware checklist using RAG and Gemini"""
-        
-        # Get relevant context from vector store
-        issues = HybridValidator.validate_all_data(parsed_data)
+    def match_rules(self, issues: List[ComplianceIssue]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Attribute each validator issue to its best-matching rule; returns (problems, citations)"""
         problems = []
         citations = []
 
         # For each issue, retrieve its corresponding rule doc(s)
-        matched_rules = {}  # Map: issue_id -> (rule_doc/None)
-
         for issue in issues:
             # Determine query for rule retrieval (can use category if present, else fallback)
             query = getattr(issue, "rule_category", "") or getattr(issue, "description", "")
             rule_docs = self.retrieve_relevant_rules(query, k=1)
             rule_doc = rule_docs[0] if rule_docs else None
-            matched_rules[issue.issue_id] = rule_doc
 
             # Extract correct rule_id for each issue from the matched rule doc
             if rule_doc and "rule_id" in rule_doc.metadata:
@@ -184,6 +233,27 @@ class GSARulesRAG:
                     "chunk": rule_doc.page_content
                 })
 
+        return problems, citations
+
+    def build_policy_checklist(self, parsed_data: Dict[str, Any],
+                               issues: Optional[List[ComplianceIssue]] = None,
+                               matched: Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+        """
+        Build policy-aware checklist using RAG and Gemini. Pass precomputed validator issues to skip
+        validation, and match_rules() output as `matched` to skip retrieval.
+        """
+        checklist = self._build_policy_checklist(parsed_data, issues, matched)
+        checklist["rules_version"] = self.rules_version
+        return checklist
+
+    def _build_policy_checklist(self, parsed_data: Dict[str, Any], issues: Optional[List[ComplianceIssue]],
+                                matched: Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]) -> Dict[str, Any]:
+        if matched is None:
+            if issues is None:
+                issues = HybridValidator.validate_all_data(parsed_data)
+            matched = self.match_rules(issues)
+        problems, citations = matched
+
         # Build context block for prompt
         context = "\n\n".join([f"{c['rule_id']}: {c['chunk']}" for c in citations])
 
@@ -194,17 +264,13 @@ class GSARulesRAG:
         If no issues are present for a rule, do not fabricate evidence or descriptions.
 
         SYSTEM-DETECTED COMPLIANCE ISSUES:
-        {"; ".join(
-            f"Rule: {p['rule_id']}, Issue: {p['issue']}, Evidence: {p['evidence']}" for p in problems
-        )}
+        {bulleted([f"- Rule: {p['rule_id']}, Issue: {p['issue']}, Evidence: {p['evidence']}" for p in problems], ISSUES_BUDGET_TOKENS) or "None"}
 
         GSA RULES CONTEXT:
-        {context}
+        {truncate_to_tokens(context, RULES_CONTEXT_BUDGET_TOKENS)}
 
         VENDOR DATA:
-        Company: {str(parsed_data.get("company", {}))}
-        Past Performance: {str(parsed_data.get("past_performance", []))}
-        Pricing: {str(parsed_data.get("pricing", {}))}
+        {vendor_data_block(parsed_data)}
 
         Based on the GSA rules above and the system-detected issues, return a JSON checklist that ONLY includes the issues, evidence, and rule_ids as provided.
         Response format:
@@ -222,40 +288,41 @@ class GSARulesRAG:
         """
 
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # Use robust JSON extraction
-            clean_json = self._extract_json_from_response(response_text)
-            
-            # Parse JSON with better error handling
-            try:
-                checklist_result = json.loads(clean_json)
-                
-                # Validate required fields exist
-                if not isinstance(checklist_result, dict):
-                    raise ValueError("Response is not a dictionary")
-                
-                required_fields = ["required_ok", "problems", "citations"]
-                for field in required_fields:
-                    if field not in checklist_result:
-                        logger.warning(f"Missing field {field} in LLM response, using fallback")
-                        return self._fallback_checklist(parsed_data)
-                
-                logger.info("Successfully generated policy checklist using Gemini")
-                return checklist_result
-                
-            except json.JSONDecodeError as je:
-                logger.error(f"JSON decode error: {je}. Response was: {clean_json[:200]}...")
-                return self._fallback_checklist(parsed_data)
-                
+            with span("generate", call="checklist", prompt_tokens=estimate_tokens(prompt)):
+                response_text = self.provider.generate(prompt, generation_config=self.checklist_generation_config)
         except Exception as e:
-            logger.error(f"Error generating checklist with Gemini: {e}")
+            logger.error(f"Error generating checklist with {self.provider.name}: {e}")
             return self._fallback_checklist(parsed_data)
+
+        # The call succeeded; from here on a failure wastes a paid response
+        try:
+            payload, repaired = parse_json_lenient(response_text)
+            if isinstance(payload, dict):
+                # Lists cut off by truncation are refilled from the deterministic attribution
+                payload.setdefault("problems", problems)
+                payload.setdefault("citations", citations)
+            checklist = PolicyChecklist.model_validate(payload)
+        except (JSONRepairError, ValidationError) as e:
+            logger.error(f"Unusable checklist from {self.provider.name}: {e}. Response was: {response_text[:200]}...")
+            metrics.inc("llm_structured_output_total", call="checklist", outcome="invalid")
+            metrics.inc("llm_wasted_calls_total", call="checklist")
+            return self._fallback_checklist(parsed_data)
+
+        metrics.inc("llm_structured_output_total", call="checklist", outcome="repaired" if repaired else "valid")
+        logger.info(f"Successfully generated policy checklist using {self.provider.name}" + (" (repaired JSON)" if repaired else ""))
+        return checklist.model_dump()
     
+    def close(self) -> None:
+        """Drop this instance's rules collection (the shared corpus stays); called when a rules reload retires it"""
+        if self.vectorstore is not None:
+            self.vectorstore.delete_collection()
+        self.vectorstore = None
+        self.corpus_store = None
+
     def _fallback_checklist(self, parsed_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Fallback rule-based checklist if LLM fails"""
+        """Fallback rule-based checklist if LLM fails; marked so analyses built on it are not cached"""
         checklist = {
+            "fallback": True,
             "required_ok": True,
             "problems": [],
             "citations": [
@@ -297,16 +364,9 @@ class GSARulesRAG:
         # R3: Past Performance value check
         valid_pp = 0
         for pp in past_performance:
-            value_str = str(pp.get("value", "0"))
-            # Extract numeric value from strings like "$25,000" or "25000"
-            value_numbers = re.findall(r'[\d,]+', value_str)
-            if value_numbers:
-                try:
-                    value = int(value_numbers[0].replace(',', ''))
-                    if value >= 25000:
-                        valid_pp += 1
-                except (ValueError, IndexError):
-                    continue
+            value = MoneyParser.parse(pp.get("contract_value"))
+            if value is not None and value >= MIN_CONTRACT_VALUE:
+                valid_pp += 1
         
         if valid_pp == 0:
             checklist["problems"].append({
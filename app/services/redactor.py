@@ -3,6 +3,7 @@ import re
 import hashlib
 import secrets
 from app.models.schemas import CompanyProfile,PastPerformance
+from app.core.tracing import traced
 from typing import Dict, List, Tuple,Any
 from hashlib import sha256
 
@@ -26,6 +27,7 @@ class PIIRedactor:
         return hash_object.hexdigest()[:16]  # Use first 16 chars for readability
     
     @staticmethod
+    @traced("redact")
     def redact_and_hash_pii(text: str) -> Tuple[str, Dict[str, List[str]]]:
         """
         Redact PII from text but store hashed versions for later verification
@@ -75,52 +77,51 @@ class PIIRedactor:
         return sha256(val.encode()).hexdigest()[:10]
 
     @staticmethod
+    @traced("redact")
     def redact_and_hash_companyprofile(profile: CompanyProfile) -> Tuple[CompanyProfile, Dict[str, List[Dict[str, str]]]]:
         """
         Redact and hash PII (email, phone) in CompanyProfile.
-        Returns (redacted_companyprofile_dict, pii_hashes_dict)
+        Returns (redacted_companyprofile, pii_hashes_dict)
         """
         pii_hashes = {"emails": [], "phones": []}
-        # Get a dict for copying, as pydantic models are immutable by default unless you set allow_mutation
-        data = profile.dict()
+        # Only the redacted fields are replaced; the copy is not re-validated
+        updates = {}
         
-        if data.get("poc_email"):
-            email = data["poc_email"]
-            email_hash = PIIRedactor._hash_pii_V2(email)
-            data["poc_email"] = f"[EMAIL_HASH_{email_hash}]"
-            pii_hashes["emails"].append({ "hash": email_hash, "token": data["poc_email"]})
+        if profile.poc_email:
+            email_hash = PIIRedactor._hash_pii_V2(profile.poc_email)
+            updates["poc_email"] = f"[EMAIL_HASH_{email_hash}]"
+            pii_hashes["emails"].append({ "hash": email_hash, "token": updates["poc_email"]})
         
-        if data.get("poc_phone"):
-            phone = data["poc_phone"]
-            phone_hash = PIIRedactor._hash_pii_V2(phone)
-            data["poc_phone"] = f"[PHONE_HASH_{phone_hash}]"
-            pii_hashes["phones"].append({ "hash": phone_hash, "token": data["poc_phone"]})
+        if profile.poc_phone:
+            phone_hash = PIIRedactor._hash_pii_V2(profile.poc_phone)
+            updates["poc_phone"] = f"[PHONE_HASH_{phone_hash}]"
+            pii_hashes["phones"].append({ "hash": phone_hash, "token": updates["poc_phone"]})
         
         # Return a new CompanyProfile instance (does not mutate input)
-        redacted_profile = CompanyProfile(**data)
+        redacted_profile = profile.model_copy(update=updates) if updates else profile
         return redacted_profile, pii_hashes
 
     @staticmethod
+    @traced("redact")
     def redact_and_hash_pastperformance(pp:PastPerformance) -> Tuple[PastPerformance, Dict[str, List[Dict[str, str]]]]:
         """
         Redact and hash PII (email, phone) in PastPerformance.
-        Returns (redacted_pastperformance_dict, pii_hashes_dict)
+        Returns (redacted_pastperformance, pii_hashes_dict)
         """
         pii_hashes = {"emails": [], "phones": []}
-        data = pp.dict()
-        if data.get("contact_email"):
-            email = data["contact_email"]
-            email_hash = PIIRedactor._hash_pii_V2(email)
-            data["contact_email"] = f"[EMAIL_HASH_{email_hash}]"
-            pii_hashes["emails"].append({ "hash": email_hash, "token": data["contact_email"]})
+        updates = {}
+        if pp.contact_email:
+            email_hash = PIIRedactor._hash_pii_V2(pp.contact_email)
+            updates["contact_email"] = f"[EMAIL_HASH_{email_hash}]"
+            pii_hashes["emails"].append({ "hash": email_hash, "token": updates["contact_email"]})
 
-        if data.get("contact_phone"):
-            phone = data["contact_phone"]
-            phone_hash = PIIRedactor._hash_pii_V2(phone)
-            data["contact_phone"] = f"[PHONE_HASH_{phone_hash}]"
-            pii_hashes["phones"].append({"hash": phone_hash, "token": data["contact_phone"]})
+        contact_phone = getattr(pp, "contact_phone", None)
+        if contact_phone:
+            phone_hash = PIIRedactor._hash_pii_V2(contact_phone)
+            updates["contact_phone"] = f"[PHONE_HASH_{phone_hash}]"
+            pii_hashes["phones"].append({"hash": phone_hash, "token": updates["contact_phone"]})
 
-        redacted_pp = PastPerformance(**data)
+        redacted_pp = pp.model_copy(update=updates) if updates else pp
         return redacted_pp, pii_hashes
     
     @staticmethod
@@ -0,0 +1,283 @@
+import os
+import time
+import random
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from app.core.metrics import metrics
+from app.services.providers import LLMProvider
+from app.services.prompts import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Exception class names (google.api_core and stdlib) worth retrying; matched by name so
+# this module does not need to import the Google SDK.
+RETRYABLE_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "Aborted", "TimeoutError", "ConnectionError",
+}
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMUnavailableError(Exception):
+    """Base class for calls refused locally; callers fall back exactly as for provider errors"""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    pass
+
+
+class RateLimitExceeded(LLMUnavailableError):
+    pass
+
+
+class DeadlineExceeded(LLMUnavailableError):
+    pass
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate_per_minute, holding up to capacity tokens"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def try_acquire(self, amount: float = 1) -> float:
+        """Take amount tokens if available and return 0; otherwise return seconds until they will be"""
+        with self._lock:
+            self._refill()
+            # Requests larger than the bucket are allowed once it is full, rather than never
+            amount = min(amount, self.capacity)
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate_per_second
+
+    def acquire(self, amount: float = 1, timeout: float = 0.0) -> bool:
+        """Block up to timeout seconds for amount tokens"""
+        deadline = self.clock() + timeout
+        while True:
+            wait = self.try_acquire(amount)
+            if wait == 0.0:
+                return True
+            if self.clock() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and short-circuits calls for reset_timeout_s.
+    Then lets a single trial call through (half-open); success closes it, failure re-opens it.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_s: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout_s:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """Give back a half-open trial that never reached the provider, recording neither outcome"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"LLM circuit breaker opened after {self.failures} failures")
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+                self._trial_in_flight = False
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter on retryable errors"""
+
+    def __init__(self, max_attempts: int = 3, base_delay_s: float = 0.5, max_delay_s: float = 8.0):
+        self.max_attempts = max_attempts
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        if isinstance(error, LLMUnavailableError):
+            return False
+        code = getattr(error, "code", None)
+        if isinstance(code, int) and code in RETRYABLE_STATUS_CODES:
+            return True
+        return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+    def delay(self, attempt: int) -> float:
+        """Sleep before retry number `attempt` (1-based)"""
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * (2 ** (attempt - 1))))
+
+
+class ResilientProvider(LLMProvider):
+    """
+    Shared guard around an LLM provider: request and token rate limits, bounded concurrency,
+    per-call deadlines, jittered retries and a circuit breaker. Refused or failed calls raise,
+    so services keep using their existing fallbacks.
+    """
+    name = "resilient"
+
+    def __init__(self, inner: LLMProvider, requests_per_minute: float = 60, tokens_per_minute: float = 1_000_000,
+                 max_concurrency: int = 8, timeout_s: float = 30.0, retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.inner = inner
+        self.name = inner.name
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.concurrency = threading.BoundedSemaphore(max_concurrency)
+        self.timeout_s = timeout_s
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+
+    @classmethod
+    def from_env(cls, inner: LLMProvider) -> "ResilientProvider":
+        return cls(
+            inner,
+            requests_per_minute=float(os.getenv("LLM_RPM", "60")),
+            tokens_per_minute=float(os.getenv("LLM_TPM", "1000000")),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            timeout_s=float(os.getenv("LLM_TIMEOUT_S", "30")),
+            retry=RetryPolicy(max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "3"))),
+            breaker=CircuitBreaker(failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+                                   reset_timeout_s=float(os.getenv("LLM_BREAKER_RESET_S", "30"))),
+        )
+
+    def _labels(self) -> Dict[str, str]:
+        return {"provider": self.inner.name}
+
+    def _admit(self, prompt: str, generation_config: Optional[Dict[str, Any]], deadline: float) -> None:
+        """Wait for rate-limit budget within the deadline, or raise"""
+        expected_tokens = estimate_tokens(prompt) + int((generation_config or {}).get("max_output_tokens", 0))
+        if not self.request_bucket.acquire(1, timeout=max(0.0, deadline - time.monotonic())):
+            metrics.inc("llm_rate_limited_total", limit="requests", **self._labels())
+            raise RateLimitExceeded("LLM request rate limit reached")
+        if not self.token_bucket.acquire(expected_tokens, timeout=max(0.0, deadline - time.monotonic())):
+            metrics.inc("llm_rate_limited_total", limit="tokens", **self._labels())
+            raise RateLimitExceeded("LLM token rate limit reached")
+        metrics.inc("llm_prompt_tokens_total", estimate_tokens(prompt), **self._labels())
+
+    def _call(self, attempt_fn: Callable[[float], Any], prompt: str,
+              generation_config: Optional[Dict[str, Any]], timeout: Optional[float]) -> Any:
+        deadline = time.monotonic() + (timeout or self.timeout_s)
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self.breaker.allow():
+                metrics.inc("llm_short_circuited_total", **self._labels())
+                raise CircuitOpenError("LLM provider circuit is open")
+            try:
+                self._admit(prompt, generation_config, deadline)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DeadlineExceeded("LLM call deadline exceeded before sending")
+                if not self.concurrency.acquire(timeout=remaining):
+                    raise DeadlineExceeded("LLM call deadline exceeded waiting for a concurrency slot")
+                try:
+                    result = attempt_fn(deadline - time.monotonic())
+                finally:
+                    self.concurrency.release()
+                self.breaker.record_success()
+                metrics.inc("llm_requests_total", outcome="success", **self._labels())
+                return result
+            except LLMUnavailableError as e:
+                # Refused locally; the provider itself is not at fault, so a half-open trial is handed back
+                self.breaker.release()
+                if isinstance(e, DeadlineExceeded):
+                    metrics.inc("llm_deadline_exceeded_total", **self._labels())
+                self._publish_state()
+                raise
+            except Exception as e:
+                self.breaker.record_failure()
+                self._publish_state()
+                retryable = self.retry.is_retryable(e)
+                metrics.inc("llm_requests_total", outcome="retryable_error" if retryable else "error", **self._labels())
+                if not retryable or attempt >= self.retry.max_attempts:
+                    raise
+                delay = self.retry.delay(attempt)
+                if time.monotonic() + delay >= deadline:
+                    metrics.inc("llm_deadline_exceeded_total", **self._labels())
+                    raise
+                metrics.inc("llm_retries_total", **self._labels())
+                logger.warning(f"LLM call failed ({type(e).__name__}: {e}), retry {attempt} in {delay:.2f}s")
+                time.sleep(delay)
+
+    def _publish_state(self) -> None:
+        state = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}[self.breaker.state]
+        metrics.set("llm_circuit_state", state, **self._labels())
+
+    def generate(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> str:
+        return self._call(lambda remaining: self.inner.generate(prompt, generation_config, remaining),
+                          prompt, generation_config, timeout)
+
+    def stream(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+               timeout: Optional[float] = None) -> Iterator[str]:
+        """Retries cover opening the stream and its first chunk; later failures propagate"""
+        def first_chunk(remaining: float):
+            iterator = iter(self.inner.stream(prompt, generation_config, remaining))
+            return iterator, next(iterator, None)
+
+        iterator, chunk = self._call(first_chunk, prompt, generation_config, timeout)
+        if chunk is None:
+            return
+        yield chunk
+        try:
+            yield from iterator
+        except Exception:
+            self.breaker.record_failure()
+            self._publish_state()
+            metrics.inc("llm_requests_total", outcome="stream_error", **self._labels())
+            raise
+
+    def describe(self) -> str:
+        return self.inner.describe()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.inner.describe(),
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "request_tokens_available": round(self.request_bucket.tokens, 2),
+            "token_budget_available": round(self.token_bucket.tokens, 2),
+        }
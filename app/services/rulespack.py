@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PACK_PATH = Path(__file__).resolve().parent.parent / "data" / "rules_pack.json"
+RULE_FIELDS = ("rule_id", "title", "category", "text")
+# Old indexes stay alive this long after a swap so requests that already hold them can finish
+RETIRE_GRACE_S = 60
+
+
+class RulesPackError(ValueError):
+    """The rules pack file is missing, unreadable or malformed"""
+
+
+@dataclass(frozen=True)
+class RulesPack:
+    version: str
+    rules: List[Dict[str, str]]
+    digest: str
+    source: str
+
+    @property
+    def index_name(self) -> str:
+        """Vector collection name prefix; each service adds its own suffix so a rebuild never touches a live index"""
+        return f"gsa_rules_{self.digest[:12]}"
+
+
+def rules_pack_path() -> Path:
+    return Path(os.getenv("RULES_PACK_PATH") or DEFAULT_RULES_PACK_PATH)
+
+
+def rules_pack_dir() -> Path:
+    """Directory reload requests may name packs from (RULES_PACK_DIR, default: the configured pack's directory)"""
+    return Path(os.getenv("RULES_PACK_DIR") or rules_pack_path().parent).resolve()
+
+
+def resolve_pack_path(name: str) -> Path:
+    """A pack path given by an API caller, which must stay inside rules_pack_dir()"""
+    root = rules_pack_dir()
+    path = (root / name).resolve()
+    if not path.is_relative_to(root):
+        raise RulesPackError(f"Rules pack {name} is outside {root}")
+    return path
+
+
+def load_rules_pack(path: Optional[Path] = None) -> RulesPack:
+    """
+    Read a rules pack: {"version": "...", "rules": [{rule_id, title, category, text}, ...]}.
+    A pack without a version is versioned by its content hash.
+    """
+    path = Path(path or rules_pack_path())
+    try:
+        raw = path.read_bytes()
+        data = json.loads(raw)
+    except (OSError, ValueError) as e:
+        raise RulesPackError(f"Cannot read rules pack {path}: {e}") from e
+    rules = data.get("rules") if isinstance(data, dict) else None
+    if not isinstance(rules, list) or not rules:
+        raise RulesPackError(f"Rules pack {path} has no rules")
+    for i, rule in enumerate(rules):
+        missing = [f for f in RULE_FIELDS if not isinstance(rule, dict) or not isinstance(rule.get(f), str)]
+        if missing:
+            raise RulesPackError(f"Rule {i} in {path} is missing {', '.join(missing)}")
+    if len({r["rule_id"] for r in rules}) != len(rules):
+        raise RulesPackError(f"Rules pack {path} repeats a rule_id")
+    digest = hashlib.sha256(raw).hexdigest()
+    return RulesPack(version=str(data.get("version") or digest[:12]), rules=rules, digest=digest, source=str(path))
+
+
+class RulesPackManager:
+    """
+    Owns the live RAG service and replaces it when the rules pack changes.
+
+    reload() builds a service for the new pack on a background thread while the current
+    one keeps serving; the swap is a single reference assignment, so a request sees either
+    the old service or the new one, never a half-built index. The replaced service is
+    retired (its index dropped) after RETIRE_GRACE_S. A failed build leaves the old pack live.
+    """
+
+    def __init__(self, factory: Callable[[RulesPack], Any], path: Optional[Path] = None):
+        self.factory = factory
+        self.path = Path(path) if path else None
+        self._service = None
+        self._pack: Optional[RulesPack] = None
+        self._lock = threading.Lock()
+        self._building: Optional[threading.Thread] = None
+        self._status: Dict[str, Any] = {"state": "idle", "error": None, "reloaded_at": None}
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def current(self):
+        """The live service, built synchronously on first use"""
+        if self._service is None:
+            with self._lock:
+                if self._service is None:
+                    pack = load_rules_pack(self.path)
+                    self._service, self._pack = self.factory(pack), pack
+                    metrics.set("rules_pack_info", 1, version=pack.version)
+        return self._service
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._pack.version if self._pack else None
+
+    def status(self) -> Dict[str, Any]:
+        return {"version": self.version, "source": self._pack.source if self._pack else None, **self._status}
+
+    def reload(self, path: Optional[Path] = None, wait: bool = False) -> Dict[str, Any]:
+        """Start building the pack at `path` (default: the configured one); at most one build at a time"""
+        with self._lock:
+            if self._building and self._building.is_alive():
+                return self.status()
+            self._status.update(state="building", error=None)
+            self._building = threading.Thread(target=self._build, args=(Path(path) if path else self.path,),
+                                              name="rules-reload", daemon=True)
+            self._building.start()
+            thread = self._building
+        if wait:
+            thread.join()
+        return self.status()
+
+    def _build(self, path: Optional[Path]) -> None:
+        started = time.perf_counter()
+        try:
+            pack = load_rules_pack(path)
+            if self._pack and pack.digest == self._pack.digest:
+                self._status.update(state="idle")
+                logger.info(f"Rules pack {pack.version} unchanged; nothing to reload")
+                return
+            service = self.factory(pack)
+        except Exception as e:
+            logger.error(f"Rules pack reload failed, keeping version {self.version}: {e}")
+            self._status.update(state="failed", error=str(e))
+            metrics.inc("rules_pack_reloads_total", outcome="failed")
+            return
+        with self._lock:
+            old_service, old_pack = self._service, self._pack
+            self._service, self._pack, self.path = service, pack, path
+        self._status.update(state="idle", reloaded_at=time.time())
+        metrics.inc("rules_pack_reloads_total", outcome="swapped")
+        if old_pack:
+            metrics.set("rules_pack_info", 0, version=old_pack.version)
+        metrics.set("rules_pack_info", 1, version=pack.version)
+        logger.info(f"Rules pack {old_pack.version if old_pack else None} -> {pack.version} "
+                    f"swapped in after {time.perf_counter() - started:.1f}s")
+        if old_service is not None and hasattr(old_service, "close"):
+            timer = threading.Timer(RETIRE_GRACE_S, old_service.close)
+            timer.daemon = True
+            timer.start()
+
+    def watch(self, interval_s: float) -> None:
+        """Poll the pack file's mtime and reload when it changes"""
+        if self._watcher:
+            return
+
+        def loop():
+            path = self.path or rules_pack_path()
+            last = path.stat().st_mtime if path.exists() else None
+            while not self._stop.wait(interval_s):
+                mtime = path.stat().st_mtime if path.exists() else None
+                if mtime != last:
+                    last = mtime
+                    logger.info(f"Rules pack {path} changed on disk; reloading")
+                    self.reload()
+
+        self._watcher = threading.Thread(target=loop, name="rules-watch", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -1,9 +1,13 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
 import re
 import logging
-import datetime
+from decimal import Decimal
 from app.models.schemas import CompanyProfile, PastPerformance, PricingSheet,ValidationIssues
+from app.services.money import MoneyParser
+from app.services.periods import PeriodParser
+from app.core.tracing import span, traced
 
 logger = logging.getLogger(__name__)
 
@@ -38,10 +42,59 @@ class FieldValidator:
         return bool(perf.customer and perf.contract_description)
     
 
+# Description, evidence template, severity and rule category for every issue the
+# validator can raise. Shared by the per-submission and batch paths so both
+# produce identical issues.
+ISSUE_CATALOG: Dict[str, Tuple[str, str, str, str]] = {
+    "missing_company_profile": ("Company profile document not provided", "No company data found in submission", "blocking", "identity_requirements"),
+    "missing_uei": ("UEI identifier not provided", "UEI field is empty or missing", "blocking", "identity_requirements"),
+    "invalid_uei_format": ("UEI format validation failed", "UEI '{uei}' has {length} characters, requires exactly 12", "blocking", "identity_requirements"),
+    "missing_duns": ("DUNS number not provided", "DUNS field is empty or missing", "blocking", "identity_requirements"),
+    "invalid_duns_format": ("DUNS format validation failed", "DUNS '{duns}' should be exactly 9 digits", "blocking", "identity_requirements"),
+    "sam_status_unknown": ("SAM.gov registration status not provided", "SAM registration status missing", "critical", "identity_requirements"),
+    "sam_not_registered": ("SAM.gov registration not active", "SAM status: '{sam_status}', required: 'registered'", "blocking", "identity_requirements"),
+    "missing_poc_email": ("Primary contact email missing", "Point of contact email not provided", "critical", "identity_requirements"),
+    "missing_poc_phone": ("Primary contact phone missing", "Point of contact phone not provided", "critical", "identity_requirements"),
+    "missing_company_name": ("Company name not provided", "Legal company name missing", "blocking", "identity_requirements"),
+    "missing_naics": ("NAICS codes not provided", "No NAICS codes found", "critical", "naics_requirements"),
+    "invalid_naics_format": ("NAICS code format invalid", "NAICS code '{naics_code}' should be exactly 6 digits", "critical", "naics_requirements"),
+    "no_past_performance": ("No past performance records provided", "Past performance section is empty", "blocking", "past_performance_requirements"),
+    "missing_customer_info": ("Customer information missing from past performance", "Contract {index} missing customer name/organization", "critical", "past_performance_requirements"),
+    "missing_contract_period": ("Contract period missing from past performance", "Contract {index} missing time period/duration", "critical", "past_performance_requirements"),
+    "missing_contact_verification": ("Customer contact information missing", "Contract {index} missing customer contact for verification", "minor", "past_performance_requirements"),
+    "no_qualifying_contracts": ("No contracts meet minimum value requirement", "All {count} contracts below $25,000 threshold", "blocking", "past_performance_requirements"),
+    "missing_pricing_sheet": ("Pricing information not provided", "No pricing sheet or catalog found", "blocking", "pricing_requirements"),
+    "missing_labor_categories": ("Labor categories not defined", "Pricing sheet contains no labor categories", "blocking", "pricing_requirements"),
+    "missing_category_name": ("Labor category name missing", "Labor category {index} has no name/description", "critical", "pricing_requirements"),
+    "missing_hourly_rate": ("Labor category hourly rate missing", "Category '{category}' missing rate", "critical", "pricing_requirements"),
+    "missing_rate_unit": ("Rate unit specification missing", "Category '{category}' missing unit (hour/day/etc.)", "critical", "pricing_requirements"),
+    "validation_error": ("Internal validation error occurred", "System error during validation: {error}", "critical", "system_error"),
+}
+
+MIN_CONTRACT_VALUE = 25000
+RECENCY_WINDOW_MONTHS = 36
+
+# Shared so its clock can be swapped in tests and its cache is warm across calls
+period_parser = PeriodParser()
+
+
+def make_issue(issue_id: str, **evidence_args: Any) -> ComplianceIssue:
+    """Build a ComplianceIssue from the catalog, filling in the evidence template"""
+    description, evidence, severity, rule_category = ISSUE_CATALOG[issue_id]
+    return ComplianceIssue(
+        issue_id=issue_id,
+        description=description,
+        evidence=evidence.format(**evidence_args) if evidence_args else evidence,
+        severity=severity,
+        rule_category=rule_category
+    )
+
+
 class HybridValidator:
     """Production-grade validator for GSA compliance analysis"""
     
     @staticmethod
+    @traced("validate")
     def validate_all_data(parsed_data: Dict[str, Any]) -> List[ComplianceIssue]:
         """Master validation function - comprehensive compliance checking"""
         issues = []
@@ -54,13 +107,7 @@ class HybridValidator:
             if company:
                 issues.extend(HybridValidator._validate_company_compliance(company))
             else:
-                issues.append(ComplianceIssue(
-                    issue_id="missing_company_profile",
-                    description="Company profile document not provided",
-                    evidence="No company data found in submission",
-                    severity="blocking",
-                    rule_category="identity_requirements"
-                ))
+                issues.append(make_issue("missing_company_profile"))
             
             # Validate past performance (R3)
             past_performance = parsed_data.get("past_performance", [])
@@ -74,15 +121,68 @@ class HybridValidator:
             
         except Exception as e:
             logger.error(f"Error during validation: {e}")
-            issues.append(ComplianceIssue(
-                issue_id="validation_error",
-                description="Internal validation error occurred",
-                evidence=f"System error during validation: {str(e)}",
-                severity="critical",
-                rule_category="system_error"
-            ))
+            issues.append(make_issue("validation_error", error=str(e)))
         
         return issues
+
+    @staticmethod
+    def validate_section(section: str, data: Any) -> List[ComplianceIssue]:
+        """Validate one section ("company", "past_performance" or "pricing") of parsed data in isolation"""
+        with span("validate", section=section):
+            return HybridValidator._validate_section(section, data)
+
+    @staticmethod
+    def _validate_section(section: str, data: Any) -> List[ComplianceIssue]:
+        try:
+            if section == "company":
+                if data:
+                    return HybridValidator._validate_company_compliance(data)
+                return [make_issue("missing_company_profile")]
+            if section == "past_performance":
+                return HybridValidator._validate_past_performance_compliance(data)
+            if section == "pricing":
+                return HybridValidator._validate_pricing_compliance(data)
+        except Exception as e:
+            logger.error(f"Error during {section} validation: {e}")
+            return [make_issue("validation_error", error=str(e))]
+        raise ValueError(f"Unknown section: {section}")
+
+    @staticmethod
+    def validate_batch(submissions: Sequence[Dict[str, Any]], workers: Optional[int] = None,
+                       chunk_size: int = 5000) -> List[List[ComplianceIssue]]:
+        """
+        Validate many submissions at once.
+
+        Fields are gathered into columnar arrays and each rule is evaluated as a
+        vectorized mask over the whole batch. Returns one issue list per submission,
+        in input order, matching what validate_all_data returns for each.
+        When workers > 1 and the batch exceeds chunk_size, chunks are validated
+        in a process pool.
+        """
+        submissions = list(submissions)
+        logger.info(f"🔍 Starting batch GSA compliance validation for {len(submissions)} submissions")
+
+        if workers and workers > 1 and len(submissions) > chunk_size:
+            chunks = [submissions[i:i + chunk_size] for i in range(0, len(submissions), chunk_size)]
+            results: List[List[ComplianceIssue]] = []
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for chunk_result in pool.map(HybridValidator._validate_chunk, chunks):
+                    results.extend(chunk_result)
+        else:
+            results = HybridValidator._validate_chunk(submissions)
+
+        logger.info(f"✅ Batch validation complete: {sum(len(r) for r in results)} compliance issues found")
+        return results
+
+    @staticmethod
+    def _validate_chunk(submissions: List[Dict[str, Any]]) -> List[List[ComplianceIssue]]:
+        """Columnar validation of one chunk, falling back to per-submission validation on malformed input"""
+        try:
+            from app.services.columnar import ColumnarBatch  # numpy is only needed for batch validation
+            return ColumnarBatch(submissions).validate()
+        except Exception as e:
+            logger.warning(f"Columnar validation failed ({e}), validating submissions individually")
+            return [HybridValidator.validate_all_data(s) for s in submissions]
     
     @staticmethod
     def _validate_company_compliance(company_data: Dict[str, Any]) -> List[ComplianceIssue]:
@@ -93,139 +193,50 @@ class HybridValidator:
         # UEI validation
         uei = company_data.get("uei")
         if not uei:
-            issues.append(ComplianceIssue(
-                issue_id="missing_uei",
-                description="UEI identifier not provided",
-                evidence="UEI field is empty or missing",
-                severity="blocking",
-                rule_category="identity_requirements"
-            ))
+            issues.append(make_issue("missing_uei"))
         elif len(str(uei).strip()) != 12:
-            issues.append(ComplianceIssue(
-                issue_id="invalid_uei_format",
-                description="UEI format validation failed",
-                evidence=f"UEI '{uei}' has {len(str(uei).strip())} characters, requires exactly 12",
-                severity="blocking",
-                rule_category="identity_requirements"
-            ))
+            issues.append(make_issue("invalid_uei_format", uei=uei, length=len(str(uei).strip())))
         
         # DUNS validation
         duns = company_data.get("duns")
         if not duns:
-            issues.append(ComplianceIssue(
-                issue_id="missing_duns",
-                description="DUNS number not provided",
-                evidence="DUNS field is empty or missing",
-                severity="blocking",
-                rule_category="identity_requirements"
-            ))
+            issues.append(make_issue("missing_duns"))
         elif not re.match(r'^\d{9}$', str(duns).strip()):
-            issues.append(ComplianceIssue(
-                issue_id="invalid_duns_format",
-                description="DUNS format validation failed",
-                evidence=f"DUNS '{duns}' should be exactly 9 digits",
-                severity="blocking",
-                rule_category="identity_requirements"
-            ))
+            issues.append(make_issue("invalid_duns_format", duns=duns))
         
         # SAM registration validation
         sam_status = company_data.get("sam_registered")
         if sam_status is None:
-            issues.append(ComplianceIssue(
-                issue_id="sam_status_unknown",
-                description="SAM.gov registration status not provided",
-                evidence="SAM registration status missing",
-                severity="critical",
-                rule_category="identity_requirements"
-            ))
+            issues.append(make_issue("sam_status_unknown"))
         elif sam_status != True and str(sam_status).lower() != "registered":
-            issues.append(ComplianceIssue(
-                issue_id="sam_not_registered",
-                description="SAM.gov registration not active",
-                evidence=f"SAM status: '{sam_status}', required: 'registered'",
-                severity="blocking",
-                rule_category="identity_requirements"
-            ))
+            issues.append(make_issue("sam_not_registered", sam_status=sam_status))
         
         # Contact information validation
         if not company_data.get("poc_email"):
-            issues.append(ComplianceIssue(
-                issue_id="missing_poc_email",
-                description="Primary contact email missing",
-                evidence="Point of contact email not provided",
-                severity="critical",
-                rule_category="identity_requirements"
-            ))
+            issues.append(make_issue("missing_poc_email"))
         
         if not company_data.get("poc_phone"):
-            issues.append(ComplianceIssue(
-                issue_id="missing_poc_phone", 
-                description="Primary contact phone missing",
-                evidence="Point of contact phone not provided",
-                severity="critical",
-                rule_category="identity_requirements"
-            ))
+            issues.append(make_issue("missing_poc_phone"))
         
         # Company name validation
         if not company_data.get("company_name"):
-            issues.append(ComplianceIssue(
-                issue_id="missing_company_name",
-                description="Company name not provided",
-                evidence="Legal company name missing",
-                severity="blocking",
-                rule_category="identity_requirements"
-            ))
+            issues.append(make_issue("missing_company_name"))
         
         # R2 - NAICS validation
         naics = company_data.get("naics", [])
         if not naics or len(naics) == 0:
-            issues.append(ComplianceIssue(
-                issue_id="missing_naics",
-                description="NAICS codes not provided",
-                evidence="No NAICS codes found",
-                severity="critical",
-                rule_category="naics_requirements"
-            ))
+            issues.append(make_issue("missing_naics"))
         else:
             for i, naics_code in enumerate(naics):
                 if not re.match(r'^\d{6}$', str(naics_code).strip()):
-                    issues.append(ComplianceIssue(
-                        issue_id="invalid_naics_format",
-                        description="NAICS code format invalid",
-                        evidence=f"NAICS code '{naics_code}' should be exactly 6 digits",
-                        severity="critical",
-                        rule_category="naics_requirements"
-                    ))
+                    issues.append(make_issue("invalid_naics_format", naics_code=naics_code))
         
         return issues
     
     @staticmethod
-    def _period_within_last_36_months(period_str):
-    # Example: "07/2023 - 03/2024" or "Jan 2022 - Jul 2024"
-
-        now = datetime.datetime.now()
-        # Attempt to extract end date
-        matches = re.findall(r'(\d{2}/\d{4})|(\w{3,9} \d{4})', period_str)
-        end_date = None
-        for m in matches[::-1]:  # last found date has priority
-            date_str = ''.join(m)
-            try:
-                end_date = datetime.datetime.strptime(date_str, "%m/%Y")
-            except Exception:
-                try:
-                    end_date = datetime.datetime.strptime(date_str, "%b %Y")
-                except Exception:
-                    try:
-                        end_date = datetime.datetime.strptime(date_str, "%B %Y")
-                    except Exception:
-                        continue
-            if end_date:
-                break
-        if not end_date:
-            return False  # can't parse end date, fail safe
-        # 36 months ago from now
-        threshold = now - datetime.timedelta(days=36*30)
-        return end_date >= threshold
+    def _period_within_last_36_months(period_str: Optional[str]) -> bool:
+        """R3 recency - period ends within the last 36 calendar months (unparseable periods fail safe)"""
+        return period_parser.within_last_months(period_str, RECENCY_WINDOW_MONTHS)
 
     @staticmethod
     def _validate_past_performance_compliance(past_performance: List[Dict]) -> List[ComplianceIssue]:
@@ -233,13 +244,7 @@ class HybridValidator:
         issues = []
         
         if not past_performance or len(past_performance) == 0:
-            issues.append(ComplianceIssue(
-                issue_id="no_past_performance",
-                description="No past performance records provided",
-                evidence="Past performance section is empty",
-                severity="blocking",
-                rule_category="past_performance_requirements"
-            ))
+            issues.append(make_issue("no_past_performance"))
             return issues
         
         # Check for qualifying contracts ($25K+ threshold)
@@ -251,48 +256,24 @@ class HybridValidator:
             numeric_value = HybridValidator._extract_numeric_value(contract_value)
             period = pp.get("period", "")
             is_recent = HybridValidator._period_within_last_36_months(period)
-            if numeric_value >= 25000 and is_recent:
+            if numeric_value >= MIN_CONTRACT_VALUE and is_recent:
                 qualifying_contracts += 1
             
             # Customer information validation
             if not pp.get("customer"):
-                issues.append(ComplianceIssue(
-                    issue_id="missing_customer_info",
-                    description="Customer information missing from past performance",
-                    evidence=f"Contract {i+1} missing customer name/organization",
-                    severity="critical",
-                    rule_category="past_performance_requirements"
-                ))
+                issues.append(make_issue("missing_customer_info", index=i+1))
             
             # Contract period validation
             if not pp.get("period"):
-                issues.append(ComplianceIssue(
-                    issue_id="missing_contract_period",
-                    description="Contract period missing from past performance",
-                    evidence=f"Contract {i+1} missing time period/duration",
-                    severity="critical",
-                    rule_category="past_performance_requirements"
-                ))
+                issues.append(make_issue("missing_contract_period", index=i+1))
             
             # Contact verification
             if not pp.get("contact_email") or not pp.get("contact_name"):
-                issues.append(ComplianceIssue(
-                    issue_id="missing_contact_verification",
-                    description="Customer contact information missing",
-                    evidence=f"Contract {i+1} missing customer contact for verification",
-                    severity="minor",
-                    rule_category="past_performance_requirements"
-                ))
+                issues.append(make_issue("missing_contact_verification", index=i+1))
         
         # Overall qualification assessment
         if qualifying_contracts == 0:
-            issues.append(ComplianceIssue(
-                issue_id="no_qualifying_contracts",
-                description="No contracts meet minimum value requirement",
-                evidence=f"All {len(past_performance)} contracts below $25,000 threshold",
-                severity="blocking",
-                rule_category="past_performance_requirements"
-            ))
+            issues.append(make_issue("no_qualifying_contracts", count=len(past_performance)))
         
         return issues
     
@@ -302,71 +283,28 @@ class HybridValidator:
         issues = []
         
         if not pricing_data:
-            issues.append(ComplianceIssue(
-                issue_id="missing_pricing_sheet",
-                description="Pricing information not provided",
-                evidence="No pricing sheet or catalog found",
-                severity="blocking",
-                rule_category="pricing_requirements"
-            ))
+            issues.append(make_issue("missing_pricing_sheet"))
             return issues
         
         labor_categories = pricing_data.get("labor_categories", [])
         if not labor_categories or len(labor_categories) == 0:
-            issues.append(ComplianceIssue(
-                issue_id="missing_labor_categories",
-                description="Labor categories not defined",
-                evidence="Pricing sheet contains no labor categories",
-                severity="blocking",
-                rule_category="pricing_requirements"
-            ))
+            issues.append(make_issue("missing_labor_categories"))
             return issues
         
         # Validate each labor category
         for i, category in enumerate(labor_categories):
             if not category.get("category"):
-                issues.append(ComplianceIssue(
-                    issue_id="missing_category_name",
-                    description="Labor category name missing",
-                    evidence=f"Labor category {i+1} has no name/description",
-                    severity="critical",
-                    rule_category="pricing_requirements"
-                ))
+                issues.append(make_issue("missing_category_name", index=i+1))
             
             if not category.get("rate"):
-                issues.append(ComplianceIssue(
-                    issue_id="missing_hourly_rate",
-                    description="Labor category hourly rate missing",
-                    evidence=f"Category '{category.get('category', 'unnamed')}' missing rate",
-                    severity="critical",
-                    rule_category="pricing_requirements"
-                ))
+                issues.append(make_issue("missing_hourly_rate", category=category.get('category', 'unnamed')))
             
             if not category.get("unit"):
-                issues.append(ComplianceIssue(
-                    issue_id="missing_rate_unit",
-                    description="Rate unit specification missing",
-                    evidence=f"Category '{category.get('category', 'unnamed')}' missing unit (hour/day/etc.)",
-                    severity="critical",
-                    rule_category="pricing_requirements"
-                ))
+                issues.append(make_issue("missing_rate_unit", category=category.get('category', 'unnamed')))
         
         return issues
     
     @staticmethod
-    def _extract_numeric_value(value_str: str) -> int:
-        """Extract numeric value from currency strings"""
-        if not value_str:
-            return 0
-        
-        # Remove currency symbols and commas
-        cleaned = str(value_str).replace('$', '').replace(',', '').strip()
-        
-        # Find numeric sequences
-        numbers = re.findall(r'\d+', cleaned)
-        if numbers:
-            try:
-                return int(numbers[0])
-            except (ValueError, IndexError):
-                return 0
-        return 0
+    def _extract_numeric_value(value_str: str) -> Decimal:
+        """Extract numeric value from currency strings ("$1.2M", "25,000.50", "USD 30K")"""
+        return MoneyParser.parse(value_str) or Decimal(0)
@@ -0,0 +1,83 @@
+"""
+Cold-start import cost of the ingest-only path, from `python -X importtime`.
+
+    python -m benchmarks.importtime                     # report for app.main
+    python -m benchmarks.importtime --budget-ms 1500    # exit 1 when over budget or a heavy module loads
+
+Runs in a fresh interpreter each time so nothing is already cached in sys.modules.
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+# Loaded on first use by the RAG/LLM services; importing the app must not pull them in
+HEAVY_MODULES = ("numpy", "torch", "sentence_transformers", "langchain", "langchain_community",
+                 "chromadb", "google.generativeai", "onnxruntime")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Rows of {module, self_us, cumulative_us, depth} from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({"module": module, "self_us": int(self_us), "cumulative_us": int(cumulative_us),
+                         "depth": (len(indent) - 1) // 2})
+    return rows
+
+
+def measure_import(module: str) -> List[Dict[str, Any]]:
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True, check=True)
+    return parse_importtime(completed.stderr)
+
+
+def summarize(rows: List[Dict[str, Any]], module: str, top: int) -> Dict[str, Any]:
+    # importtime prints children before their parent, so the module's direct imports are the
+    # depth-1 rows between the previous top-level row and the module's own
+    end = max((i for i, r in enumerate(rows) if r["module"] == module and r["depth"] == 0), default=len(rows))
+    start = max((i for i, r in enumerate(rows[:end]) if r["depth"] == 0), default=-1) + 1
+    children = [r for r in rows[start:end] if r["depth"] == 1]
+    total = rows[end]["cumulative_us"] if end < len(rows) else 0
+    loaded = {r["module"] for r in rows}
+    return {
+        "module": module,
+        "total_ms": round(total / 1000, 2),
+        "modules_imported": len(rows),
+        "direct_imports": [{"module": r["module"], "cumulative_ms": round(r["cumulative_us"] / 1000, 2)}
+                           for r in sorted(children, key=lambda r: r["cumulative_us"], reverse=True)[:top]],
+        "heavy_modules_loaded": sorted(m for m in HEAVY_MODULES if m in loaded),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters; the median total is reported")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, help="fail when the median import time exceeds this")
+    args = parser.parse_args(argv)
+
+    runs = [summarize(measure_import(args.module), args.module, args.top) for _ in range(args.runs)]
+    report = dict(runs[-1], total_ms=round(statistics.median(r["total_ms"] for r in runs), 2),
+                  runs_ms=[r["total_ms"] for r in runs], budget_ms=args.budget_ms)
+    print(json.dumps(report, indent=2))
+
+    if report["heavy_modules_loaded"]:
+        print(f"{args.module} imports heavy modules: {', '.join(report['heavy_modules_loaded'])}", file=sys.stderr)
+        return 1
+    if args.budget_ms is not None and report["total_ms"] > args.budget_ms:
+        print(f"{args.module} import took {report['total_ms']} ms, over the {args.budget_ms} ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
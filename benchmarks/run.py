@@ -0,0 +1,270 @@
+"""
+Micro-benchmarks for the parser, redactor, validator and rule retrieval.
+
+    python -m benchmarks.run --pp-records 20 --pricing-rows 500 --output bench.json
+    python -m benchmarks.run --compare bench.json      # rerun and report ratios against a baseline
+
+Results are machine-readable JSON so runs from different commits can be compared.
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.synthetic import generate_package, write_rules_corpus
+
+SUITES = ("parser", "redactor", "validator", "retrieval", "embeddings", "corpus", "mapper")
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+    }
+
+
+def _texts(package: Dict, doc_type: str) -> List[str]:
+    return [d["text"] for d in package["documents"] if d["type_hint"] == doc_type]
+
+
+def bench_parser(package: Dict, repeat: int) -> Dict[str, Dict]:
+    from app.services.parser import DocumentParser
+    profile, pricing, pps = _texts(package, "profile")[0], _texts(package, "pricing")[0], _texts(package, "past_performance")
+    return {
+        "classify_document": measure(lambda: [DocumentParser.classify_document(d["text"]) for d in package["documents"]], repeat),
+        "parse_company_profile": measure(lambda: DocumentParser.parse_company_profile(profile), repeat),
+        "parse_past_performance": measure(lambda: [DocumentParser.parse_past_performance(t) for t in pps], repeat),
+        "parse_pricing_sheet": measure(lambda: DocumentParser.parse_pricing_sheet(pricing), repeat),
+    }
+
+
+def bench_redactor(package: Dict, repeat: int) -> Dict[str, Dict]:
+    from app.services.parser import DocumentParser
+    from app.services.redactor import PIIRedactor
+    all_text = "\n".join(d["text"] for d in package["documents"])
+    company = DocumentParser.parse_company_profile(_texts(package, "profile")[0])
+    pps = [pp for t in _texts(package, "past_performance") for pp in DocumentParser.parse_past_performance(t)]
+    return {
+        "redact_and_hash_pii": measure(lambda: PIIRedactor.redact_and_hash_pii(all_text), repeat),
+        "redact_and_hash_companyprofile": measure(lambda: PIIRedactor.redact_and_hash_companyprofile(company), repeat),
+        "redact_and_hash_pastperformance": measure(lambda: [PIIRedactor.redact_and_hash_pastperformance(pp) for pp in pps], repeat),
+    }
+
+
+def _parsed(package: Dict) -> Dict[str, Any]:
+    """Parsed package in the mapping form /analyze hands to the validator and RAG"""
+    from app.models.schemas import record_view
+    from app.services.parser import DocumentParser
+    return {
+        "company": record_view(DocumentParser.parse_company_profile(_texts(package, "profile")[0])),
+        "past_performance": [record_view(pp) for t in _texts(package, "past_performance")
+                             for pp in DocumentParser.parse_past_performance(t)],
+        "pricing": record_view(DocumentParser.parse_pricing_sheet(_texts(package, "pricing")[0])),
+    }
+
+
+def bench_validator(package: Dict, repeat: int, batch_size: int) -> Dict[str, Dict]:
+    from app.services.validator import HybridValidator
+    parsed = _parsed(package)
+    batch = [_parsed(generate_package(seed=i, pp_records=3, pricing_rows=10)) for i in range(batch_size)]
+    return {
+        "validate_all_data": measure(lambda: HybridValidator.validate_all_data(parsed), repeat),
+        "validate_section[past_performance]": measure(
+            lambda: HybridValidator.validate_section("past_performance", parsed["past_performance"]), repeat),
+        f"validate_batch[{batch_size}]": measure(lambda: HybridValidator.validate_batch(batch, workers=1), max(1, repeat // 10)),
+    }
+
+
+def bench_retrieval(package: Dict, repeat: int) -> Dict[str, Any]:
+    """Rule retrieval and checklist assembly against the real embedding model, with a stub LLM"""
+    try:
+        from app.services.providers import StubProvider
+        from app.services.rag import GSARulesRAG
+        from app.services.validator import HybridValidator
+    except ImportError as e:
+        return {"skipped": f"RAG dependencies unavailable: {e}"}
+    started = time.perf_counter()
+    rag = GSARulesRAG(provider=StubProvider(responder=lambda prompt: '{"required_ok": false, "problems": [], "citations": []}'))
+    init_ms = (time.perf_counter() - started) * 1000
+    parsed = _parsed(package)
+    issues = HybridValidator.validate_all_data(parsed)
+    queries = [i.rule_category or i.description for i in issues] or ["past performance"]
+    return {
+        "init_ms": round(init_ms, 2),
+        "retrieve_relevant_rules": measure(lambda: [rag.retrieve_relevant_rules(q, k=1) for q in queries], repeat),
+        "build_policy_checklist": measure(lambda: rag.build_policy_checklist(parsed, issues=issues), repeat),
+    }
+
+
+def bench_embeddings(repeat: int) -> Dict[str, Any]:
+    """Load cost, RSS growth and encode latency of each embedding backend that can load here"""
+    from app.core.metrics import process_rss_bytes
+    from app.services.embeddings import load_embedding_model
+    from app.services.rag import GSA_RULES
+    rules = [rule["text"] for rule in GSA_RULES]
+    results: Dict[str, Any] = {}
+    for backend in ("torch", "onnx"):
+        rss_before, started = process_rss_bytes(), time.perf_counter()
+        try:
+            model = load_embedding_model(backend)
+        except Exception as e:  # missing package or exported model
+            results[backend] = {"skipped": f"{type(e).__name__}: {e}"}
+            continue
+        results[backend] = {
+            "load_ms": round((time.perf_counter() - started) * 1000, 2),
+            "rss_delta_mb": round((process_rss_bytes() - rss_before) / 2**20, 1),
+            "encode_rules": measure(lambda: model.encode(rules), repeat),
+            "encode_query": measure(lambda: model.encode(["past performance contract value"]), repeat),
+        }
+    return results
+
+
+def bench_corpus(repeat: int, files: int) -> Dict[str, Any]:
+    """Chunking cost for a synthetic corpus and, when the RAG stack is installed, index and query latency"""
+    import tempfile
+    from pathlib import Path
+    from app.services.corpus import CorpusIndexer, chunk_file
+    from app.services.lexical import BM25Index
+    with tempfile.TemporaryDirectory() as tmp:
+        clauses = write_rules_corpus(tmp, files=files)
+        paths = sorted(Path(tmp).glob("*.md"))
+        chunks = [c for p in paths for c in chunk_file(p, Path(tmp))]
+        lexical = BM25Index()
+        lexical.add_many((c.chunk_id, c.text, c.metadata()) for c in chunks)
+        results: Dict[str, Any] = {
+            "files": files, "clauses": clauses, "chunks": len(chunks),
+            "chunk_corpus": measure(lambda: [chunk_file(p, Path(tmp)) for p in paths], max(1, repeat // 10)),
+            "bm25_search[clause]": measure(lambda: lexical.search("552.201-7", k=10), repeat),
+            "bm25_search[prose]": measure(lambda: lexical.search("migration support documentation", k=10), repeat),
+        }
+        try:
+            from langchain_community.vectorstores import Chroma
+            from app.services.rag import CustomEmbeddings
+        except ImportError as e:
+            results["index"] = {"skipped": f"RAG dependencies unavailable: {e}"}
+            return results
+        store = Chroma(collection_name="bench_corpus", embedding_function=CustomEmbeddings())
+        started = time.perf_counter()
+        CorpusIndexer(tmp, store).sync()
+        results["initial_sync_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        results["similarity_search[k=3]"] = measure(lambda: store.similarity_search("price reductions clause", k=3), repeat)
+        store.delete_collection()
+    return results
+
+
+def bench_mapper(repeat: int, vendors: int) -> Dict[str, Any]:
+    """NAICS -> SIN batch mapping for `vendors` synthetic vendors of 1-5 codes each"""
+    import random
+    from app.services.mapper import NaicsSinMapper, get_index
+    rng = random.Random(0)
+    pool = ["541511", "541512", "541519", "541599", "518210", "541611", "541690", "561320", "000000", "334111"]
+    batch = {f"vendor-{i}": rng.sample(pool, rng.randint(1, 5)) for i in range(vendors)}
+    get_index()
+    return {
+        f"map_batch[{vendors}]": measure(lambda: NaicsSinMapper.map_batch(batch), max(1, repeat // 10)),
+        "get_recommended_sins": measure(lambda: NaicsSinMapper.get_recommended_sins(pool), repeat),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine()}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    package = generate_package(seed=args.seed, pp_records=args.pp_records, pricing_rows=args.pricing_rows,
+                               description_chars=args.description_chars, pii_density=args.pii_density)
+    results: Dict[str, Any] = {}
+    for suite in args.suites:
+        if suite == "parser":
+            results[suite] = bench_parser(package, args.repeat)
+        elif suite == "redactor":
+            results[suite] = bench_redactor(package, args.repeat)
+        elif suite == "validator":
+            results[suite] = bench_validator(package, args.repeat, args.batch_size)
+        elif suite == "retrieval":
+            results[suite] = bench_retrieval(package, args.repeat)
+        elif suite == "embeddings":
+            results[suite] = bench_embeddings(args.repeat)
+        elif suite == "corpus":
+            results[suite] = bench_corpus(args.repeat, args.corpus_files)
+        elif suite == "mapper":
+            results[suite] = bench_mapper(args.repeat, args.batch_size)
+    return {
+        "environment": environment(),
+        "config": {k: getattr(args, k) for k in ("seed", "pp_records", "pricing_rows", "description_chars",
+                                                 "pii_density", "repeat", "batch_size", "corpus_files")},
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Lines describing median changes; entries slower than threshold are marked REGRESSION"""
+    lines = []
+    for suite, benches in current["results"].items():
+        for name, stats in benches.items():
+            before = baseline.get("results", {}).get(suite, {}).get(name)
+            if not isinstance(stats, dict) or not isinstance(before, dict) or not before.get("median_ms"):
+                continue
+            ratio = stats["median_ms"] / before["median_ms"]
+            flag = "  REGRESSION" if ratio > threshold else ""
+            lines.append(f"{suite}.{name}: {before['median_ms']:.3f} -> {stats['median_ms']:.3f} ms (x{ratio:.2f}){flag}")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pp-records", type=int, default=10)
+    parser.add_argument("--pricing-rows", type=int, default=200)
+    parser.add_argument("--description-chars", type=int, default=400)
+    parser.add_argument("--pii-density", type=float, default=0.02)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--corpus-files", type=int, default=20, help="synthetic rules files of 50 clauses each")
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="median ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    # Parser and validator log at INFO per call, which would dominate the timings
+    logging.disable(logging.INFO)
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            lines = compare(report, json.load(f), args.threshold)
+        print("\n".join(lines), file=sys.stderr)
+        return 1 if any(line.endswith("REGRESSION") for line in lines) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Deterministic synthetic vendor packages for benchmarks and load tests."""
+import random
+from typing import Dict, List
+
+FIRST = ["Jane", "Mark", "Ana", "Luis", "Priya", "Omar", "Chen", "Grace", "Ivan", "Sara"]
+LAST = ["Smith", "Lee", "Garcia", "Patel", "Khan", "Wong", "Hopper", "Petrov", "Cohen", "Okafor"]
+AGENCIES = ["City of Palo Alto", "Dept. of Energy", "County of Marin", "GSA Region 9", "US Forest Service"]
+ROLES = ["Junior Developer", "Senior Developer", "Project Manager", "Data Engineer", "Security Analyst", "Architect"]
+UNITS = ["Hour", "Day", "Month"]
+FILLER = ("delivered migration support training documentation integration testing analytics "
+          "modernization cloud hosting helpdesk reporting accessibility audit").split()
+
+
+def _email(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST).lower()}.{rng.choice(LAST).lower()}{rng.randint(1, 99)}@example.gov"
+
+
+def _phone(rng: random.Random) -> str:
+    return f"({rng.randint(200, 989)}) 555-{rng.randint(1000, 9999)}"
+
+
+def _prose(rng: random.Random, chars: int, pii_density: float) -> str:
+    """Filler text of about `chars` characters; pii_density is the share of words replaced by an email or phone"""
+    words: List[str] = []
+    length = 0
+    while length < chars:
+        roll = rng.random()
+        if roll < pii_density / 2:
+            word = _email(rng)
+        elif roll < pii_density:
+            word = _phone(rng)
+        else:
+            word = rng.choice(FILLER)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def generate_package(seed: int = 0, pp_records: int = 3, pricing_rows: int = 10,
+                     description_chars: int = 200, pii_density: float = 0.02) -> Dict:
+    """An ingest_v2 request body: one profile, pp_records past-performance documents and one pricing sheet"""
+    rng = random.Random(seed)
+    company = f"Vendor {seed} Solutions LLC"
+    profile = "\n".join([
+        company,
+        f"UEI: {''.join(rng.choice('ABCDEFGHJKLMNPQRSTUVWXYZ0123456789') for _ in range(12))}",
+        f"DUNS: {rng.randint(100000000, 999999999)}",
+        f"NAICS: {', '.join(rng.sample(['541511', '541512', '541611', '518210'], 2))}",
+        f"POC: {rng.choice(FIRST)} {rng.choice(LAST)}, {_email(rng)}, {_phone(rng)}",
+        f"Address: {rng.randint(1, 999)} Market St, San Francisco, CA",
+        "SAM.gov: registered",
+    ])
+    documents = [{"name": "profile", "type_hint": "profile", "text": profile}]
+    for i in range(pp_records):
+        start_year = rng.randint(2019, 2024)
+        documents.append({"name": f"pp_{i}", "type_hint": "past_performance", "text": "\n".join([
+            f"Customer: {rng.choice(AGENCIES)}",
+            f"Contract: {_prose(rng, description_chars, pii_density)}",
+            f"Value: ${rng.randint(5, 900) * 1000:,}",
+            f"Period: {rng.randint(1, 12):02d}/{start_year} - {rng.randint(1, 12):02d}/{start_year + 1}",
+            f"Contact: {rng.choice(FIRST)} {rng.choice(LAST)}, {_email(rng)}",
+        ])})
+    rows = ["Labor Category, Rate, Unit"] + [
+        f"{rng.choice(ROLES)} {i}, {rng.randint(60, 320)}, {rng.choice(UNITS)}" for i in range(pricing_rows)
+    ]
+    documents.append({"name": "pricing", "type_hint": "pricing", "text": "\n".join(rows)})
+    return {"vendor_id": f"vendor-{seed}", "documents": documents}
+
+
+def write_rules_corpus(directory: str, files: int = 10, clauses_per_file: int = 50,
+                       clause_chars: int = 1500, seed: int = 0) -> int:
+    """Markdown rules files shaped like GSAM clauses under `directory`; returns the clause count"""
+    import os
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    for f in range(files):
+        sections = [f"---\nrule_id: GSAM-{f}\ntitle: Synthetic Part {f}\ncategory: solicitation\n---\n"]
+        for c in range(clauses_per_file):
+            paragraphs = [_prose(rng, clause_chars // 3, 0.0) + "." for _ in range(3)]
+            sections.append(f"## 552.{200 + f:03d}-{c + 1} Clause {c + 1}\n" + "\n\n".join(paragraphs))
+        with open(os.path.join(directory, f"part_{f:03d}.md"), "w") as out:
+            out.write("\n\n".join(sections) + "\n")
+    return files * clauses_per_file
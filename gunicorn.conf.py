@@ -0,0 +1,19 @@
+# gunicorn -c gunicorn.conf.py app.main:app
+#
+# Pre-fork deployment: the master imports the app and, with PRELOAD_MODELS=1 (the default
+# here), loads the embedding model and rule vectors before forking, so N workers share one
+# copy of the weights copy-on-write instead of each loading ~90MB of their own.
+import os
+import multiprocessing
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", min(4, multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+
+
+def on_starting(server):
+    if os.getenv("PRELOAD_MODELS", "1") == "1":
+        from app.services.embeddings import preload
+        preload()
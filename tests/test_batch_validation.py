@@ -0,0 +1,53 @@
+from app.services.validator import HybridValidator
+
+
+def _company(**overrides):
+    company = {
+        "company_name": "TestCo",
+        "uei": "A" * 12,
+        "duns": "123456789",
+        "naics": ["541511"],
+        "poc_email": "test@example.com",
+        "poc_phone": "555-123-4567",
+        "address": "123 Main St",
+        "sam_registered": True
+    }
+    company.update(overrides)
+    return company
+
+
+def _submissions():
+    pp_ok = {
+        "customer": "Agency",
+        "contract_description": "Dev",
+        "contract_value": "$80,000",
+        "period": "01/2025 - 12/2025",
+        "contact_name": "John",
+        "contact_email": "john@agency.com"
+    }
+    pp_small = dict(pp_ok, contract_value="$18,000", customer=None, contact_email=None)
+    pricing = {"labor_categories": [
+        {"category": "Senior Developer", "rate": 185.0, "unit": "Hour"},
+        {"category": None, "rate": None, "unit": None},
+    ]}
+    return [
+        {"company": _company(), "past_performance": [pp_ok], "pricing": pricing},
+        {"company": _company(uei=None, duns="12-34", naics=["54151", "541611"]), "past_performance": [], "pricing": None},
+        {"company": _company(uei="SHORT", sam_registered=False, poc_phone=None), "past_performance": [pp_small, pp_ok], "pricing": {"labor_categories": []}},
+        {"company": None, "past_performance": [dict(pp_ok, period=None)], "pricing": pricing},
+        {"company": _company(naics=[], sam_registered=None, company_name=""), "past_performance": [pp_small], "pricing": pricing},
+    ]
+
+
+def test_validate_batch_matches_single_validation():
+    submissions = _submissions()
+    batch = HybridValidator.validate_batch(submissions)
+    assert len(batch) == len(submissions)
+    for parsed, issues in zip(submissions, batch):
+        assert issues == HybridValidator.validate_all_data(parsed)
+
+
+def test_validate_batch_process_pool():
+    submissions = _submissions() * 4
+    batch = HybridValidator.validate_batch(submissions, workers=2, chunk_size=5)
+    assert batch == [HybridValidator.validate_all_data(s) for s in submissions]
@@ -0,0 +1,28 @@
+from benchmarks.run import main
+from benchmarks.synthetic import generate_package
+from app.services.parser import DocumentParser
+
+
+def test_synthetic_package_is_deterministic_and_parseable():
+    package = generate_package(seed=7, pp_records=4, pricing_rows=25, pii_density=0.1)
+    assert package == generate_package(seed=7, pp_records=4, pricing_rows=25, pii_density=0.1)
+    assert len(package["documents"]) == 6
+    pricing = DocumentParser.parse_pricing_sheet(package["documents"][-1]["text"])
+    assert len(pricing.labor_categories) == 25 and all(row["rate"] for row in pricing.labor_categories)
+
+
+def test_benchmark_run_writes_json(tmp_path):
+    import json
+    output = tmp_path / "bench.json"
+    assert main(["--suites", "parser", "validator", "--repeat", "2", "--batch-size", "4", "--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert report["results"]["parser"]["parse_pricing_sheet"]["runs"] == 2
+    assert "validate_batch[4]" in report["results"]["validator"]
+
+
+def test_app_import_does_not_load_ml_stack():
+    from benchmarks.importtime import measure_import, summarize
+    for module in ("app.main", "app.services.rag", "app.services.llm"):
+        report = summarize(measure_import(module), module, top=5)
+        assert report["heavy_modules_loaded"] == [], module
+        assert report["total_ms"] > 0
@@ -0,0 +1,46 @@
+import json
+from app.core.metrics import metrics
+from app.services.combined import CombinedGenerator
+from app.services.llm import LLMService
+from app.services.providers import StubProvider
+
+PARSED = {"company": {"company_name": "Acme", "naics": ["541511"]}, "past_performance": [], "pricing": None}
+
+
+class StubRAG:
+    rules_version = "test"
+
+    def __init__(self):
+        self.checklist_calls = 0
+
+    def match_rules(self, issues):
+        return [{"issue": "missing_uei", "evidence": "UEI missing", "rule_id": "R1"}], [{"rule_id": "R1", "chunk": "UEI rule"}]
+
+    def build_policy_checklist(self, parsed_data, issues=None, matched=None):
+        self.checklist_calls += 1
+        return {"required_ok": False, "problems": [], "citations": []}
+
+
+def test_single_call_returns_all_sections():
+    response = {
+        "checklist": {"required_ok": False, "problems": [{"issue": "missing_uei", "evidence": "UEI missing", "rule_id": "R1"}],
+                      "citations": [{"rule_id": "R1", "chunk": "UEI rule"}]},
+        "negotiation_brief": "Brief.", "client_email": "Subject: Hi",
+    }
+    provider = StubProvider(responder=lambda prompt: json.dumps(response))
+    rag = StubRAG()
+    analysis = CombinedGenerator(rag, LLMService(provider=provider)).generate(PARSED, [])
+    assert provider.calls == 1 and rag.checklist_calls == 0
+    assert analysis["checklist"]["rules_version"] == "test"
+    assert analysis["checklist"]["problems"][0]["issue"] == "missing_uei"
+    assert analysis["brief"] == "Brief." and analysis["fallback_sections"] == []
+
+
+def test_invalid_sections_fall_back_individually():
+    metrics.reset()
+    provider = StubProvider(responder=lambda prompt: json.dumps({"checklist": {"required_ok": "maybe"}, "negotiation_brief": "Brief."}))
+    rag = StubRAG()
+    analysis = CombinedGenerator(rag, LLMService(provider=provider)).generate(PARSED, [])
+    assert analysis["fallback_sections"] == ["checklist", "client_email"]
+    assert analysis["brief"] == "Brief." and rag.checklist_calls == 1
+    assert metrics.get("llm_combined_section_fallback_total", section="client_email") == 1
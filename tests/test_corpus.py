@@ -0,0 +1,101 @@
+from app.services.corpus import CorpusIndexer, chunk_file, chunk_text
+
+
+class RecordingStore:
+    """Minimal VectorStore stand-in: remembers which texts it was asked to embed"""
+
+    def __init__(self):
+        self.docs = {}
+        self.embedded = []
+
+    def add_texts(self, texts, metadatas, ids):
+        self.embedded.extend(texts)
+        self.docs.update({i: (t, m) for i, t, m in zip(ids, texts, metadatas)})
+
+    def delete(self, ids):
+        for i in ids:
+            self.docs.pop(i)
+
+
+RULES = """---
+rule_id: MAS
+title: MAS Solicitation
+category: solicitation
+---
+Intro paragraph about the Multiple Award Schedule.
+
+## 552.238-81 Price Reductions
+The contractor shall maintain the agreed relationship between prices.
+
+## Ordering Procedures
+Agencies place orders directly with the contractor.
+"""
+
+
+def test_chunk_text_respects_size_and_overlaps():
+    text = "\n\n".join(f"Paragraph {i} " + "word " * 40 for i in range(20))
+    chunks = chunk_text(text, size=500, overlap=100)
+    assert len(chunks) > 3 and all(len(c) <= 600 for c in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split(" Paragraph")[0].strip() in previous
+
+
+def test_chunk_file_metadata_and_stable_ids(tmp_path):
+    (tmp_path / "mas.md").write_text(RULES)
+    chunks = chunk_file(tmp_path / "mas.md", tmp_path)
+    assert [(c.rule_id, c.title, c.category) for c in chunks] == [
+        ("MAS", "MAS Solicitation", "solicitation"),
+        ("552.238-81", "Price Reductions", "solicitation"),
+        ("MAS", "Ordering Procedures", "solicitation"),
+    ]
+    assert chunks[1].text.startswith("552.238-81 Price Reductions: ")
+    assert [c.chunk_id for c in chunk_file(tmp_path / "mas.md", tmp_path)] == [c.chunk_id for c in chunks]
+
+
+def test_sync_only_embeds_changed_content(tmp_path):
+    corpus, index = tmp_path / "corpus", tmp_path / "index"
+    corpus.mkdir()
+    (corpus / "mas.md").write_text(RULES)
+    (corpus / "gsam.txt").write_text("GSAM clause text.")
+    store = RecordingStore()
+    report = CorpusIndexer(str(corpus), store, str(index)).sync()
+    assert (report.added, len(report.changed_files)) == (4, 2)
+
+    # A fresh indexer reads the manifest: nothing changed, nothing embedded
+    store.embedded.clear()
+    assert CorpusIndexer(str(corpus), store, str(index)).sync().unchanged_files == 2
+    assert store.embedded == []
+
+    # Editing one section re-embeds just that chunk; deleting a file removes its chunks
+    (corpus / "mas.md").write_text(RULES.replace("directly with", "directly through"))
+    (corpus / "gsam.txt").unlink()
+    report = CorpusIndexer(str(corpus), store, str(index)).sync()
+    assert len(store.embedded) == 1 and "directly through" in store.embedded[0]
+    assert (report.added, report.removed, report.deleted_files) == (1, 2, ["gsam.txt"])
+    assert len(store.docs) == 3
+
+
+def test_pack_rules_and_shared_corpus_are_searched_together():
+    from types import SimpleNamespace
+    from app.services.rag import GSARulesRAG
+
+    class ScoredStore:
+        def __init__(self, scored):
+            self.scored = scored
+            self.deleted = False
+
+        def similarity_search_with_score(self, query, k):
+            return [(SimpleNamespace(page_content=text), score) for text, score in self.scored][:k]
+
+        def delete_collection(self):
+            self.deleted = True
+
+    rag = GSARulesRAG.__new__(GSARulesRAG)
+    rag.retrieval_mode = "vector"
+    rag.vectorstore = pack = ScoredStore([("R1 pack rule", 0.2), ("R3 pack rule", 0.9)])
+    rag.corpus_store = corpus = ScoredStore([("552.238-81 corpus chunk", 0.5)])
+    docs, mode = rag._retrieve("price reductions", k=2)
+    assert mode == "vector" and [d.page_content for d in docs] == ["R1 pack rule", "552.238-81 corpus chunk"]
+
+    rag.close()  # retiring a pack drops only its own collection
+    assert pack.deleted and not corpus.deleted
@@ -0,0 +1,69 @@
+import gc
+
+from app.services import embeddings
+from app.services.incremental import LRUCache
+
+
+class FakeArray(list):
+    def tolist(self):
+        return list(self)
+
+
+class FakeModel:
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts):
+        self.batches.append(list(texts))
+        return FakeArray([[float(len(t))] for t in texts])
+
+
+def test_document_vectors_are_encoded_once_and_shared(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(embeddings, "_model", model)
+    monkeypatch.setattr(embeddings, "_document_vectors", LRUCache(16))
+    assert embeddings.embed_documents(["ab", "abc", "ab"]) == [[2.0], [3.0], [2.0]]
+    assert embeddings.embed_documents(["abc", "abcd"]) == [[3.0], [4.0]]
+    assert model.batches == [["ab", "abc"], ["abcd"]]
+
+    monkeypatch.setattr(embeddings, "_document_vectors", LRUCache(2))
+    embeddings.embed_documents(["a", "b", "c"])
+    assert len(embeddings._document_vectors) == 2
+    assert embeddings.get_embedding_model() is model
+
+
+def test_preload_embeds_builtin_rules_and_freezes_gc(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(embeddings, "_model", model)
+    monkeypatch.setattr(embeddings, "_document_vectors", LRUCache(16))
+    try:
+        embeddings.preload()
+        assert len(embeddings._document_vectors) == 5
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+
+def test_onnx_backend_matches_torch_on_rules_pack(tmp_path):
+    import os
+    import pytest
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+    from app.services.rag import GSA_RULES
+
+    model_dir = os.getenv("EMBEDDING_ONNX_DIR")
+    if not model_dir:
+        embeddings.export_onnx(str(tmp_path))
+        model_dir = str(tmp_path)
+    torch_model = embeddings.load_embedding_model("torch")
+    onnx_model = embeddings.OnnxEncoder(model_dir, threads=2, batch_size=2)
+    texts = [rule["text"] for rule in GSA_RULES] + ["missing UEI", "past performance under $25,000"]
+
+    expected, actual = np.asarray(torch_model.encode(texts)), onnx_model.encode(texts)
+    cosine = (expected * actual).sum(axis=1) / (np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1))
+    assert cosine.min() > 0.98
+    # Retrieval must pick the same rule for each query
+    rules = slice(0, len(GSA_RULES))
+    assert ((expected[-2:] @ expected[rules].T).argmax(axis=1) == (actual[-2:] @ actual[rules].T).argmax(axis=1)).all()
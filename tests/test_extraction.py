@@ -0,0 +1,90 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import ingest
+from app.services.extraction import (
+    ExtractionLimits, ExtractionPool, UnsupportedFileType, _row_text, extract_file,
+)
+from tests.test_incremental import PRICING, PROFILE
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = ExtractionPool(workers=1, limits=ExtractionLimits(max_bytes=4096))
+    monkeypatch.setattr(ingest, "_extraction_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+def test_extract_file_stops_at_limits(tmp_path):
+    path = tmp_path / "long.txt"
+    path.write_text("\n".join(f"line {i}" for i in range(100)))
+    result = extract_file(str(path), ".txt", ExtractionLimits(max_segments=10))
+    assert (result.segments, result.truncated, result.kind) == (10, True, "txt")
+    assert result.text.splitlines()[-1] == "line 9"
+    assert not extract_file(str(path), ".TXT", ExtractionLimits()).truncated
+    with pytest.raises(UnsupportedFileType):
+        extract_file(str(path), ".exe", ExtractionLimits())
+
+
+def test_spreadsheet_rows_become_pricing_lines():
+    assert _row_text(["Senior Developer", 185, None, "Hour"]) == "Senior Developer, 185, Hour"
+    assert _row_text(["Analyst, Level 2", 1250.5, "Day"]) == "Analyst Level 2, 1250.5, Day"
+
+
+def test_upload_ingests_extracted_text(pool):
+    client = TestClient(app)
+    response = client.post("/api/ingest_upload", data={"type_hints": ",pricing"}, files=[
+        ("files", ("profile.txt", PROFILE.encode(), "text/plain")),
+        ("files", ("rates.csv", PRICING.encode(), "text/csv")),
+    ])
+    body = response.json()
+    assert response.status_code == 200
+    assert [(d["type"], d["source_format"]) for d in body["doc_summaries"]] == [("profile", "txt"), ("pricing", "csv")]
+    stored = ingest.document_store[body["request_id"]]["parsed_data"]
+    assert stored["company"].uei == "ABC123DEF456"
+    assert stored["pricing"].labor_categories[0]["rate"] == 185
+
+
+def test_upload_limits_and_types(pool):
+    client = TestClient(app)
+    too_big = client.post("/api/ingest_upload", files=[("files", ("big.txt", b"x" * 5000, "text/plain"))])
+    assert too_big.status_code == 413
+    unsupported = client.post("/api/ingest_upload", files=[("files", ("tool.exe", b"MZ", "application/octet-stream"))])
+    assert unsupported.status_code == 415
+
+
+def test_recycled_pool_fails_queued_work_without_touching_its_replacement(monkeypatch):
+    import asyncio
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services import extraction
+    from app.services.extraction import ExtractedText, ExtractionError
+
+    release = threading.Event()
+
+    def slow_extract(path, suffix, limits):
+        release.wait(5)
+        return ExtractedText("text", "txt", 1, False)
+
+    monkeypatch.setattr(extraction, "extract_file", slow_extract)
+    monkeypatch.setattr(ExtractionPool, "_new_executor", lambda self: ThreadPoolExecutor(1))
+    pool = ExtractionPool(workers=1)
+
+    async def scenario():
+        hung = asyncio.ensure_future(pool.extract("a.txt", ".txt"))
+        queued = asyncio.ensure_future(pool.extract("b.txt", ".txt"))
+        await asyncio.sleep(0.05)
+        old = pool._executor
+        pool._recycle(old)
+        replacement = pool._executor
+        pool._recycle(old)  # a second caller of the dead pool must not replace the new one
+        assert pool._executor is replacement
+        release.set()
+        return await asyncio.gather(hung, queued, return_exceptions=True)
+
+    hung, queued = asyncio.run(scenario())
+    pool.shutdown()
+    assert hung.text == "text"
+    assert isinstance(queued, ExtractionError)
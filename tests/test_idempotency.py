@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import ingest
+from app.services.extraction import ExtractionLimits, ExtractionPool
+from app.services.incremental import IncrementalCache, LRUCache
+from tests.test_incremental import PRICING, PROFILE, _package
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(ingest, "incremental_cache", IncrementalCache())
+    monkeypatch.setattr(ingest, "package_index", {})
+    monkeypatch.setattr(ingest, "upload_index", {})
+    monkeypatch.setattr(ingest, "idempotency_keys", LRUCache(16))
+    return TestClient(app)
+
+
+def test_identical_package_returns_original_request(client):
+    first = client.post("/api/ingest_v2", json=_package()).json()
+    again = client.post("/api/ingest_v2", json=_package()).json()
+    assert again["request_id"] == first["request_id"]
+    assert again["deduplicated"] and not first["deduplicated"]
+    assert again["doc_summaries"] == first["doc_summaries"]
+
+    changed = client.post("/api/ingest_v2", json=_package(PRICING + "\nProject Manager, 150, Hour")).json()
+    assert changed["request_id"] != first["request_id"] and not changed["deduplicated"]
+
+
+def test_idempotency_key_reused_for_other_content_conflicts(client):
+    headers = {"Idempotency-Key": "retry-1"}
+    first = client.post("/api/ingest_v2", json=_package(), headers=headers).json()
+    retry = client.post("/api/ingest_v2", json=_package(), headers=headers).json()
+    assert retry["request_id"] == first["request_id"] and retry["deduplicated"]
+
+    conflict = client.post("/api/ingest_v2", json=_package(PRICING + "\nAnalyst, 90, Hour"), headers=headers)
+    assert conflict.status_code == 409
+
+
+def test_repeated_upload_skips_extraction(client, monkeypatch):
+    pool = ExtractionPool(workers=1, limits=ExtractionLimits(max_bytes=4096))
+    monkeypatch.setattr(ingest, "_extraction_pool", pool)
+    files = [("files", ("profile.txt", PROFILE.encode(), "text/plain")),
+             ("files", ("rates.csv", PRICING.encode(), "text/csv"))]
+    try:
+        first = client.post("/api/ingest_upload", files=files).json()
+
+        async def fail(path, suffix):
+            raise AssertionError("extraction should not run for a duplicate upload")
+        monkeypatch.setattr(pool, "extract", fail)
+        again = client.post("/api/ingest_upload", files=files).json()
+    finally:
+        pool.shutdown()
+    assert again["request_id"] == first["request_id"] and again["deduplicated"]
+    assert again["doc_summaries"][1]["source_format"] == "csv"
+
+
+def test_legacy_ingest_route_is_an_alias_of_v2(client):
+    response = client.post("/api/ingest", json=_package())
+    assert response.status_code == 200
+    body = response.json()
+    assert body["recomputed"] == ["profile", "pp", "pricing"] and body["request_id"] in ingest.document_store
+    assert client.post("/api/ingest_v2", json=_package()).json()["request_id"] == body["request_id"]
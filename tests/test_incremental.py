@@ -0,0 +1,137 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.routers import ingest
+from app.services.incremental import IncrementalCache
+from app.services.validator import HybridValidator
+
+PROFILE = """Acme Solutions LLC
+UEI: ABC123DEF456
+DUNS: 123456789
+NAICS: 541511, 541512
+POC: Jane Smith, jane@acme.co, (415) 555-0100
+Address: 100 Market St, San Francisco, CA
+SAM.gov: registered"""
+
+PAST_PERFORMANCE = """Customer: City of Palo Alto
+Contract: Data migration & support
+Value: $120,000
+Period: 07/2023 - 03/2024
+Contact: Mark Lee, mark.lee@cityofpaloalto.org"""
+
+PRICING = "Labor Category, Rate, Unit\nSenior Developer, 185, Hour"
+
+
+def _package(pricing=PRICING):
+    return {"vendor_id": "acme", "documents": [
+        {"name": "profile", "type_hint": "profile", "text": PROFILE},
+        {"name": "pp", "type_hint": "past_performance", "text": PAST_PERFORMANCE},
+        {"name": "pricing", "type_hint": "pricing", "text": pricing},
+    ]}
+
+
+def test_resubmission_only_reprocesses_changed_documents(monkeypatch):
+    monkeypatch.setattr(ingest, "incremental_cache", IncrementalCache())
+    client = TestClient(app)
+
+    first = client.post("/api/ingest_v2", json=_package()).json()
+    assert first["recomputed"] == ["profile", "pp", "pricing"]
+
+    second = client.post("/api/ingest_v2", json=_package(PRICING + "\nProject Manager, 150, Hour")).json()
+    assert second["recomputed"] == ["pricing"]
+    assert [d["reused"] for d in second["doc_summaries"]] == [True, True, False]
+    stored = ingest.document_store[second["request_id"]]["parsed_data"]
+    assert len(stored["pricing"].labor_categories) == 2
+
+
+def test_incremental_validation_reuses_unchanged_sections():
+    cache = IncrementalCache()
+    parsed = {"company": None, "past_performance": [], "pricing": {"labor_categories": [{"category": "Dev", "rate": 100.0, "unit": "Hour"}]}}
+    issues, recomputed = cache.validate(parsed)
+    assert issues == HybridValidator.validate_all_data(parsed)
+    assert recomputed == ["company", "past_performance", "pricing"]
+
+    parsed["pricing"] = None
+    issues, recomputed = cache.validate(parsed)
+    assert issues == HybridValidator.validate_all_data(parsed)
+    assert recomputed == ["pricing"]
+
+
+def test_analyze_stream_sends_checklist_before_text(monkeypatch):
+    from app.services.llm import LLMService
+    from app.services.providers import StubProvider
+
+    class StubRAG:
+        rules_version = "test"
+
+        def build_policy_checklist(self, parsed_data, issues=None):
+            return {"required_ok": False, "problems": [], "citations": [{"rule_id": "R1", "chunk": "rule"}]}
+
+    monkeypatch.setattr(ingest, "incremental_cache", IncrementalCache())
+    monkeypatch.setattr(ingest, "get_rag_service", lambda: StubRAG())
+    monkeypatch.setattr(ingest, "get_llm_service", lambda: LLMService(provider=StubProvider(chunk_size=8)))
+    client = TestClient(app)
+    request_id = client.post("/api/ingest_v2", json=_package()).json()["request_id"]
+
+    body = client.get(f"/api/analyze_stream?request_id={request_id}").text
+    events = [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event: ")]
+    assert events[0] == "checklist"
+    assert events.count("brief") > 1 and events.count("email") > 1
+    assert events[-1] == "done"
+
+
+def test_fallback_analyses_are_not_cached(monkeypatch):
+    from app.services.llm import LLMService
+    from app.services.providers import StubProvider
+
+    class StubRAG:
+        rules_version = "test"
+
+        def build_policy_checklist(self, parsed_data, issues=None):
+            return {"required_ok": True, "problems": [], "citations": [], "rules_version": self.rules_version}
+
+    outage = [True]
+
+    def responder(prompt):
+        if outage[0]:
+            raise ConnectionError("provider down")
+        return "generated"
+
+    monkeypatch.setattr(ingest, "incremental_cache", IncrementalCache())
+    monkeypatch.setattr(ingest, "get_rag_service", lambda: StubRAG())
+    monkeypatch.setattr(ingest, "get_llm_service", lambda: LLMService(provider=StubProvider(responder=responder)))
+    client = TestClient(app)
+    request_id = client.post("/api/ingest_v2", json=_package()).json()["request_id"]
+
+    first = client.post(f"/api/analyze?request_id={request_id}").json()
+    assert "Unable to generate brief" in first["brief"]
+    outage[0] = False
+    second = client.post(f"/api/analyze?request_id={request_id}").json()
+    assert second["brief"] == "generated" and second["recomputed"]["analysis"] is True
+    third = client.post(f"/api/analyze?request_id={request_id}").json()
+    assert third["recomputed"]["analysis"] is False
+
+
+def test_interrupted_stream_is_not_cached(monkeypatch):
+    from app.services.llm import LLMService
+    from app.services.providers import StubProvider
+
+    class StubRAG:
+        rules_version = "test"
+
+        def build_policy_checklist(self, parsed_data, issues=None):
+            return {"required_ok": True, "problems": [], "citations": [], "rules_version": self.rules_version}
+
+    class DroppingProvider(StubProvider):
+        def stream(self, prompt, generation_config=None, timeout=None):
+            yield "partial "
+            raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(ingest, "incremental_cache", IncrementalCache())
+    monkeypatch.setattr(ingest, "get_rag_service", lambda: StubRAG())
+    monkeypatch.setattr(ingest, "get_llm_service", lambda: LLMService(provider=DroppingProvider()))
+    client = TestClient(app)
+    request_id = client.post("/api/ingest_v2", json=_package()).json()["request_id"]
+
+    body = client.get(f"/api/analyze_stream?request_id={request_id}").text
+    assert "event: error" in body and "event: done" not in body
+    assert client.post(f"/api/analyze?request_id={request_id}").json()["recomputed"]["analysis"] is True
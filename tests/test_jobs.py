@@ -0,0 +1,117 @@
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.routers import ingest
+from app.services.incremental import IncrementalCache
+from app.services.jobs import (
+    FAILED, QUEUED, SUCCEEDED, CallbackURLError, Job, JobQueue, SQLiteJobStore, post_callback, validate_callback_url,
+)
+from tests.test_incremental import _package
+
+
+def wait_for(queue, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job.status in (SUCCEEDED, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_lower_priority_number_runs_first():
+    gate = threading.Event()
+    order = []
+
+    def runner(payload):
+        if payload["name"] == "blocker":
+            gate.wait()
+        order.append(payload["name"])
+        return {}
+
+    queue = JobQueue(runner, workers=1)
+    blocker = queue.submit({"name": "blocker"})
+    time.sleep(0.05)
+    low = queue.submit({"name": "low"}, priority=9)
+    high = queue.submit({"name": "high"}, priority=1)
+    gate.set()
+    for job in (blocker, low, high):
+        wait_for(queue, job.job_id)
+    queue.shutdown()
+    assert order == ["blocker", "high", "low"]
+
+
+def test_failed_jobs_record_the_error():
+    queue = JobQueue(lambda payload: 1 / 0, workers=1)
+    job = wait_for(queue, queue.submit({}).job_id)
+    queue.shutdown()
+    assert job.status == FAILED and "division by zero" in job.error
+
+
+def test_sqlite_store_requeues_unfinished_jobs(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+    store.save(Job(job_id="left-running", payload={"n": 1}, status="running"))
+    store.save(Job(job_id="done", payload={"n": 2}, status=SUCCEEDED))
+
+    restarted = SQLiteJobStore(str(tmp_path / "jobs.db"))
+    assert [(j.job_id, j.status) for j in restarted.pending()] == [("left-running", QUEUED)]
+    queue = JobQueue(lambda payload: {"n": payload["n"]}, workers=1, store=restarted)
+    assert wait_for(queue, "left-running").result == {"n": 1}
+    queue.shutdown()
+
+
+def test_analyze_as_job(monkeypatch):
+    from app.services.llm import LLMService
+    from app.services.providers import StubProvider
+
+    class StubRAG:
+        rules_version = "test"
+
+        def build_policy_checklist(self, parsed_data, issues=None):
+            return {"required_ok": True, "problems": [], "citations": []}
+
+    monkeypatch.setattr(ingest, "incremental_cache", IncrementalCache())
+    monkeypatch.setattr(ingest, "get_rag_service", lambda: StubRAG())
+    monkeypatch.setattr(ingest, "get_llm_service", lambda: LLMService(provider=StubProvider()))
+    monkeypatch.setattr(ingest, "_job_queue", JobQueue(ingest._run_analysis_job, workers=1))
+    monkeypatch.setattr(ingest, "package_index", {})
+    client = TestClient(app)
+    request_id = client.post("/api/ingest_v2", json=_package()).json()["request_id"]
+
+    queued = client.post(f"/api/analyze?request_id={request_id}&async_job=true").json()
+    job = wait_for(ingest._job_queue, queued["job_id"])
+    status = client.get(queued["status_url"]).json()
+    ingest._job_queue.shutdown()
+    assert job.status == SUCCEEDED and status["status"] == SUCCEEDED
+    assert status["result"]["request_id"] == request_id and "payload" not in status
+    # The persisted payload references the package; it never carries its (unredacted) contents
+    assert set(job.payload) == {"request_id", "combined", "package_hash"}
+
+    # After a restart the request id is gone; a re-ingested package is found by its hash
+    assert ingest._run_analysis_job({"request_id": "lost", "package_hash": job.payload["package_hash"]})["request_id"] == request_id
+    with pytest.raises(KeyError):
+        ingest._run_analysis_job({"request_id": "lost", "package_hash": "unknown"})
+
+
+@pytest.mark.parametrize("url", [
+    "file:///etc/passwd", "ftp://example.com/x", "http://127.0.0.1:8000/hook", "http://[::ffff:127.0.0.1]/",
+    "http://10.0.0.5/hook", "http://169.254.169.254/latest/meta-data/", "http://localhost/hook",
+])
+def test_callback_urls_to_internal_targets_are_refused(url, monkeypatch):
+    monkeypatch.delenv("CALLBACK_ALLOWED_HOSTS", raising=False)
+    with pytest.raises(CallbackURLError):
+        validate_callback_url(url)
+    assert post_callback(url, {}).startswith("refused")
+
+
+def test_callback_allowlist(monkeypatch):
+    monkeypatch.setenv("CALLBACK_ALLOWED_HOSTS", "hooks.example.com")
+    validate_callback_url("https://hooks.example.com/done")
+    with pytest.raises(CallbackURLError):
+        validate_callback_url("https://other.example.com/done")
+    client = TestClient(app)
+    request_id = client.post("/api/ingest_v2", json=_package()).json()["request_id"]
+    response = client.post(f"/api/analyze?request_id={request_id}&async_job=true&callback_url=http://169.254.169.254/")
+    assert response.status_code == 400
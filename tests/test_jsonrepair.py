@@ -0,0 +1,35 @@
+import pytest
+from app.models.schemas import PolicyChecklist
+from app.services.jsonrepair import JSONRepairError, parse_json_lenient
+
+CHECKLIST = ('{"required_ok": false, "problems": [{"issue": "missing_uei", "evidence": "UEI \\"x\\" missing", "rule_id": "R1"}, '
+             '{"issue": "invalid_duns_format", "evidence": "8 digits", "rule_id": "R1"}], '
+             '"citations": [{"rule_id": "R1", "chunk": "UEI rule"}]}')
+
+
+def test_valid_json_is_not_marked_repaired():
+    value, repaired = parse_json_lenient(CHECKLIST)
+    assert value["required_ok"] is False and not repaired
+
+
+def test_fences_prose_and_trailing_commas():
+    value, repaired = parse_json_lenient('Sure! ```json\n{"a": [1, 2,],}\n``` hope this helps')
+    assert value == {"a": [1, 2]} and repaired
+
+
+def test_every_truncation_point_yields_a_valid_prefix():
+    for cut in range(1, len(CHECKLIST)):
+        value, repaired = parse_json_lenient(CHECKLIST[:cut])
+        assert isinstance(value, dict) and repaired
+
+
+def test_truncated_checklist_keeps_complete_entries():
+    value, _ = parse_json_lenient(CHECKLIST[:CHECKLIST.index("8 digits")])
+    checklist = PolicyChecklist.model_validate(value)
+    assert not checklist.required_ok
+    assert [p.issue for p in checklist.problems] == ["missing_uei"]
+
+
+def test_no_json_raises():
+    with pytest.raises(JSONRepairError):
+        parse_json_lenient("The model declined to answer.")
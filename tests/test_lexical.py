@@ -0,0 +1,38 @@
+from app.services.lexical import BM25Index, is_identifier_query, reciprocal_rank_fusion, tokenize
+from app.services.rag import GSA_RULES
+
+
+def _rules_index():
+    index = BM25Index()
+    index.add_many((r["rule_id"], r["text"], {"rule_id": r["rule_id"]}) for r in GSA_RULES)
+    return index
+
+
+def test_tokenize_keeps_identifiers_whole_and_split():
+    assert tokenize("See 552.238-115 for invalid_duns_format") == [
+        "see", "552.238-115", "552", "238", "115", "invalid_duns_format", "invalid", "duns", "format"]
+
+
+def test_bm25_finds_exact_codes_and_issue_ids():
+    index = _rules_index()
+    assert index.search("518210C")[0][0] == "R2"
+    assert index.search("invalid_duns_format")[0][0] == "R1"
+    assert index.search("pricing_incomplete")[0][0] == "R4"
+    assert index.search("zebra") == []
+
+
+def test_bm25_remove_and_replace():
+    index = _rules_index()
+    index.remove("R2")
+    assert all(doc_id != "R2" for doc_id, _ in index.search("518210C 54151S"))
+    index.add("R4", "Pricing sheet replaced")
+    assert len(index) == 4 and index.search("replaced")[0][0] == "R4"
+    assert "incomplete" not in index.postings
+
+
+def test_identifier_queries_and_fusion():
+    assert is_identifier_query("552.238-115")
+    assert is_identifier_query("invalid_duns_format 541511")
+    assert not is_identifier_query("past performance")
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]])
+    assert [doc_id for doc_id, _ in fused] == ["a", "c", "b"]
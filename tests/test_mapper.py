@@ -0,0 +1,48 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.mapper import NaicsSinIndex, NaicsSinMapper
+
+
+def test_rules_pack_mappings_are_unchanged():
+    assert NaicsSinMapper.get_recommended_sins(["541511", "541512", "541611", "518210", "541511"]) == [
+        "54151S", "541611", "518210C"]
+    assert NaicsSinMapper.get_recommended_sins(["000000", "abc", " 541611 "]) == ["541611"]
+
+
+def test_prefix_rollups_rank_below_exact_matches():
+    index = NaicsSinIndex([("5415", "54151S", "IT", 0.5), ("541519", "54151HACS", "HACS", 0.8),
+                           ("541519", "541519ICAM", "ICAM", 0.6), ("54", "GENERIC", "", 1.0)])
+    assert [m.sin for m in index.lookup("541519")] == ["54151HACS", "541519ICAM", "54151S", "GENERIC"]
+    rollup = index.lookup("541599")[0]
+    assert (rollup.sin, rollup.matched_naics, rollup.exact) == ("54151S", "5415", False)
+    assert "4-digit group 5415" in rollup.reason
+    assert index.lookup("1") == [] and index.lookup("999999") == []
+
+
+def test_batch_keeps_each_sins_strongest_match():
+    results = NaicsSinMapper.map_batch({"a": ["541599", "541511"], "b": ["000000"], "c": ["541519"]})
+    assert results["a"][0].sin == "54151S" and results["a"][0].exact
+    assert len({m.sin for m in results["a"]}) == len(results["a"])
+    assert results["b"] == []
+    assert [m.sin for m in results["c"]][:2] == ["54151S", "54151HACS"]
+
+
+def test_naics_map_endpoint():
+    response = TestClient(app).post("/api/naics/map", json={"vendors": {"v1": ["518210"], "v2": ["000000"]}})
+    body = response.json()
+    assert response.status_code == 200 and body["distinct_codes"] == 2
+    assert body["results"]["v1"][0] == {"sin": "518210C", "title": "Cloud and Cloud-Related IT Professional Services",
+                                        "matched_naics": "518210", "exact": True, "weight": 1.0,
+                                        "reason": "NAICS 518210 is listed under SIN 518210C"}
+    assert body["results"]["v2"] == []
+
+
+def test_malformed_crosswalk_rows_are_skipped(tmp_path):
+    path = tmp_path / "crosswalk.csv"
+    path.write_text("naics,sin,sin_title,weight\n"
+                    "541330,871,Engineering,high\n"
+                    "5413,871,Engineering,0.5\n"
+                    "54x,999,Bad code,1\n")
+    index = NaicsSinIndex.from_csv(path)
+    assert [(m.sin, m.matched_naics, m.weight) for m in index.lookup("541330")] == [("871", "5413", 0.5)]
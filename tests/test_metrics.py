@@ -0,0 +1,26 @@
+from fastapi.testclient import TestClient
+from app.core.metrics import MetricsRegistry
+from app.main import app
+from tests.test_incremental import _package
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    for seconds in (0.002, 0.02, 7.0):
+        registry.observe("latency_seconds", seconds, buckets=(0.01, 1.0), route="/x")
+    text = registry.render_prometheus()
+    assert 'latency_seconds_bucket{route="/x",le="0.01"} 1' in text
+    assert 'latency_seconds_bucket{route="/x",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/x"} 3' in text
+
+
+def test_metrics_endpoint_exposes_requests_stages_and_process():
+    client = TestClient(app)
+    client.post("/api/ingest_v2", json=_package())
+    client.get("/api/jobs/does-not-exist")
+    text = client.get("/metrics").text
+    assert 'http_requests_total{method="POST",route="/api/ingest_v2",status="200"}' in text
+    assert 'route="/api/jobs/{job_id}"' in text
+    assert 'stage_duration_seconds_count{stage="parse"}' in text
+    assert "document_store_size" in text and "process_resident_memory_bytes" in text
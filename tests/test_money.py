@@ -0,0 +1,24 @@
+from decimal import Decimal
+from app.services.money import MoneyParser
+from app.services.validator import HybridValidator
+
+
+def test_parse_suffixes_decimals_and_currencies():
+    assert MoneyParser.parse("$1.2M") == Decimal("1200000")
+    assert MoneyParser.parse("25,000.50") == Decimal("25000.50")
+    assert MoneyParser.parse("USD 30K") == Decimal("30000")
+    assert MoneyParser.parse("2.5 million") == Decimal("2500000")
+    assert MoneyParser.parse("n/a") is None
+
+
+def test_ranges_resolve_to_lower_bound():
+    assert MoneyParser.parse_range("$20K - $30K") == (Decimal("20000"), Decimal("30000"))
+    assert MoneyParser.parse_range("$1-2M") == (Decimal("1000000"), Decimal("2000000"))
+    assert MoneyParser.parse("$20K to $30K") == Decimal("20000")
+
+
+def test_parse_many_and_validator_threshold():
+    amounts = MoneyParser.parse_many(["$1.2M", "$18,000", None])
+    assert list(amounts[:2]) == [1200000.0, 18000.0]
+    assert (amounts >= 25000).tolist() == [True, False, False]
+    assert HybridValidator._extract_numeric_value("$1.2M") >= 25000
@@ -0,0 +1,36 @@
+import datetime
+from app.services.periods import PeriodParser, DateRange
+
+TODAY = datetime.date(2025, 6, 15)
+
+
+def _parser():
+    return PeriodParser(clock=lambda: TODAY)
+
+
+def test_parse_formats():
+    parser = _parser()
+    assert parser.parse("07/2023 - 03/2024") == DateRange(datetime.date(2023, 7, 1), datetime.date(2024, 3, 31))
+    assert parser.parse("Jan 2022 - July 2024").end == datetime.date(2024, 7, 31)
+    assert parser.parse("2023-01-15 to 2024-02").end == datetime.date(2024, 2, 29)
+    assert parser.parse("Q2 2021 - 2022 Q3") == DateRange(datetime.date(2021, 4, 1), datetime.date(2022, 9, 30))
+    assert parser.parse("FY23").start == datetime.date(2022, 10, 1)
+    assert parser.parse("not a date") is None
+    assert parser.parse(None) is None
+    assert parser.parse("Q1 0000") is None
+    assert parser.parse("0000 Q2") is None
+
+
+def test_present_follows_clock():
+    parsed = _parser().parse("Sept 2020 - Present")
+    assert parsed.open_ended and parsed.end == TODAY
+    later = PeriodParser(clock=lambda: datetime.date(2030, 1, 1)).parse("Sept 2020 - Present")
+    assert later.end == datetime.date(2030, 1, 1)
+
+
+def test_36_month_window_counts_calendar_months():
+    parser = _parser()
+    assert parser.months_ago(36) == datetime.date(2022, 6, 15)
+    assert parser.within_last_months("01/2021 - 06/2022")
+    assert not parser.within_last_months("01/2021 - 05/2022")
+    assert not parser.within_last_months("")
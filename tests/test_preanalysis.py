@@ -0,0 +1,93 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import ingest
+from app.services.incremental import IncrementalCache
+from app.services.llm import LLMService
+from app.services.preanalysis import PreAnalyzer
+from app.services.providers import StubProvider
+from tests.test_incremental import _package
+
+
+class StubRAG:
+    rules_version = "test"
+
+    def __init__(self, release=None):
+        self.release = release
+        self.match_calls = 0
+        self.matched = []
+
+    def match_rules(self, issues):
+        if self.release:
+            self.release.wait(5)
+        self.match_calls += 1
+        return [{"issue": "missing_uei", "evidence": "UEI missing", "rule_id": "R1"}], [{"rule_id": "R1", "chunk": "UEI rule"}]
+
+    def build_policy_checklist(self, parsed_data, issues=None, matched=None):
+        self.matched.append(matched)
+        problems, citations = matched or self.match_rules(issues or [])
+        return {"required_ok": False, "problems": problems, "citations": citations, "rules_version": self.rules_version}
+
+
+def test_analyze_reuses_retrieval_done_at_ingest(monkeypatch):
+    rag = StubRAG()
+    monkeypatch.setattr(ingest, "incremental_cache", IncrementalCache())
+    monkeypatch.setattr(ingest, "package_index", {})
+    monkeypatch.setattr(ingest, "_preanalyzer", None)
+    monkeypatch.setattr(ingest, "get_rag_service", lambda: rag)
+    monkeypatch.setattr(ingest, "get_llm_service", lambda: LLMService(provider=StubProvider()))
+    client = TestClient(app)
+
+    request_id = client.post("/api/ingest_v2?preanalyze=true", json=_package()).json()["request_id"]
+    result = client.post(f"/api/analyze?request_id={request_id}").json()
+
+    assert result["recomputed"]["preanalyzed"] is True
+    assert result["recomputed"]["validation_sections"] == ["company", "past_performance", "pricing"]
+    assert rag.match_calls == 1 and rag.matched[0] is not None
+    assert result["checklist"]["citations"] == [{"rule_id": "R1", "chunk": "UEI rule"}]
+
+
+def test_result_waits_for_in_flight_work_and_drops_stale_versions():
+    release = threading.Event()
+    rag = StubRAG(release)
+    analyzer = PreAnalyzer(lambda: rag, IncrementalCache, workers=1)
+    try:
+        future = analyzer.schedule("r1", {"company": None, "past_performance": [], "pricing": None})
+        assert not future.done()
+        threading.Timer(0.05, release.set).start()
+        pre = analyzer.result("r1", "test")
+        assert pre is not None and pre.problems[0]["rule_id"] == "R1" and rag.match_calls == 1
+
+        assert analyzer.result("r1", "2025.1") is None
+        assert analyzer.result("unknown", "test") is None
+    finally:
+        analyzer.shutdown()
+
+
+def test_checklist_that_fell_back_at_ingest_is_retried(monkeypatch):
+    class OutageRAG(StubRAG):
+        down = True
+
+        def build_policy_checklist(self, parsed_data, issues=None, matched=None):
+            checklist = super().build_policy_checklist(parsed_data, issues, matched)
+            return dict(checklist, fallback=True) if self.down else checklist
+
+    rag = OutageRAG()
+    monkeypatch.setenv("PREANALYZE_CHECKLIST", "1")
+    monkeypatch.setattr(ingest, "incremental_cache", IncrementalCache())
+    monkeypatch.setattr(ingest, "package_index", {})
+    monkeypatch.setattr(ingest, "_preanalyzer", None)
+    monkeypatch.setattr(ingest, "get_rag_service", lambda: rag)
+    monkeypatch.setattr(ingest, "get_llm_service", lambda: LLMService(provider=StubProvider()))
+    client = TestClient(app)
+
+    request_id = client.post("/api/ingest_v2?preanalyze=true", json=_package()).json()["request_id"]
+    ingest._preanalyzer.result(request_id, rag.rules_version)  # outage during the ingest-time call
+    rag.down = False
+    result = client.post(f"/api/analyze?request_id={request_id}").json()
+
+    assert result["recomputed"]["preanalyzed"] is True and "fallback" not in result["checklist"]
+    assert len(rag.matched) == 2 and rag.matched[1] is not None  # retried, still reusing retrieval
+    assert client.post(f"/api/analyze?request_id={request_id}").json()["recomputed"]["analysis"] is False
@@ -0,0 +1,30 @@
+from app.models.schemas import CompanyProfile, PastPerformance, PricingSheet
+from app.services.prompts import estimate_tokens, project, summarize_pricing, vendor_data_block
+
+
+def make_package(rows):
+    return {
+        "company": CompanyProfile(company_name="Acme", uei="ABC123DEF456", naics=["541511"], address="1 Main St"),
+        "past_performance": [PastPerformance(customer=f"Agency {i}", contract_value="$50,000", period="2023-2024",
+                                             contact_email="a@b.gov") for i in range(rows)],
+        "pricing": PricingSheet(labor_categories=[{"category": f"Role {i}", "rate": 100 + i, "unit": "Hour"}
+                                                  for i in range(rows)]),
+    }
+
+
+def test_projection_keeps_only_referenced_fields():
+    assert project(make_package(0)["company"], ("company_name", "uei")) == {"company_name": "Acme", "uei": "ABC123DEF456"}
+
+
+def test_pricing_summary_reports_spread_and_examples():
+    summary = summarize_pricing(make_package(10)["pricing"], examples=2)
+    assert "10 labor categories" in summary and "min 100.00" in summary and "max 109.00" in summary
+    assert "Role 1" in summary and "Role 2" not in summary and "8 more" in summary
+
+
+def test_vendor_block_is_bounded_regardless_of_size():
+    small = vendor_data_block(make_package(5), budget=300)
+    large = vendor_data_block(make_package(5000), budget=300)
+    assert estimate_tokens(large) <= 300
+    assert "a@b.gov" not in large and "1 Main St" not in small
+    assert "5000 contracts" in large
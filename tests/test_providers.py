@@ -0,0 +1,26 @@
+import asyncio
+from app.services.llm import LLMService
+from app.services.providers import RecordingProvider, StubProvider
+
+
+def test_stub_is_deterministic_and_streams():
+    stub = StubProvider()
+    assert stub.generate("hello") == stub.generate("hello")
+    assert "".join(stub.stream("hello")) == stub.generate("hello")
+    assert asyncio.run(stub.generate_async("hello")) == stub.generate("hello")
+
+
+def test_record_then_replay(tmp_path):
+    recorder = RecordingProvider(StubProvider(responder=lambda prompt: "recorded answer"), str(tmp_path))
+    assert recorder.generate("prompt", {"temperature": 0.3}) == "recorded answer"
+
+    replay = StubProvider(replay_dir=str(tmp_path))
+    assert replay.generate("prompt", {"temperature": 0.3}) == "recorded answer"
+    assert replay.generate("other prompt") != "recorded answer"
+
+
+def test_llm_service_runs_offline_on_stub():
+    service = LLMService(provider=StubProvider(responder=lambda prompt: " brief text "))
+    parsed = {"company": {"company_name": "Acme", "naics": ["541511"]}, "past_performance": [], "pricing": None}
+    assert service.generate_negotiation_brief(parsed, {"problems": []}) == "brief text"
+    assert service.test_connection()["status"] == "success"
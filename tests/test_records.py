@@ -0,0 +1,33 @@
+from app.models.schemas import CompanyProfile, RecordView
+from app.routers.ingest import convert_to_dict
+from app.services.parser import DocumentParser
+from app.services.redactor import PIIRedactor
+from app.services.validator import HybridValidator
+
+PROFILE = """Acme Solutions LLC
+UEI: ABC123DEF456
+DUNS: 123456789
+NAICS: 541511, 5415
+POC: Jane Smith, jane@acme.co, (415) 555-0100
+Address: 100 Market St
+SAM.gov: registered"""
+
+
+def test_record_views_validate_like_dicts():
+    company = DocumentParser.parse_company_profile(PROFILE)
+    parsed = {"company": company, "past_performance": [], "pricing": None}
+    views = convert_to_dict(parsed)
+    assert isinstance(views["company"], RecordView)
+    assert views["company"]["uei"] == "ABC123DEF456"
+    assert views["company"].get("missing", "x") == "x"
+    as_dicts = {"company": company.model_dump(), "past_performance": [], "pricing": None}
+    assert HybridValidator.validate_all_data(views) == HybridValidator.validate_all_data(as_dicts)
+
+
+def test_redaction_copies_without_mutating():
+    company = DocumentParser.parse_company_profile(PROFILE)
+    redacted, _ = PIIRedactor.redact_and_hash_companyprofile(company)
+    assert company.poc_email == "jane@acme.co"
+    assert redacted.poc_email.startswith("[EMAIL_HASH_")
+    assert redacted.uei == company.uei
+    assert isinstance(redacted, CompanyProfile)
@@ -0,0 +1,92 @@
+import pytest
+from app.core.metrics import metrics
+from app.services.providers import StubProvider
+from app.services.resilience import (
+    CircuitBreaker, CircuitOpenError, RateLimitExceeded, ResilientProvider, RetryPolicy, TokenBucket,
+)
+
+
+class FlakyProvider(StubProvider):
+    """Fails with a retryable error the first `failures` calls"""
+
+    def __init__(self, failures, error=TimeoutError):
+        super().__init__(responder=lambda prompt: "ok")
+        self.failures = failures
+        self.error = error
+
+    def generate(self, prompt, generation_config=None, timeout=None):
+        if self.failures:
+            self.failures -= 1
+            raise self.error("upstream hiccup")
+        return super().generate(prompt, generation_config, timeout)
+
+
+def fast_retry(attempts=3):
+    return RetryPolicy(max_attempts=attempts, base_delay_s=0.001, max_delay_s=0.001)
+
+
+def test_token_bucket_refills_over_time():
+    now = [0.0]
+    bucket = TokenBucket(rate_per_minute=60, capacity=2, clock=lambda: now[0])
+    assert bucket.try_acquire() == 0 and bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(1.0)
+    now[0] += 1.0
+    assert bucket.try_acquire() == 0
+
+
+def test_retries_transient_errors_then_succeeds():
+    metrics.reset()
+    provider = ResilientProvider(FlakyProvider(failures=2), retry=fast_retry())
+    assert provider.generate("hello") == "ok"
+    assert metrics.get("llm_retries_total", provider="stub") == 2
+    assert provider.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_non_retryable_errors_are_not_retried():
+    provider = ResilientProvider(FlakyProvider(failures=1, error=ValueError), retry=fast_retry())
+    with pytest.raises(ValueError):
+        provider.generate("hello")
+    assert provider.inner.calls == 0
+
+
+def test_circuit_opens_and_recovers():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=10, clock=lambda: now[0])
+    provider = ResilientProvider(FlakyProvider(failures=2), retry=fast_retry(attempts=1), breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            provider.generate("hello")
+    with pytest.raises(CircuitOpenError):
+        provider.generate("hello")
+    now[0] += 10
+    assert provider.generate("hello") == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_rate_limit_rejects_once_budget_exhausted():
+    provider = ResilientProvider(StubProvider(), requests_per_minute=1, timeout_s=0.01)
+    provider.generate("first")
+    with pytest.raises(RateLimitExceeded):
+        provider.generate("second")
+
+
+def test_deadline_is_passed_to_provider():
+    provider = ResilientProvider(StubProvider(latency_s=1.0), timeout_s=0.05, retry=fast_retry(attempts=1))
+    with pytest.raises(TimeoutError):
+        provider.generate("slow")
+
+
+def test_local_refusal_hands_back_half_open_trial():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=10, clock=lambda: now[0])
+    provider = ResilientProvider(FlakyProvider(failures=1), requests_per_minute=2, timeout_s=0.01,
+                                 retry=fast_retry(attempts=1), breaker=breaker)
+    with pytest.raises(TimeoutError):
+        provider.generate("hello")
+    now[0] += 10
+    provider.generate("drain the request bucket")  # half-open trial succeeds and closes the circuit
+    breaker.record_failure()
+    now[0] += 10
+    with pytest.raises(RateLimitExceeded):
+        provider.generate("refused locally while half-open")
+    assert breaker.state == CircuitBreaker.HALF_OPEN and breaker.allow()
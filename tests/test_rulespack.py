@@ -0,0 +1,87 @@
+import json
+import time
+
+import pytest
+
+from app.services import rulespack
+from app.services.incremental import IncrementalCache
+from app.services.rulespack import RulesPackError, RulesPackManager, load_rules_pack
+
+
+class FakeRAG:
+    def __init__(self, pack):
+        self.rules_version = pack.version
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def _write_pack(path, version, rules=None):
+    rules = rules or [{"rule_id": "R1", "title": "Identity", "category": "identity", "text": "UEI required"}]
+    path.write_text(json.dumps({"version": version, "rules": rules}))
+    return path
+
+
+def test_builtin_pack_and_validation(tmp_path):
+    pack = load_rules_pack(rulespack.DEFAULT_RULES_PACK_PATH)
+    assert [r["rule_id"] for r in pack.rules] == ["R1", "R2", "R3", "R4", "R5"] and pack.version
+    with pytest.raises(RulesPackError, match="missing text"):
+        load_rules_pack(_write_pack(tmp_path / "bad.json", "x", [{"rule_id": "R1", "title": "t", "category": "c"}]))
+    unversioned = tmp_path / "unversioned.json"
+    unversioned.write_text(json.dumps({"rules": pack.rules}))
+    assert load_rules_pack(unversioned).version == load_rules_pack(unversioned).digest[:12]
+
+
+def test_reload_swaps_atomically_and_retires_old_service(tmp_path, monkeypatch):
+    monkeypatch.setattr(rulespack, "RETIRE_GRACE_S", 0)
+    path = _write_pack(tmp_path / "pack.json", "v1")
+    manager = RulesPackManager(FakeRAG, path)
+    first = manager.current()
+    assert first.rules_version == "v1" and manager.current() is first
+
+    # Unchanged content: nothing rebuilt
+    manager.reload(wait=True)
+    assert manager.current() is first
+
+    _write_pack(path, "v2")
+    status = manager.reload(wait=True)
+    assert status["version"] == "v2" and status["state"] == "idle"
+    assert manager.current().rules_version == "v2"
+    for _ in range(50):
+        if first.closed:
+            break
+        time.sleep(0.01)
+    assert first.closed
+
+
+def test_failed_reload_keeps_live_pack(tmp_path):
+    manager = RulesPackManager(FakeRAG, _write_pack(tmp_path / "pack.json", "v1"))
+    live = manager.current()
+    (tmp_path / "broken.json").write_text("{not json")
+    status = manager.reload(tmp_path / "broken.json", wait=True)
+    assert status["state"] == "failed" and status["version"] == "v1"
+    assert manager.current() is live and manager.path == tmp_path / "pack.json"
+
+
+def test_cached_analysis_is_invalidated_by_rules_version():
+    cache = IncrementalCache()
+    cache.put_analysis("pkg", {"checklist": {"rules_version": "v1"}, "brief": "", "client_email": ""})
+    assert cache.get_analysis("pkg", rules_version="v1") is not None
+    assert cache.get_analysis("pkg", rules_version="v2") is None
+
+
+def test_admin_routes_need_a_token_and_stay_in_the_pack_dir(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert client.get("/api/admin/rules").status_code == 403
+
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    monkeypatch.setenv("RULES_PACK_DIR", str(tmp_path))
+    headers = {"X-Admin-Token": "secret"}
+    assert client.post("/api/admin/rules/reload?path=../../etc/passwd", headers=headers).status_code == 400
+    assert client.post("/api/admin/rules/reload", params={"path": "/etc/passwd"}, headers=headers).status_code == 400
+    assert rulespack.resolve_pack_path("packs/2025.json") == tmp_path.resolve() / "packs" / "2025.json"
@@ -0,0 +1,43 @@
+import json
+from fastapi.testclient import TestClient
+from app.core.tracing import NULL_SPAN, span, start_trace
+from app.main import app
+from app.routers import ingest
+from app.services.incremental import IncrementalCache
+from tests.test_incremental import PRICING, _package
+
+
+def test_spans_are_noops_outside_a_trace():
+    with span("parse") as s:
+        assert s is NULL_SPAN
+
+
+def test_nested_spans_and_server_timing():
+    with start_trace("test") as trace:
+        with span("document") as outer:
+            with span("parse", input_chars=10):
+                pass
+            outer.set(cache_hit=False)
+    document, parse = sorted(trace.spans, key=lambda s: s.name)
+    assert parse.parent_id == document.span_id and document.attributes["cache_hit"] is False
+    assert trace.server_timing().startswith("document;dur=") and "parse;dur=" in trace.server_timing()
+
+
+def test_ingest_reports_stage_timings(monkeypatch, tmp_path):
+    export_path = tmp_path / "traces.jsonl"
+    monkeypatch.setenv("TRACE_EXPORT_PATH", str(export_path))
+    monkeypatch.setattr(ingest, "incremental_cache", IncrementalCache())
+    monkeypatch.setattr(ingest, "package_index", {})
+    client = TestClient(app)
+
+    response = client.post("/api/ingest_v2?timings=true", json=_package())
+    stages = {t["stage"] for t in response.json()["timings"]}
+    assert {"document", "classify", "parse", "redact"} <= stages
+    assert "parse;dur=" in response.headers["Server-Timing"]
+
+    again = client.post("/api/ingest_v2?timings=true", json=_package(PRICING + "\nAnalyst, 90, Hour")).json()["timings"]
+    assert [t["cache_hit"] for t in again if t["stage"] == "document"] == [True, True, False]
+
+    exported = [json.loads(line) for line in export_path.read_text().splitlines()]
+    spans = exported[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert spans[0]["name"] == "POST /api/ingest_v2" and {s["name"] for s in spans[1:]} == stages